@@ -1,13 +1,24 @@
-import requests
-from bs4 import BeautifulSoup
 import re
 import os
+import sys
 from ftplib import FTP
 from datetime import datetime
-import json
+import argparse
+import metricas
+import cliente_http
+from cache_fuente import cargar_estado, guardar_estado, validadores_respuesta, hash_texto_guia
+from horarios_guia import parsear_horarios, calcular_inicio_utc, generar_id_partido
+from modelo_eventos import Guia, Evento, Partido, serializar_guia
+from salida_json import serializar_json, escribir_json_publicable
+from publicador_ftp import publicar_archivos
+from almacen_artefactos import guardar_artefactos
+from estado_publicacion import publicar_status
+from extractor_contenedor import descargar_texto_contenedor
+from tokenizador_guia import tokenizar_guia, asegurar_tokens, PREFIJO_FECHA, FECHA, TITULO, SEPARADOR, PARTIDO, PIE
 
 # --- 1. CONFIGURACIÓN ---
 URL_FUENTE = os.getenv('URL_FUENTE')
+ID_CONTENEDOR = 'comp-khhybsn1'
 FTP_HOST = os.getenv('FTP_HOST')
 FTP_USUARIO = os.getenv('FTP_USUARIO')
 FTP_CONTRASENA = os.getenv('FTP_CONTRASENA')
@@ -18,51 +29,42 @@ NOMBRE_ARCHIVO_PROGRAMACION = os.getenv('NOMBRE_ARCHIVO_PROGRAMACION', 'programa
 NOMBRE_ARCHIVO_MENSAJE = os.getenv('NOMBRE_ARCHIVO_MENSAJE', 'mensaje_whatsapp.html')
 NOMBRE_ARCHIVO_SITEMAP = 'sitemap.xml'
 NOMBRE_ARCHIVO_TELEGRAM = 'telegram_message.txt'
+NOMBRE_MANIFIESTO = 'manifiesto-actualizador.json'
 
 # --- 2. FUNCIÓN PARA GENERAR EL HTML DE LA PÁGINA ---
-def aplicar_reglas_html(texto_crudo):
+def aplicar_reglas_html(guia):
     resultado_html = ""
-    REGEX_EMOJI = re.compile(r'[\U0001F300-\U0001F5FF\U0001F600-\U0001F64F\U0001F680-\U0001F6FF\u2600-\u26FF\u2700-\u27BF]+', re.UNICODE)
-    PALABRAS_CLAVE = ["Este", "Centro", "Pacífico"]
-    lineas = texto_crudo.strip().split('\n')
     year_actual = datetime.now().year
     
-    for linea in lineas:
-        linea = linea.strip()
-        if not linea: continue
-        if linea.startswith("Eventos Deportivos"):
-            fecha_texto = linea.replace("Eventos Deportivos ", "").strip()
+    for linea in asegurar_tokens(guia):
+        if linea.tipo == FECHA and linea.texto.startswith(PREFIJO_FECHA):
+            fecha_texto = linea.texto.replace("Eventos Deportivos ", "").strip()
             resultado_html += f"<h2>Eventos Deportivos y Especiales, {year_actual} <br /><br />\n{fecha_texto} <br /><br /><br />\n"
-        elif "WWE Wrestling" in linea or REGEX_EMOJI.search(linea) or "Evento BOX" in linea:
-            resultado_html += f"<h3>{linea}</h3><br /><br />\n"
-        elif any(keyword in linea for keyword in PALABRAS_CLAVE):
-            resultado_html += f"<p>{linea}</p><br /><br />\n"
+        elif linea.destacada:
+            resultado_html += f"<h3>{linea.texto}</h3><br /><br />\n"
+        elif linea.zona:
+            resultado_html += f"<p>{linea.texto}</p><br /><br />\n"
         else:
-            resultado_html += f"<p><strong>{linea}</strong></p><br /><br />\n"
+            resultado_html += f"<p><strong>{linea.texto}</strong></p><br /><br />\n"
     return resultado_html
 
 # --- 3. FUNCIÓN PARA GENERAR EL MENSAJE DE WHATSAPP ---
-def crear_mensaje_whatsapp(texto_crudo):
-    REGEX_EMOJI = re.compile(r'[\U0001F600-\U0001F64F\U0001F300-\U0001F5FF\U0001F680-\U0001F6FF\u2600-\u26FF\u2700-\u27BF]+', re.UNICODE)
-    lineas = texto_crudo.strip().split('\n')
+def crear_mensaje_whatsapp(guia):
     titulos_con_emoji = []
     fecha_del_dia = ""
-    separador_emojis = "⚽️🏈🏀⚾️🏐🎾🥊🏒⛳️🎳"
     separador_count = 0
 
-    for linea in lineas:
-        linea = linea.strip()
-        if not linea: continue
-        if linea.startswith("Eventos Deportivos"):
-            fecha_del_dia = linea.replace("Eventos Deportivos ", "").strip()
-        elif separador_emojis in linea:
+    for linea in asegurar_tokens(guia):
+        if linea.tipo == FECHA and linea.texto.startswith(PREFIJO_FECHA):
+            fecha_del_dia = linea.texto.replace("Eventos Deportivos ", "").strip()
+        elif linea.separador:
             separador_count += 1
             if separador_count == 1:
-                titulos_con_emoji.append(f"{linea}\n")
+                titulos_con_emoji.append(f"{linea.texto}\n")
             else:
-                titulos_con_emoji.append(f"\n{linea}")
-        elif "WWE Wrestling" in linea or REGEX_EMOJI.search(linea) or "Evento BOX" in linea:
-            titulos_con_emoji.append(linea)
+                titulos_con_emoji.append(f"\n{linea.texto}")
+        elif linea.destacada:
+            titulos_con_emoji.append(linea.texto)
     
     year_actual = datetime.now().year
     fecha_formateada = f"{fecha_del_dia} de {year_actual}" if fecha_del_dia else f"Hoy, {datetime.now().strftime('%d de %B')}"
@@ -107,20 +109,12 @@ def obtener_ranking_eventos(texto_crudo):
     return []
 
 # --- 6. FUNCIÓN JSON ---
-def crear_json_eventos(texto_crudo, ranking_relevancia):
+def construir_guia(guia):
+    """Arma el modelo Guia/Evento/Partido a partir del texto crudo o de las líneas tokenizadas."""
     meses_es = {
         "enero": "01", "febrero": "02", "marzo": "03", "abril": "04", "mayo": "05", "junio": "06",
         "julio": "07", "agosto": "08", "septiembre": "09", "octubre": "10", "noviembre": "11", "diciembre": "12"
     }
-    REGEX_EMOJI = re.compile(r'[\U0001F300-\U0001F5FF\U0001F600-\U0001F64F\U0001F680-\U0001F6FF\u2600-\u26FF\u2700-\u27BF]+', re.UNICODE)
-
-    def es_linea_de_titulo(linea):
-        if "WWE Wrestling" in linea or "Evento BOX" in linea:
-            return True
-        if REGEX_EMOJI.search(linea):
-            if not any(keyword in linea.lower() for keyword in ["vs", "va", " a las ", " pm ", " am ", "p.m."]):
-                return True
-        return False
 
     def parsear_linea_partido(linea_partido):
         partido = {"descripcion": "", "horarios": "", "canales": [], "competidores": []}
@@ -153,13 +147,13 @@ def crear_json_eventos(texto_crudo, ranking_relevancia):
             
         return partido
 
-    datos_json = {"fecha_actualizacion": datetime.now().isoformat(), "fecha_guia": "", "titulo_guia": "", "eventos": []}
-    lineas = [l.strip() for l in texto_crudo.strip().split('\n') if l.strip()]
+    datos_json = {"fecha_actualizacion": datetime.now().isoformat(), "fecha_guia": "", "titulo_guia": ""}
     
     bloques_evento = []
     bloque_actual = []
-    for linea in lineas:
-        if "Eventos Deportivos" in linea:
+    for token in asegurar_tokens(guia):
+        linea = token.texto
+        if token.tipo == FECHA:
             fecha_texto = linea.replace("Eventos Deportivos ", "").strip()
             year_actual = datetime.now().year
             
@@ -177,47 +171,64 @@ def crear_json_eventos(texto_crudo, ranking_relevancia):
             titulo_completo_html = f"Eventos Deportivos y Especiales, {year_actual} <br /> {fecha_texto}"
             datos_json["titulo_guia"] = titulo_completo_html
             continue
-        if "Kaelus Soporte" in linea or "⚽️🏈🏀⚾️🏐🎾🥊🏒⛳️🎳" in linea:
+        if token.tipo in (PIE, SEPARADOR):
             continue
         
-        if es_linea_de_titulo(linea) and bloque_actual:
+        if token.tipo == TITULO and bloque_actual:
             bloques_evento.append(bloque_actual)
-            bloque_actual = [linea]
+            bloque_actual = [token]
         else:
-            bloque_actual.append(linea)
+            bloque_actual.append(token)
     if bloque_actual: bloques_evento.append(bloque_actual)
 
+    usados = set()
+
+    def crear_partido(partido_info, detalle_partido, organizador):
+        inicio = parsear_horarios(partido_info["horarios"])
+        return Partido.crear(
+            descripcion=partido_info["descripcion"],
+            horarios=partido_info["horarios"],
+            canales=partido_info["canales"],
+            competidores=partido_info["competidores"],
+            detalle_partido=detalle_partido,
+            organizador=organizador,
+            id=generar_id_partido(organizador, partido_info["descripcion"], partido_info["horarios"], usados),
+            inicio=inicio,
+            inicio_utc=calcular_inicio_utc(datos_json["fecha_guia"], inicio),
+        )
+
     lista_eventos_original = []
     for bloque in bloques_evento:
         if not bloque: continue
-        evento_principal = bloque[0]
-        evento_json = {"evento_principal": evento_principal, "detalle_evento": "", "partidos": []}
+        evento_principal = bloque[0].texto
+        partidos = []
         contenido = bloque[1:]
         
         detalles_previos = []
-        for linea in contenido:
-            if any(keyword in linea for keyword in ["Este", "Centro", "Pacífico", "partir de las"]):
+        for token in contenido:
+            linea = token.texto
+            if token.tipo == PARTIDO:
                 partido_info = parsear_linea_partido(linea)
-                partido_info["detalle_partido"] = " ".join(detalles_previos).strip()
                 if not partido_info["descripcion"] and detalles_previos:
                     partido_info["descripcion"] = detalles_previos[-1]
-                partido_info["organizador"] = evento_principal
-                evento_json["partidos"].append(partido_info)
+                partidos.append(crear_partido(partido_info, " ".join(detalles_previos).strip(), evento_principal))
                 detalles_previos = []
             else:
                 detalles_previos.append(linea)
         
         if detalles_previos:
             partido_info = parsear_linea_partido(detalles_previos[-1])
-            partido_info["detalle_partido"] = " ".join(detalles_previos[:-1]).strip()
-            partido_info["organizador"] = evento_principal
-            evento_json["partidos"].append(partido_info)
+            partidos.append(crear_partido(partido_info, " ".join(detalles_previos[:-1]).strip(), evento_principal))
         
-        if evento_json["partidos"]:
-            lista_eventos_original.append(evento_json)
+        if partidos:
+            lista_eventos_original.append(Evento(evento_principal=sys.intern(evento_principal), partidos=tuple(partidos)))
 
-    datos_json["eventos"] = lista_eventos_original
-    return json.dumps(datos_json, indent=4, ensure_ascii=False)
+    return Guia(eventos=tuple(lista_eventos_original), **datos_json)
+
+def crear_json_eventos(guia, ranking_relevancia, pretty=False):
+    if not isinstance(guia, Guia):
+        guia = construir_guia(guia)
+    return serializar_json(serializar_guia(guia), pretty)
 
 # --- 7. FUNCIÓN PARA GENERAR EL SITEMAP ---
 def crear_sitemap():
@@ -235,70 +246,108 @@ def crear_sitemap():
         f.write(contenido_sitemap)
     print("Archivo sitemap.xml generado con la fecha de hoy.")
 
+def conectar_ftp():
+    ftp = FTP(timeout=30)
+    ftp.connect(FTP_HOST, FTP_PUERTO)
+    ftp.login(FTP_USUARIO, FTP_CONTRASENA)
+    ftp.set_pasv(True)
+    ftp.cwd(RUTA_REMOTA_FTP)
+    return ftp
+
 # --- 8. FUNCIÓN PRINCIPAL ---
-def main():
+@metricas.instrumentar("actualizador_web")
+def main(forzar=False, pretty=False):
+    """Devuelve True si se publicó una guía nueva (el modo pipeline de demonio.py rankea en seguida)."""
     print("Iniciando proceso de actualización de todos los archivos...")
     if not URL_FUENTE:
         print("ERROR CRÍTICO: El secret URL_FUENTE no está configurado.")
-        return
+        metricas.error("configuracion")
+        return False
+    estado_fuente = {} if forzar else cargar_estado()
     try:
         print("1. Extrayendo datos de la fuente...")
-        respuesta = requests.get(URL_FUENTE, timeout=20)
-        respuesta.raise_for_status()
-        soup = BeautifulSoup(respuesta.content, 'html.parser')
-        bloque_contenido = soup.find('div', {'id': 'comp-khhybsn1'})
-        if not bloque_contenido:
-            raise ValueError("No se encontró el contenedor de eventos con ID 'comp-khhybsn1'.")
-        texto_extraido_filtrado = bloque_contenido.get_text(separator='\n', strip=True)
+        with metricas.etapa("descarga"):
+            # Lectura en streaming: se deja de descargar en cuanto se cierra el contenedor
+            respuesta = cliente_http.get(URL_FUENTE, validadores=estado_fuente, timeout=20, stream=True)
+            if respuesta.status_code == 304:
+                respuesta.close()
+                metricas.contar("fuente_sin_cambios")
+                print("La fuente no ha cambiado desde la última ejecución (HTTP 304). No hay nada que publicar.")
+                return False
+            respuesta.raise_for_status()
+            validadores = validadores_respuesta(respuesta)
+            texto_extraido_filtrado = descargar_texto_contenedor(respuesta, ID_CONTENEDOR)
+            if texto_extraido_filtrado is None:
+                raise ValueError(f"No se encontró el contenedor de eventos con ID '{ID_CONTENEDOR}'.")
         print("Datos extraídos correctamente.")
     except Exception as e:
         print(f"ERROR FATAL en la extracción: {e}")
-        return
+        return False
+
+    hash_guia = hash_texto_guia(texto_extraido_filtrado)
+    if hash_guia == estado_fuente.get('hash_texto'):
+        # Mismo texto con distinto ETag (Wix lo regenera): solo se refrescan los validadores
+        guardar_estado({**estado_fuente, **validadores})
+        metricas.contar("fuente_sin_cambios")
+        print("El texto de la guía no ha cambiado. Se omite la generación y la subida (use --force para forzar).")
+        return False
 
     ranking = obtener_ranking_eventos(texto_extraido_filtrado)
 
     print("2. Generando contenido para los 5 archivos...")
-    contenido_html_mensaje, contenido_texto_puro_telegram = crear_mensaje_whatsapp(texto_extraido_filtrado)
-    contenido_json = crear_json_eventos(texto_extraido_filtrado, ranking)
-    contenido_html_programacion = aplicar_reglas_html(texto_extraido_filtrado)
-    generar_archivo_telegram_txt(contenido_texto_puro_telegram)
-    crear_sitemap()
+    with metricas.etapa("tokenizacion"):
+        lineas_guia = tokenizar_guia(texto_extraido_filtrado)
+    with metricas.etapa("renderizado"):
+        guia = construir_guia(lineas_guia)
+        contenido_html_mensaje, contenido_texto_puro_telegram = crear_mensaje_whatsapp(lineas_guia)
+        contenido_json = crear_json_eventos(guia, ranking, pretty)
+        contenido_html_programacion = aplicar_reglas_html(lineas_guia)
+    metricas.contar("lineas_guia", len(lineas_guia))
+    metricas.contar("eventos_parseados", len(guia.eventos))
+    metricas.contar("partidos_parseados", sum(len(e.partidos) for e in guia.eventos))
     print("Contenido generado.")
 
     print("3. Guardando archivos locales...")
-    archivos_a_subir = [NOMBRE_ARCHIVO_JSON, NOMBRE_ARCHIVO_PROGRAMACION, NOMBRE_ARCHIVO_MENSAJE, NOMBRE_ARCHIVO_SITEMAP, NOMBRE_ARCHIVO_TELEGRAM]
+    archivos_a_subir = [NOMBRE_ARCHIVO_PROGRAMACION, NOMBRE_ARCHIVO_MENSAJE, NOMBRE_ARCHIVO_SITEMAP, NOMBRE_ARCHIVO_TELEGRAM]
     try:
-        with open(NOMBRE_ARCHIVO_JSON, 'w', encoding='utf-8') as f: f.write(contenido_json)
-        with open(NOMBRE_ARCHIVO_PROGRAMACION, 'w', encoding='utf-8') as f: f.write(contenido_html_programacion)
-        with open(NOMBRE_ARCHIVO_MENSAJE, 'w', encoding='utf-8') as f: f.write(contenido_html_mensaje)
+        with metricas.etapa("escritura"):
+            generar_archivo_telegram_txt(contenido_texto_puro_telegram)
+            crear_sitemap()
+            archivos_a_subir = escribir_json_publicable(NOMBRE_ARCHIVO_JSON, contenido_json) + archivos_a_subir
+            with open(NOMBRE_ARCHIVO_PROGRAMACION, 'w', encoding='utf-8') as f: f.write(contenido_html_programacion)
+            with open(NOMBRE_ARCHIVO_MENSAJE, 'w', encoding='utf-8') as f: f.write(contenido_html_mensaje)
         print(f"Archivos locales guardados: {', '.join(archivos_a_subir)}.")
     except Exception as e:
         print(f"Error al guardar archivos locales: {e}")
-        return
+        return False
 
     if not all([FTP_HOST, FTP_USUARIO, FTP_CONTRASENA]):
         print("ADVERTENCIA: Faltan variables de FTP. Omitiendo la subida.")
-        return
+        return False
     
     print("4. Subiendo archivos al servidor FTP...")
     try:
-        ftp = FTP()
-        ftp.connect(FTP_HOST, FTP_PUERTO)
-        ftp.login(FTP_USUARIO, FTP_CONTRASENA)
-        
-        ftp.set_pasv(True)
-        ftp.cwd(RUTA_REMOTA_FTP)
-        for nombre_archivo in archivos_a_subir:
-            with open(nombre_archivo, 'rb') as file:
-                print(f"Subiendo '{nombre_archivo}'...")
-                ftp.storbinary(f'STOR {nombre_archivo}', file)
-                
-        ftp.quit()
+        with metricas.etapa("ftp"):
+            subidos = publicar_archivos(conectar_ftp, archivos_a_subir, NOMBRE_MANIFIESTO, forzar=forzar)
+            # Después de los archivos: status.json nunca anuncia algo que aún no está publicado
+            status = publicar_status(conectar_ftp, archivos_a_subir)
+        # Copia para el ranker y los envíos de Telegram: leen de aquí antes que del sitio
+        guardar_artefactos(archivos_a_subir + ([status] if status else []))
+        metricas.contar("archivos_subidos", len(subidos))
+        metricas.contar("bytes_subidos", sum(r.bytes for r in subidos))
         print("¡Subida de todos los archivos completada exitosamente!")
     except Exception as e:
         print(f"ERROR FATAL durante la subida por FTP: {e}")
-        # --- fin ---
+        return False
+
+    # El estado solo se guarda tras publicar, para que un fallo se reintente en la siguiente ejecución
+    guardar_estado({**validadores, 'hash_texto': hash_guia, 'fecha_publicacion': datetime.now().isoformat()})
+    return True
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Actualiza y publica la guía de eventos.")
+    parser.add_argument('--force', action='store_true', help="Ignora la caché de la fuente y publica aunque la guía no haya cambiado.")
+    parser.add_argument('--pretty', action='store_true', help="Escribe events.json indentado (depuración) en lugar de minificado.")
+    args = parser.parse_args()
+    main(forzar=args.force, pretty=args.pretty)
     print("--- Proceso finalizado ---")
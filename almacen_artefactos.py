@@ -0,0 +1,137 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlsplit
+
+import metricas
+import cliente_http
+
+# --- 1. CONFIGURACIÓN ---
+# Copia local de lo que se publica (events.json, feeds rankeados, mensaje de Telegram).
+# En Actions el directorio viaja entre jobs con actions/cache; vacío = siempre por HTTP.
+DIRECTORIO_ARTEFACTOS = os.getenv('DIRECTORIO_ARTEFACTOS', '.artefactos')
+MAX_EDAD_ARTEFACTO = float(os.getenv('ARTEFACTOS_MAX_EDAD_HORAS', '6')) * 3600
+EXTENSIONES_OMITIDAS = ('.gz', '.br')     # las copias precomprimidas solo sirven al servidor web
+
+
+# --- 2. ALMACENES ---
+class AlmacenLocal:
+    """
+    Artefactos como archivos en un directorio (local o compartido entre jobs). Cualquier
+    objeto con leer/guardar sirve de almacén: leer(nombre) -> (bytes, edad en segundos) o None.
+    """
+
+    def __init__(self, directorio):
+        self.directorio = directorio
+
+    def leer(self, nombre):
+        ruta = os.path.join(self.directorio, nombre)
+        try:
+            with open(ruta, 'rb') as f:
+                return f.read(), time.time() - os.path.getmtime(ruta)
+        except OSError:
+            return None
+
+    def guardar(self, nombre, ruta_origen):
+        os.makedirs(self.directorio, exist_ok=True)
+        temporal = os.path.join(self.directorio, f"{nombre}.tmp")
+        shutil.copyfile(ruta_origen, temporal)
+        os.replace(temporal, os.path.join(self.directorio, nombre))
+
+
+class AlmacenMemoria:
+    """
+    Artefactos en memoria delante de otro almacén (o de ninguno). Para procesos que ejecutan
+    varios scripts seguidos (demonio.py): la guía que publica el actualizador la leen el
+    ranker y los envíos sin volver a disco ni a la red.
+    """
+
+    def __init__(self, respaldo=None):
+        self.respaldo = respaldo
+        self._datos = {}
+        self._candado = threading.Lock()
+
+    def leer(self, nombre):
+        with self._candado:
+            entrada = self._datos.get(nombre)
+        if entrada is not None:
+            datos, guardado = entrada
+            return datos, time.time() - guardado
+        return self.respaldo.leer(nombre) if self.respaldo is not None else None
+
+    def guardar(self, nombre, ruta_origen):
+        with open(ruta_origen, 'rb') as f:
+            datos = f.read()
+        with self._candado:
+            self._datos[nombre] = (datos, time.time())
+        if self.respaldo is not None:
+            self.respaldo.guardar(nombre, ruta_origen)
+
+
+ALMACEN = AlmacenLocal(DIRECTORIO_ARTEFACTOS) if DIRECTORIO_ARTEFACTOS else None
+
+
+# --- 3. API PARA LOS SCRIPTS ---
+def guardar_artefactos(rutas, almacen=None):
+    """Copia al almacén los archivos ya publicados (sin las variantes .gz/.br)."""
+    almacen = almacen or ALMACEN
+    if almacen is None:
+        return
+    for ruta in rutas:
+        if ruta.endswith(EXTENSIONES_OMITIDAS):
+            continue
+        try:
+            almacen.guardar(os.path.basename(ruta), ruta)
+        except OSError as e:
+            print(f"ADVERTENCIA: No se pudo guardar el artefacto {ruta}: {e}")
+
+
+def obtener_bytes(url, valido=None, max_edad=MAX_EDAD_ARTEFACTO, almacen=None, status=None, **kwargs):
+    """
+    Contenido del archivo publicado en `url`: primero la copia del almacén (mismo nombre de
+    archivo), si existe, no supera `max_edad` segundos y `valido(bytes)` la acepta; si no,
+    se descarga por HTTP con headers de navegador (`kwargs` van a cliente_http.get).
+    `status` es la entrada del archivo en el status.json leído del servidor
+    (estado_publicacion.consultar_status): si trae hash, decide solo el hash, sin importar
+    la edad ni hacer otra petición. Devuelve (bytes, origen).
+    """
+    almacen = almacen or ALMACEN
+    sha256 = (status or {}).get("sha256")
+    nombre = os.path.basename(urlsplit(url).path)
+    local = almacen.leer(nombre) if almacen is not None and nombre else None
+    if local is not None:
+        datos, edad = local
+        try:
+            if sha256:
+                aceptado = hashlib.sha256(datos).hexdigest() == sha256
+            else:
+                aceptado = edad <= max_edad and (valido is None or valido(datos))
+        except (ValueError, AttributeError):  # copia dañada o con otra forma
+            aceptado = False
+        if aceptado:
+            metricas.contar("artefactos_locales")
+            print(f" -> 📦 {nombre} leído del almacén local (hace {edad / 60:.0f} min).")
+            return datos, "local"
+        print(f" -> ℹ️ La copia local de {nombre} está vencida. Se descarga del servidor.")
+
+    metricas.contar("artefactos_http")
+    respuesta = cliente_http.get(url, navegador=True, params={'v': datetime.now().timestamp()}, **kwargs)
+    respuesta.raise_for_status()
+    metricas.contar("bytes_descargados", len(respuesta.content))
+    return respuesta.content, "http"
+
+
+def obtener_json(url, vigente=None, **kwargs):
+    """Como obtener_bytes, pero decodifica el JSON; `vigente(datos)` valida la copia local."""
+    valido = None if vigente is None else (lambda contenido: vigente(json.loads(contenido)))
+    contenido, origen = obtener_bytes(url, valido, **kwargs)
+    return json.loads(contenido), origen
+
+
+def obtener_texto(url, **kwargs):
+    contenido, origen = obtener_bytes(url, **kwargs)
+    return contenido.decode('utf-8'), origen
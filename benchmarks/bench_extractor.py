@@ -0,0 +1,107 @@
+"""
+Compara la extracción del contenedor de la guía con BeautifulSoup (ruta anterior)
+contra el parser incremental de extractor_contenedor.py sobre capturas guardadas.
+
+benchmarks/snapshots/pagina-sintetica.html es una página generada con
+generador_guia.generar_pagina_html(1000): misma estructura que la fuente, sin datos reales.
+Las capturas reales (--guardar) se agregan en el mismo directorio.
+
+Uso:
+    python benchmarks/bench_extractor.py                 # todas las capturas en benchmarks/snapshots/
+    python benchmarks/bench_extractor.py pagina1.html    # capturas específicas
+    python benchmarks/bench_extractor.py --guardar       # descarga URL_FUENTE como nueva captura
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+from extractor_contenedor import extraer_texto_contenedor, TAMANO_FRAGMENTO
+
+ID_CONTENEDOR = 'comp-khhybsn1'
+DIRECTORIO_CAPTURAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'snapshots')
+
+
+def extraer_con_beautifulsoup(contenido):
+    soup = BeautifulSoup(contenido, 'html.parser')
+    bloque = soup.find('div', {'id': ID_CONTENEDOR})
+    return bloque.get_text(separator='\n', strip=True) if bloque else None
+
+
+def extraer_incremental(contenido):
+    fragmentos = (contenido[i:i + TAMANO_FRAGMENTO] for i in range(0, len(contenido), TAMANO_FRAGMENTO))
+    return extraer_texto_contenedor(fragmentos, ID_CONTENEDOR)
+
+
+def medir(funcion, contenido, repeticiones):
+    tracemalloc.start()
+    resultado = funcion(contenido)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion(contenido)
+    promedio = (time.perf_counter() - inicio) / repeticiones
+    return resultado, promedio, pico
+
+
+def guardar_captura():
+    import requests
+    url = os.getenv('URL_FUENTE')
+    if not url:
+        print("ERROR: URL_FUENTE no está configurada.")
+        sys.exit(1)
+    os.makedirs(DIRECTORIO_CAPTURAS, exist_ok=True)
+    respuesta = requests.get(url, timeout=20)
+    respuesta.raise_for_status()
+    ruta = os.path.join(DIRECTORIO_CAPTURAS, f"pagina-{datetime.now().strftime('%Y%m%d-%H%M')}.html")
+    with open(ruta, 'wb') as f:
+        f.write(respuesta.content)
+    print(f"Captura guardada en {ruta} ({len(respuesta.content)} bytes).")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del extractor del contenedor de la guía.")
+    parser.add_argument('capturas', nargs='*', help="Archivos HTML guardados de la página fuente.")
+    parser.add_argument('--repeticiones', type=int, default=20)
+    parser.add_argument('--guardar', action='store_true', help="Descarga URL_FUENTE como nueva captura y termina.")
+    args = parser.parse_args()
+
+    if args.guardar:
+        guardar_captura()
+        return
+
+    capturas = args.capturas or sorted(glob.glob(os.path.join(DIRECTORIO_CAPTURAS, '*.html')))
+    if not capturas:
+        print(f"No hay capturas. Use --guardar o coloque archivos .html en {DIRECTORIO_CAPTURAS}.")
+        sys.exit(1)
+
+    fallos = 0
+    for ruta in capturas:
+        with open(ruta, 'rb') as f:
+            contenido = f.read()
+        texto_bs, t_bs, mem_bs = medir(extraer_con_beautifulsoup, contenido, args.repeticiones)
+        texto_inc, t_inc, mem_inc = medir(extraer_incremental, contenido, args.repeticiones)
+        identico = texto_bs == texto_inc
+        if not identico:
+            fallos += 1
+
+        print(f"\n{os.path.basename(ruta)} ({len(contenido) / 1024:.0f} KB)")
+        print(f"  BeautifulSoup : {t_bs * 1000:8.2f} ms | pico {mem_bs / 1024:8.0f} KB")
+        print(f"  Incremental   : {t_inc * 1000:8.2f} ms | pico {mem_inc / 1024:8.0f} KB")
+        print(f"  Aceleración   : {t_bs / t_inc:8.1f}x | salida idéntica: {'sí' if identico else 'NO'}")
+
+    if fallos:
+        print(f"\nERROR: {fallos} captura(s) con salida distinta a BeautifulSoup.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
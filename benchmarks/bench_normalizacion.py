@@ -0,0 +1,134 @@
+"""
+Compara el rendimiento de normalizacion.py (patrones precompilados, tablas de str.translate
+y caché LRU) con las implementaciones anteriores, que compilaban el patrón en cada llamada.
+Los textos salen de una guía sintética, con la repetición real de ligas y canales.
+
+Uso:
+    python benchmarks/bench_normalizacion.py
+    python benchmarks/bench_normalizacion.py --lineas 5000
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(DIRECTORIO))
+sys.path.insert(0, DIRECTORIO)
+
+from generador_guia import generar_guia
+import normalizacion
+
+TIEMPO_MINIMO = 0.3  # segundos de medición por caso
+
+
+# --- 1. IMPLEMENTACIONES ANTERIORES ---
+def limpiar_texto_roku_anterior(texto):
+    if not texto:
+        return ""
+    emoji_pattern = re.compile(
+        r'[\U0001F000-\U0001FAFF]'
+        r'|[\U00002600-\U000027BF]'
+        r'|[\U0001F300-\U0001F5FF]'
+        r'|[\U0001F680-\U0001F6FF]'
+        r'|[\U0001F1E0-\U0001F1FF]'
+        r'|[\U000E0000-\U000E007F]'
+        r'|[\u2700-\u27BF]'
+        r'|[\uFE00-\uFE0F]'
+        r'|[\u200B-\u200D]',
+        flags=re.UNICODE
+    )
+    texto_limpio = emoji_pattern.sub('', texto)
+    return re.sub(r'\s+', ' ', texto_limpio).strip()
+
+
+def escape_markdown_anterior(text):
+    return re.sub(r'([\[\]()~`>#+\-=|{}.!])', r'\\\1', str(text))
+
+
+def escape_for_alert_anterior(text):
+    return re.sub(r'([_*[\]()~`>#+\-=|{}.!])', r'\\\1', text)
+
+
+def deporte_anterior(texto):
+    if re.search(r'(⚽|\u26BD)', texto): return "⚽"
+    elif re.search(r'(🏈|\U0001F3C8)', texto): return "🏈"
+    elif re.search(r'(⚾|\u26BE)', texto): return "⚾"
+    elif re.search(r'(🏀|\U0001F3C0)', texto): return "🏀"
+    elif re.search(r'(⛳|\u26F3)', texto): return "⛳"
+    elif re.search(r'(🏒|\U0001F3D2)', texto): return "🏒"
+    return "⭐"
+
+
+EMOJI_DEPORTE = {"futbol": "⚽", "americano": "🏈", "beisbol": "⚾", "basquetbol": "🏀", "golf": "⛳", "hockey": "🏒"}
+
+
+def deporte_nuevo(texto):
+    return EMOJI_DEPORTE.get(normalizacion.deporte_por_emoji(texto, normalizacion.EMOJIS_PLANTILLA_TELEGRAM), "⭐")
+
+
+def deporte_nuevo_sin_cache(texto):
+    return EMOJI_DEPORTE.get(normalizacion.deporte_por_emoji.__wrapped__(texto, normalizacion.EMOJIS_PLANTILLA_TELEGRAM), "⭐")
+
+
+# (nombre, anterior, nueva, nueva sin la caché LRU, qué textos usa)
+CASOS = [
+    ("limpiar_roku", limpiar_texto_roku_anterior, normalizacion.limpiar_roku,
+     normalizacion.limpiar_roku.__wrapped__, "todos"),
+    ("escapar_markdown", escape_markdown_anterior, normalizacion.escapar_markdown,
+     normalizacion.escapar_markdown.__wrapped__, "todos"),
+    ("escapar_markdown_completo", escape_for_alert_anterior, normalizacion.escapar_markdown_completo,
+     normalizacion.escapar_markdown_completo.__wrapped__, "todos"),
+    ("deporte_por_emoji", deporte_anterior, deporte_nuevo, deporte_nuevo_sin_cache, "titulos"),
+]
+
+
+# --- 2. MEDICIÓN ---
+def medir(funcion, textos):
+    """Segundos por texto procesado."""
+    repeticiones, transcurrido = 0, 0.0
+    inicio = time.perf_counter()
+    while transcurrido < TIEMPO_MINIMO:
+        for texto in textos:
+            funcion(texto)
+        repeticiones += 1
+        transcurrido = time.perf_counter() - inicio
+    return transcurrido / (repeticiones * len(textos))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de normalizacion.py contra las funciones anteriores.")
+    parser.add_argument('--lineas', type=int, default=1000, help="Líneas de la guía sintética.")
+    args = parser.parse_args()
+
+    lineas = [l for l in generar_guia(args.lineas).split('\n') if l.strip()]
+    # Las líneas de partido se parten como en el JSON: descripción y canales por separado
+    textos = []
+    for linea in lineas:
+        textos.extend(p.strip() for p in re.split(r' por | y |, ', linea) if p.strip())
+    titulos = [l for l in lineas if normalizacion.contiene_emoji_titulo(l)]
+    # Títulos con varios emojis de deporte: ahí se nota el orden de prioridad
+    titulos += ["⚾️🏀 Doble cartelera", "🎾⛳️ Fin de semana deportivo", "🥊🏒 Noche de hielo y guantes"]
+    conjuntos = {"todos": textos, "titulos": titulos}
+
+    print(f"{len(textos)} textos ({len(set(textos))} distintos), {len(titulos)} títulos\n")
+    print(f"{'operación':<28}{'anterior':>12}{'sin caché':>12}{'con caché':>12}{'aceleración':>13}  salida")
+    fallos = 0
+    for nombre, anterior, nueva, sin_cache, conjunto in CASOS:
+        muestras = conjuntos[conjunto]
+        identica = all(anterior(t) == nueva(t) for t in muestras)
+        fallos += not identica
+        t_anterior = medir(anterior, muestras)
+        t_sin_cache = medir(sin_cache, muestras)
+        t_nueva = medir(nueva, muestras)
+        print(f"{nombre:<28}{t_anterior * 1e6:>10.2f}µs{t_sin_cache * 1e6:>10.2f}µs{t_nueva * 1e6:>10.2f}µs"
+              f"{t_anterior / t_nueva:>12.1f}x  {'idéntica' if identica else 'DISTINTA'}")
+
+    if fallos:
+        print(f"\nERROR: {fallos} operación(es) con salida distinta a la implementación anterior.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
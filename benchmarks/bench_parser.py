@@ -0,0 +1,118 @@
+"""
+Benchmark del tokenizador y los renderizadores de la guía sobre guías sintéticas de
+100 a 100 000 líneas. Reporta throughput (líneas/s) y memoria pico por función y falla
+si alguna medición empeora más que la tolerancia respecto a la línea base guardada.
+
+Uso:
+    python benchmarks/bench_parser.py                        # compara contra la línea base
+    python benchmarks/bench_parser.py --actualizar-linea-base
+    python benchmarks/bench_parser.py --tamanos 100 1000 --tolerancia 0.3
+
+La línea base depende de la máquina: regenérela al cambiar de equipo o runner.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(DIRECTORIO))
+sys.path.insert(0, DIRECTORIO)
+
+from generador_guia import generar_guia
+from tokenizador_guia import tokenizar_guia
+from actualizador_web import aplicar_reglas_html, crear_mensaje_whatsapp, crear_json_eventos
+from normalizacion import limpiar_roku
+
+ARCHIVO_LINEA_BASE = os.path.join(DIRECTORIO, 'linea_base_parser.json')
+TAMANOS = [100, 1000, 10000, 100000]
+TIEMPO_MINIMO = 0.3  # segundos de medición por caso
+
+FUNCIONES = {
+    "tokenizar_guia": tokenizar_guia,
+    "aplicar_reglas_html": aplicar_reglas_html,
+    "crear_mensaje_whatsapp": crear_mensaje_whatsapp,
+    "crear_json_eventos": lambda texto: crear_json_eventos(texto, []),
+    "limpiar_roku": lambda texto: [limpiar_roku(linea) for linea in texto.split('\n')],
+}
+
+
+def medir(funcion, texto):
+    """Devuelve (segundos por llamada, bytes de memoria pico)."""
+    tracemalloc.start()
+    funcion(texto)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    repeticiones, transcurrido = 0, 0.0
+    inicio = time.perf_counter()
+    while transcurrido < TIEMPO_MINIMO:
+        funcion(texto)
+        repeticiones += 1
+        transcurrido = time.perf_counter() - inicio
+    return transcurrido / repeticiones, pico
+
+
+def ejecutar(tamanos):
+    resultados = {}
+    for tamano in tamanos:
+        texto = generar_guia(tamano)
+        num_lineas = texto.count('\n') + 1
+        print(f"\n--- {num_lineas} líneas ({len(texto.encode('utf-8')) / 1024:.0f} KB) ---")
+        for nombre, funcion in FUNCIONES.items():
+            segundos, pico = medir(funcion, texto)
+            lineas_s = num_lineas / segundos
+            resultados.setdefault(nombre, {})[str(tamano)] = {"lineas_por_segundo": round(lineas_s), "memoria_pico": pico}
+            print(f"  {nombre:<24} {lineas_s:>12,.0f} líneas/s | {segundos * 1000:9.2f} ms | pico {pico / 1024:9.0f} KB")
+    return resultados
+
+
+def comparar(resultados, linea_base, tolerancia):
+    regresiones = []
+    for nombre, por_tamano in resultados.items():
+        for tamano, actual in por_tamano.items():
+            base = linea_base.get(nombre, {}).get(tamano)
+            if not base:
+                continue
+            if actual["lineas_por_segundo"] < base["lineas_por_segundo"] * (1 - tolerancia):
+                regresiones.append(f"{nombre} @ {tamano}: {actual['lineas_por_segundo']:,} líneas/s (base {base['lineas_por_segundo']:,})")
+            if actual["memoria_pico"] > base["memoria_pico"] * (1 + tolerancia):
+                regresiones.append(f"{nombre} @ {tamano}: pico {actual['memoria_pico']:,} B (base {base['memoria_pico']:,})")
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del parser y renderizadores de la guía.")
+    parser.add_argument('--tamanos', type=int, nargs='+', default=TAMANOS)
+    parser.add_argument('--tolerancia', type=float, default=0.25, help="Empeoramiento relativo permitido (0.25 = 25%%).")
+    parser.add_argument('--actualizar-linea-base', action='store_true')
+    args = parser.parse_args()
+
+    resultados = ejecutar(args.tamanos)
+
+    if args.actualizar_linea_base:
+        with open(ARCHIVO_LINEA_BASE, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, indent=4)
+        print(f"\nLínea base guardada en {ARCHIVO_LINEA_BASE}.")
+        return
+
+    try:
+        with open(ARCHIVO_LINEA_BASE, 'r', encoding='utf-8') as f:
+            linea_base = json.load(f)
+    except OSError:
+        print("\nNo hay línea base guardada; use --actualizar-linea-base para crearla.")
+        return
+
+    regresiones = comparar(resultados, linea_base, args.tolerancia)
+    if regresiones:
+        print(f"\nERROR: {len(regresiones)} regresión(es) por encima de la tolerancia ({args.tolerancia:.0%}):")
+        for r in regresiones:
+            print(f"  - {r}")
+        sys.exit(1)
+    print("\nSin regresiones respecto a la línea base.")
+
+
+if __name__ == "__main__":
+    main()
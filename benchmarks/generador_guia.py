@@ -0,0 +1,91 @@
+"""
+Generador de guías sintéticas con los mismos patrones que el texto extraído de la fuente:
+encabezado de fecha, línea separadora de emojis, títulos con emoji, líneas de detalle,
+partidos "vs"/"va" con "a las" y listas de canales "por ... y ...", y el pie de Kaelus.
+generar_pagina_html() la envuelve en una página con la estructura de la fuente (Wix).
+"""
+import html
+import random
+
+SEPARADOR = "⚽️🏈🏀⚾️🏐🎾🥊🏒⛳️🎳"
+
+TITULOS = [
+    "⚽️ Liga MX Apertura", "⚽️ UEFA Champions League", "⚽️ Premier League 🏴󠁧󠁢󠁥󠁮󠁧󠁿",
+    "⚽️ Liga Profesional Argentina", "🏀 NBA", "🏈 NFL Sunday Night Football", "🏈 NCAA Football",
+    "⚾️ MLB Serie Mundial", "🏒 NHL", "🎾 ATP Masters 1000", "⛳️ PGA Tour", "🏎️ Fórmula 1 Gran Premio",
+    "WWE Wrestling Raw", "Evento BOX Canelo Álvarez", "🥊 UFC Fight Night",
+]
+EQUIPOS = [
+    "América", "Chivas", "Cruz Azul", "Pumas", "Tigres", "Monterrey", "Real Madrid", "Barcelona",
+    "Manchester City", "Liverpool", "Boca Juniors", "River Plate", "Lakers", "Celtics", "Warriors",
+    "Chiefs", "Cowboys", "Eagles", "Dodgers", "Yankees", "Maple Leafs", "Rangers",
+]
+CANALES = ["ESPN", "ESPN 2", "Fox Sports", "TUDN", "Canal 5", "Star+", "Max", "DAZN", "Sky Sports", "Prime Video"]
+DETALLES = ["Estadio Azteca, CDMX", "Santiago Bernabéu, Madrid", "Crypto.com Arena", "Jornada 12", "Semifinal de ida", "Función estelar"]
+HORARIOS = [
+    "7:00 pm Este / 6:00 pm Centro / 4:00 pm Pacífico",
+    "1:30 pm Este / 12:30 pm Centro / 10:30 am Pacífico",
+    "9:00 pm Este / 8:00 pm Centro / 6:00 pm Pacífico",
+    "12:00 pm Este / 11:00 am Centro",
+]
+
+
+def linea_partido(r):
+    a, b = r.sample(EQUIPOS, 2)
+    separador = r.choice([" vs ", " vs ", " va "])
+    canales = r.sample(CANALES, r.randint(1, 4))
+    lista = ", ".join(canales[:-1]) + " y " + canales[-1] if len(canales) > 1 else canales[0]
+    forma = r.random()
+    if forma < 0.6:
+        return f"{a}{separador}{b} a las {r.choice(HORARIOS)} por {lista}"
+    if forma < 0.8:
+        return f"{a}{separador}{b} {r.choice(HORARIOS)} por {lista}"
+    if forma < 0.9:
+        return f"{a}{separador}{b} a partir de las 6 pm por {lista}"
+    return f"{a}{separador}{b} a las {r.choice(HORARIOS)}"
+
+
+def generar_guia(num_lineas, semilla=2024):
+    """Devuelve un texto de aproximadamente `num_lineas` líneas, determinista para una misma semilla."""
+    r = random.Random(semilla)
+    lineas = ["Eventos Deportivos Sábado 18 de Octubre", SEPARADOR]
+    while len(lineas) < num_lineas - 2:
+        lineas.append(r.choice(TITULOS))
+        for _ in range(r.randint(1, 6)):
+            if r.random() < 0.3:
+                lineas.append(r.choice(DETALLES))
+            lineas.append(linea_partido(r))
+    lineas.append(SEPARADOR)
+    lineas.append("Kaelus Soporte 📞 Atención 24/7")
+    return "\n".join(lineas)
+
+
+def generar_pagina_html(num_lineas, semilla=2024, id_contenedor="comp-khhybsn1"):
+    """
+    Página HTML sintética con la guía dentro del contenedor: scripts y estilos antes y
+    después, párrafos con <span> y <br>, entidades, comentarios, un bloque mal anidado
+    (<p>..<div>..</p>) y ~100 KB de scripts tras el contenedor (lo que el extractor no lee).
+    """
+    r = random.Random(semilla)
+    partes = [
+        '<!DOCTYPE html><html lang="es"><head><meta charset="utf-8"><title>24 Home TV</title>',
+        '<style>.font_8{font-size:16px}</style><script>window.viewerModel={"site":"</div>"};</script>',
+        '</head><body><div id="SITE_CONTAINER"><header><div id="comp-menu"><p>Inicio</p><p>Guía</p></div></header>',
+        f'<div id="{id_contenedor}" class="wixui-rich-text" data-testid="richTextElement">',
+    ]
+    for n, linea in enumerate(generar_guia(num_lineas, semilla).split("\n")):
+        texto = html.escape(linea, quote=False)
+        if n % 17 == 5:
+            partes.append(f'<p class="font_8"><span><span style="font-weight:bold">{texto}</span></span></p>')
+        elif n % 23 == 7:
+            partes.append(f'<p class="font_8">{texto}<br></p><!-- bloque {n} -->')
+        elif n % 29 == 11:
+            partes.append(f'<p class="font_8">&nbsp;</p><p class="font_8">{texto.replace(" y ", " &amp; ", 1)}</p>')
+        else:
+            partes.append(f'<p class="font_8"><span>{texto}</span></p>')
+    partes.append('<p class="font_8">Aviso<div class="nota">horarios sujetos a cambio</p>por la transmisión</div>')
+    partes.append('</div><footer><div id="comp-pie"><p>© 24 Home TV</p></div></footer></div>')
+    for n in range(r.randint(250, 300)):
+        partes.append(f'<script type="application/json" id="wix-{n}">{{"k{n}":"{"x" * 340}"}}</script>')
+    partes.append('</body></html>')
+    return "".join(partes)
@@ -0,0 +1,49 @@
+import hashlib
+import json
+import os
+
+# --- 1. CONFIGURACIÓN ---
+DIRECTORIO_ESTADO = os.getenv('DIRECTORIO_ESTADO', '.estado')
+ARCHIVO_ESTADO_FUENTE = os.path.join(DIRECTORIO_ESTADO, 'fuente.json')
+
+
+# --- 2. ESTADO PERSISTIDO ---
+def cargar_estado(ruta=ARCHIVO_ESTADO_FUENTE):
+    """Lee el estado de la última descarga. Si no existe o está dañado se empieza de cero."""
+    try:
+        with open(ruta, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def guardar_estado(estado, ruta=ARCHIVO_ESTADO_FUENTE):
+    """Escribe el estado en un archivo temporal y lo renombra para no dejarlo a medias."""
+    os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+    temporal = f"{ruta}.tmp"
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(estado, f, indent=4, ensure_ascii=False)
+    os.replace(temporal, ruta)
+
+
+# --- 3. PETICIÓN CONDICIONAL Y HASH ---
+def cabeceras_condicionales(estado):
+    cabeceras = {}
+    if estado.get('etag'):
+        cabeceras['If-None-Match'] = estado['etag']
+    if estado.get('last_modified'):
+        cabeceras['If-Modified-Since'] = estado['last_modified']
+    return cabeceras
+
+
+def validadores_respuesta(respuesta):
+    return {
+        'etag': respuesta.headers.get('ETag'),
+        'last_modified': respuesta.headers.get('Last-Modified'),
+    }
+
+
+def hash_texto_guia(texto):
+    """Hash del texto normalizado: líneas sin espacios sobrantes y sin líneas vacías."""
+    lineas = [l.strip() for l in texto.strip().split('\n') if l.strip()]
+    return hashlib.sha256("\n".join(lineas).encode('utf-8')).hexdigest()
@@ -0,0 +1,44 @@
+import hashlib
+import os
+import time
+
+from cache_fuente import DIRECTORIO_ESTADO, cargar_estado, guardar_estado
+
+# --- 1. CONFIGURACIÓN ---
+ARCHIVO_CACHE_RANKING = os.path.join(DIRECTORIO_ESTADO, 'ranking.json')
+TTL_CACHE_RANKING = int(os.getenv('CACHE_RANKING_TTL_HORAS', '8')) * 3600
+MAX_ENTRADAS_CACHE = 8  # la guía puede ir y volver entre versiones durante el día
+
+
+# --- 2. CLAVE ---
+def normalizar_candidato(linea):
+    return " ".join(linea.split()).casefold()
+
+
+def clave_ranking(candidatos, version_prompt, modelo):
+    """
+    Hash de la lista de candidatos normalizada (sin importar el orden), la versión del
+    prompt y el modelo: cualquier cambio en alguno de los tres invalida la entrada.
+    """
+    h = hashlib.sha256(f"{version_prompt}|{modelo}\n".encode('utf-8'))
+    for linea in sorted(normalizar_candidato(c) for c in candidatos):
+        h.update(linea.encode('utf-8'))
+        h.update(b"\n")
+    return h.hexdigest()
+
+
+# --- 3. LECTURA Y ESCRITURA ---
+def buscar_ranking(clave, ttl=TTL_CACHE_RANKING, ruta=ARCHIVO_CACHE_RANKING):
+    """Devuelve la entrada guardada ({"ranking", "proveedor", "creado"}) o None si no existe o venció."""
+    entrada = cargar_estado(ruta).get(clave)
+    if not entrada or time.time() - entrada.get("creado", 0) > ttl:
+        return None
+    return entrada
+
+
+def guardar_ranking(clave, ranking, proveedor, ruta=ARCHIVO_CACHE_RANKING):
+    cache = cargar_estado(ruta)
+    cache[clave] = {"creado": int(time.time()), "proveedor": proveedor, "ranking": ranking}
+    # Se conservan solo las entradas más recientes
+    recientes = sorted(cache.items(), key=lambda kv: kv[1].get("creado", 0), reverse=True)
+    guardar_estado(dict(recientes[:MAX_ENTRADAS_CACHE]), ruta)
@@ -0,0 +1,155 @@
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+import metricas
+from cache_fuente import cabeceras_condicionales
+
+# --- 1. CONFIGURACIÓN ---
+TIMEOUT_HTTP = (10, 20)                   # (conexión, lectura) en segundos si la llamada no pasa otro
+REINTENTOS_HTTP = int(os.getenv('HTTP_REINTENTOS', '3'))
+ESPERA_BASE_HTTP = float(os.getenv('HTTP_ESPERA_BASE', '1'))
+ESPERA_MAXIMA_HTTP = 30
+ESTADOS_REINTENTABLES = {429, 500, 502, 503, 504}
+METODOS_IDEMPOTENTES = {"GET", "HEAD", "OPTIONS"}
+CONEXIONES_POR_HOST = 8                   # los lotes del ranker llaman a la IA en paralelo
+
+# --- HEADERS DE NAVEGADOR (ANTI-BLOQUEO 403) ---
+# Sin esto, 24hometv.xyz (detrás de Cloudflare) devuelve 403. Solo se mandan a ese sitio.
+HEADERS_NAVEGADOR = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/json,text/plain,*/*;q=0.8',
+    'Accept-Language': 'es-MX,es;q=0.9,en-US;q=0.8,en;q=0.7',
+    'Referer': 'https://24hometv.xyz/',
+    'Sec-Ch-Ua': '"Chromium";v="122", "Not(A:Brand";v="24", "Google Chrome";v="122"',
+    'Sec-Ch-Ua-Mobile': '?0',
+    'Sec-Ch-Ua-Platform': '"Windows"',
+}
+
+_sesiones = {}
+_candado_sesiones = threading.Lock()
+
+
+# --- 2. SESIONES ---
+def sesion_para(url):
+    """Una Session por host: la conexión TCP/TLS se reutiliza entre llamadas (keep-alive)."""
+    partes = urlsplit(url)
+    host = f"{partes.scheme}://{partes.netloc}"
+    with _candado_sesiones:
+        sesion = _sesiones.get(host)
+        if sesion is None:
+            sesion = requests.Session()
+            adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=CONEXIONES_POR_HOST)
+            sesion.mount(f"{partes.scheme}://", adaptador)
+            _sesiones[host] = sesion
+    return sesion
+
+
+def cerrar_sesiones():
+    with _candado_sesiones:
+        for sesion in _sesiones.values():
+            sesion.close()
+        _sesiones.clear()
+
+
+# --- 3. PETICIONES ---
+def _retry_after(respuesta):
+    """Segundos pedidos por el servidor: header Retry-After o `parameters.retry_after` (Telegram)."""
+    retry_after = respuesta.headers.get('Retry-After', '')
+    if retry_after.isdigit():
+        return int(retry_after)
+    try:
+        segundos = respuesta.json().get('parameters', {}).get('retry_after')
+    except (ValueError, AttributeError):
+        return None
+    return segundos if isinstance(segundos, int) and segundos >= 0 else None
+
+
+def _espera(intento, respuesta=None):
+    """Backoff exponencial con jitter completo; en 429/503 se respeta Retry-After si viene."""
+    if respuesta is not None:
+        retry_after = _retry_after(respuesta)
+        if retry_after is not None:
+            return min(retry_after, ESPERA_MAXIMA_HTTP)
+    return random.uniform(0, min(ESPERA_MAXIMA_HTTP, ESPERA_BASE_HTTP * 2 ** intento))
+
+
+def _no_enviada(fallo):
+    """
+    True solo si la petición seguro no salió: timeout o fallo al abrir la conexión (DNS,
+    conexión rechazada). Un corte después (RemoteDisconnected, reset) pudo llegar al servidor.
+    """
+    if isinstance(fallo, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(fallo, requests.exceptions.Timeout):
+        return False
+    causa = fallo.args[0] if fallo.args else None
+    return isinstance(getattr(causa, 'reason', causa), NewConnectionError)
+
+
+def peticion(metodo, url, *, navegador=False, validadores=None, reintentos=REINTENTOS_HTTP,
+             idempotente=None, timeout=TIMEOUT_HTTP, **kwargs):
+    """
+    Petición con la sesión del host, timeout por defecto y reintentos acotados ante errores
+    5xx/429, timeouts y fallos de conexión. Devuelve la última respuesta (el llamador decide
+    con raise_for_status) o relanza la última excepción.
+
+    navegador=True agrega HEADERS_NAVEGADOR; `validadores` (etag/last_modified guardados) hace
+    la petición condicional. Un POST no idempotente solo se reintenta si no llegó a enviarse
+    (ver _no_enviada) o con 429 que indica cuánto esperar: tras un timeout de lectura, un corte
+    de la conexión o un 5xx el servidor pudo haberlo procesado (p. ej. un mensaje de Telegram
+    ya enviado).
+    """
+    metodo = metodo.upper()
+    if idempotente is None:
+        idempotente = metodo in METODOS_IDEMPOTENTES
+    headers = dict(HEADERS_NAVEGADOR) if navegador else {}
+    if validadores:
+        headers.update(cabeceras_condicionales(validadores))
+    headers.update(kwargs.pop('headers', None) or {})
+
+    sesion = sesion_para(url)
+    host = urlsplit(url).netloc
+    for intento in range(reintentos + 1):
+        ultimo = intento == reintentos
+        metricas.contar("http_peticiones")
+        # Latencia acumulada por host; los fallos reintentables no cuentan como error de etapa
+        with metricas.etapa(f"http:{host}"):
+            try:
+                respuesta, fallo = sesion.request(metodo, url, headers=headers, timeout=timeout, **kwargs), None
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                respuesta, fallo = None, e
+        if fallo is not None:
+            if ultimo or not (idempotente or _no_enviada(fallo)):
+                metricas.error(f"http:{host}")
+                raise fallo
+            espera = _espera(intento)
+            print(f" -> 🔁 {metodo} {host}: {type(fallo).__name__}. Reintento {intento + 1}/{reintentos} en {espera:.1f}s...")
+        else:
+            # Sin idempotencia solo se reintenta un 429 con retry_after: el servidor confirma que
+            # no procesó nada y dice cuándo volver
+            if idempotente:
+                reintentable = respuesta.status_code in ESTADOS_REINTENTABLES
+            else:
+                reintentable = respuesta.status_code == 429 and _retry_after(respuesta) is not None
+            if not reintentable or ultimo:
+                return respuesta
+            espera = _espera(intento, respuesta)
+            respuesta.close()
+            print(f" -> 🔁 {metodo} {host}: HTTP {respuesta.status_code}. Reintento {intento + 1}/{reintentos} en {espera:.1f}s...")
+        metricas.contar("http_reintentos")
+        time.sleep(espera)
+
+
+def get(url, **kwargs):
+    return peticion("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    return peticion("POST", url, **kwargs)
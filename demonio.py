@@ -0,0 +1,352 @@
+"""
+Demonio que ejecuta el actualizador, el ranker y los envíos de Telegram en un solo proceso,
+con un planificador asyncio en lugar de un workflow (y un arranque de Python) por script.
+
+Uso:
+    python demonio.py                        # horarios por defecto (los mismos cron de los workflows, UTC)
+    python demonio.py --puerto 8080          # GET /status con el estado de cada tarea
+    python demonio.py --ahora ranker         # ejecuta una tarea al arrancar, además de su horario
+    python demonio.py --pipeline             # cada publicación con cambios dispara la tarea siguiente
+
+HORARIOS_DEMONIO puede apuntar a un JSON {"ranker": "17 */3 * * *", ...} para cambiar horarios;
+una tarea con horario vacío ("") queda desactivada.
+
+Modo pipeline: el actualizador sondea la fuente cada pocos minutos (la petición condicional
+cuesta un 304); una guía nueva dispara el ranker y una selección nueva dispara los envíos de
+Telegram, si la hora cae en VENTANA_TELEGRAM y el día en su horario. Cada envío sale como
+máximo una vez al día. Los horarios fijos siguen como respaldo.
+
+Como en actualizador-automatico.yml, el actualizador no corre si la guía publicada ya es de
+hoy (hora de México), para no pisar cambios manuales hechos en el servidor; en modo pipeline
+el sondeo solo publica hasta que aparece la guía del día. PROTEGER_GUIA_DEL_DIA=0 desactiva
+esa guarda (cada cambio de la fuente se publica, aunque sobrescriba ediciones manuales).
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import almacen_artefactos
+import cliente_http
+from cache_fuente import DIRECTORIO_ESTADO, cargar_estado, guardar_estado
+from estado_publicacion import consultar_status
+import actualizador_web
+import ranker_gemini
+import enviar_telegram
+import enviar_eventos_rankeados_telegram
+
+# --- 1. CONFIGURACIÓN ---
+# `diaria`: envíos que en modo pipeline salen una vez al día y solo dentro de VENTANA_TELEGRAM
+Tarea = namedtuple("Tarea", ["nombre", "funcion", "horario", "diaria"], defaults=(False,))
+
+# Guarda de actualizador-automatico.yml: no pisar una guía de hoy (puede tener cambios manuales)
+PROTEGER_GUIA_DEL_DIA = os.getenv('PROTEGER_GUIA_DEL_DIA', '1') != '0'
+URL_GUIA_PUBLICADA = ranker_gemini.URL_JSON_FUENTE
+
+
+def guia_publicada_es_de_hoy():
+    """
+    Fecha de la guía en el servidor (status.json o, si no la trae, events.json) contra la de
+    hoy en México. Ante cualquier error devuelve False: por seguridad se actualiza.
+    """
+    try:
+        fecha_guia = (consultar_status(URL_GUIA_PUBLICADA) or {}).get("fecha_guia")
+        if not fecha_guia:
+            respuesta = cliente_http.get(URL_GUIA_PUBLICADA, navegador=True,
+                                         params={'nocache': datetime.now().timestamp()}, timeout=15)
+            respuesta.raise_for_status()
+            fecha_guia = respuesta.json().get('fecha_guia')
+    except Exception as e:
+        print(f"❌ Error en la verificación de la guía publicada: {e}. Por seguridad, se ejecutará la actualización.")
+        return False
+    fecha_hoy = datetime.now(MEXICO_TZ).strftime('%Y-%m-%d')
+    print(f"Fecha en la Guía (Web): {fecha_guia} | Fecha de Hoy (México): {fecha_hoy}")
+    return fecha_guia == fecha_hoy
+
+
+def actualizar_guia():
+    """actualizador_web.main con la guarda de actualizador-automatico.yml (guía ya de hoy: no se toca)."""
+    if PROTEGER_GUIA_DEL_DIA and guia_publicada_es_de_hoy():
+        print("✅ La guía YA corresponde al día de hoy. Se omite la actualización para proteger cambios manuales.")
+        return False
+    return actualizador_web.main()
+
+
+TAREAS = [
+    Tarea("actualizador", actualizar_guia, "0 8,12,16,20 * * *"),
+    Tarea("ranker", ranker_gemini.main, "17 0,3,10,13,16,20 * * *"),
+    Tarea("telegram_programacion", enviar_telegram.main, "0 14 * * 6,0", diaria=True),
+    Tarea("telegram_rankeados", enviar_eventos_rankeados_telegram.main, "30 14 * * *", diaria=True),
+]
+# Modo pipeline: qué tareas encola una ejecución que devolvió True (hubo cambios)
+DISPARADORES = {
+    "actualizador": ["ranker"],
+    "ranker": ["telegram_programacion", "telegram_rankeados"],
+}
+SONDEO_FUENTE = os.getenv('SONDEO_FUENTE', "*/10 * * * *")     # horario del actualizador en modo pipeline
+VENTANA_TELEGRAM = os.getenv('VENTANA_TELEGRAM', "08:00-22:00")  # hora de México, inicio-fin
+ARCHIVO_ESTADO_DEMONIO = os.path.join(DIRECTORIO_ESTADO, 'demonio.json')
+MEXICO_TZ = ZoneInfo('America/Mexico_City')
+PUERTO_STATUS = int(os.getenv('DEMONIO_PUERTO', '8080'))
+HOST_STATUS = os.getenv('DEMONIO_HOST', '127.0.0.1')
+LIMITES_CRON = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 6)]   # minuto hora día mes día-semana (0 = domingo)
+
+
+def cargar_horarios(tareas, pipeline=False):
+    if pipeline:
+        tareas = [t._replace(horario=SONDEO_FUENTE) if t.nombre == "actualizador" else t for t in tareas]
+    ruta = os.getenv('HORARIOS_DEMONIO')
+    if not ruta:
+        return tareas
+    try:
+        with open(ruta, 'r', encoding='utf-8') as f:
+            horarios = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"ADVERTENCIA: No se pudo leer {ruta} ({e}). Se usan los horarios por defecto.")
+        return tareas
+    return [t._replace(horario=horarios.get(t.nombre, t.horario)) for t in tareas]
+
+
+# --- 2. EXPRESIONES CRON ---
+def _campo_cron(texto, minimo, maximo):
+    valores = set()
+    for parte in texto.split(','):
+        rango, _, paso = parte.partition('/')
+        if rango == '*':
+            inicio, fin = minimo, maximo
+        elif '-' in rango:
+            inicio, fin = (int(x) for x in rango.split('-'))
+        else:
+            inicio = fin = int(rango)
+        valores.update(range(inicio, fin + 1, int(paso) if paso else 1))
+    if not valores or min(valores) < minimo or max(valores) > maximo:
+        raise ValueError(f"Campo cron fuera de rango: {texto}")
+    return valores
+
+
+def parsear_cron(expresion):
+    """'m h dom mes dow' -> (conjuntos de valores, dom restringido, dow restringido)."""
+    campos = expresion.split()
+    if len(campos) != 5:
+        raise ValueError(f"Expresión cron inválida: {expresion}")
+    conjuntos = [_campo_cron(c, *limites) for c, limites in zip(campos, LIMITES_CRON)]
+    return conjuntos, campos[2] != '*', campos[4] != '*'
+
+
+def _dia_coincide(conjuntos, con_dia, con_semana, t):
+    _, _, dias, meses, dias_semana = conjuntos
+    if t.month not in meses:
+        return False
+    dia_ok = t.day in dias
+    semana_ok = (t.weekday() + 1) % 7 in dias_semana
+    # Como en cron: con día del mes y de la semana restringidos basta con cualquiera de los dos
+    return (dia_ok or semana_ok) if con_dia and con_semana else (dia_ok and semana_ok)
+
+
+def dia_programado(expresion, momento):
+    """True si la fecha de `momento` (UTC) es un día en que la expresión cron se ejecuta."""
+    return bool(expresion) and _dia_coincide(*parsear_cron(expresion), momento)
+
+
+def proxima_ejecucion(expresion, desde):
+    """Siguiente minuto (datetime UTC) posterior a `desde` que cumple la expresión cron."""
+    conjuntos, con_dia, con_semana = parsear_cron(expresion)
+    minutos, horas, _, meses, _ = conjuntos
+    t = desde.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    limite = t + timedelta(days=366 * 4)
+    while t < limite:
+        if t.month not in meses:
+            t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            continue
+        if not _dia_coincide(conjuntos, con_dia, con_semana, t):
+            t = t.replace(hour=0, minute=0) + timedelta(days=1)
+            continue
+        if t.hour not in horas:
+            t = t.replace(minute=0) + timedelta(hours=1)
+            continue
+        if t.minute not in minutos:
+            t += timedelta(minutes=1)
+            continue
+        return t
+    raise ValueError(f"La expresión cron nunca se cumple: {expresion}")
+
+
+def en_ventana(ventana, momento):
+    """'HH:MM-HH:MM' en hora de México; si el fin es menor que el inicio, cruza la medianoche."""
+    inicio, fin = (datetime.strptime(x.strip(), "%H:%M").time() for x in ventana.split('-'))
+    hora = momento.astimezone(MEXICO_TZ).time()
+    return inicio <= hora < fin if inicio <= fin else (hora >= inicio or hora < fin)
+
+
+# --- 3. PLANIFICADOR ---
+class Demonio:
+    """
+    Un bucle asyncio por tarea que, a su hora, encola la tarea; un único trabajador vacía la
+    cola y ejecuta cada una en un hilo (asyncio.to_thread), de una en una: todas escriben en
+    el directorio de trabajo y comparten el almacén de artefactos. Una tarea que ya espera en
+    la cola no se encola dos veces: los disparos simultáneos se funden en una ejecución.
+    Al vivir en el mismo proceso comparten las sesiones HTTP de cliente_http, las cachés de
+    normalizacion y la guía en memoria (AlmacenMemoria).
+    """
+
+    def __init__(self, tareas, pipeline=False):
+        self.tareas = {t.nombre: t for t in tareas}
+        self.pipeline = pipeline
+        self.estado = {t.nombre: {"horario": t.horario, "proxima": None, "ejecuciones": 0, "errores": 0,
+                                  "fusionadas": 0, "ultimo_origen": None, "ultimo_inicio": None,
+                                  "ultima_duracion": None, "ultimo_resultado": None}
+                       for t in tareas}
+        self.cola = asyncio.Queue()
+        self.pendientes = set()
+        self.en_curso = None
+        # Último día (hora de México) en que salió cada envío diario; sobrevive a reinicios
+        self.enviados = cargar_estado(ARCHIVO_ESTADO_DEMONIO)
+        self.inicio = datetime.now(timezone.utc)
+
+    def encolar(self, nombre, origen):
+        if nombre in self.pendientes:
+            self.estado[nombre]["fusionadas"] += 1
+            print(f"=== [demonio] {nombre} ya está en cola; se omite el disparo de {origen} ===")
+            return
+        self.pendientes.add(nombre)
+        self.cola.put_nowait((nombre, origen))
+
+    def disparo_permitido(self, nombre, ahora):
+        """En modo pipeline los envíos diarios solo se disparan en su día, en la ventana y una vez."""
+        tarea = self.tareas.get(nombre)
+        if tarea is None or not tarea.horario:
+            return False
+        if not tarea.diaria:
+            return True
+        return dia_programado(tarea.horario, ahora) and en_ventana(VENTANA_TELEGRAM, ahora)
+
+    def enviada_hoy(self, nombre, ahora):
+        return self.enviados.get(nombre) == ahora.astimezone(MEXICO_TZ).strftime('%Y-%m-%d')
+
+    async def ejecutar(self, nombre, origen="horario"):
+        tarea, estado = self.tareas[nombre], self.estado[nombre]
+        ahora = datetime.now(timezone.utc)
+        if self.pipeline and tarea.diaria and self.enviada_hoy(nombre, ahora):
+            print(f"=== [demonio] {nombre} ya se envió hoy; se omite ({origen}) ===")
+            estado["ultimo_resultado"] = "omitida: ya enviada hoy"
+            return
+        print(f"=== [demonio] ▶️ {nombre} ({origen}) ===")
+        estado["ultimo_origen"], estado["ultimo_inicio"] = origen, ahora.isoformat()
+        inicio = time.perf_counter()
+        cambios = False
+        try:
+            cambios = bool(await asyncio.to_thread(tarea.funcion))
+            estado["ultimo_resultado"] = "cambios" if cambios else "sin cambios"
+        except Exception as e:
+            # Un fallo no controlado no tumba al demonio: la tarea vuelve en su próximo horario
+            estado["ultimo_resultado"] = f"error: {e}"
+            estado["errores"] += 1
+            print(f"=== [demonio] ❌ {nombre} falló: {e} ===")
+        estado["ejecuciones"] += 1
+        estado["ultima_duracion"] = round(time.perf_counter() - inicio, 3)
+        print(f"=== [demonio] ⏹️ {nombre} ({estado['ultima_duracion']} s, {estado['ultimo_resultado']}) ===")
+
+        if not (self.pipeline and cambios):
+            return
+        if tarea.diaria:
+            self.enviados[nombre] = ahora.astimezone(MEXICO_TZ).strftime('%Y-%m-%d')
+            guardar_estado(self.enviados, ARCHIVO_ESTADO_DEMONIO)
+        ahora = datetime.now(timezone.utc)
+        for siguiente in DISPARADORES.get(nombre, ()):
+            if self.disparo_permitido(siguiente, ahora):
+                self.encolar(siguiente, nombre)
+
+    async def trabajador(self):
+        while True:
+            nombre, origen = await self.cola.get()
+            # Sale de pendientes antes de correr: un disparo durante la ejecución vuelve a encolarla
+            self.pendientes.discard(nombre)
+            self.en_curso = nombre
+            try:
+                await self.ejecutar(nombre, origen)
+            finally:
+                self.en_curso = None
+
+    async def bucle(self, nombre):
+        tarea = self.tareas[nombre]
+        while True:
+            proxima = proxima_ejecucion(tarea.horario, datetime.now(timezone.utc))
+            self.estado[nombre]["proxima"] = proxima.isoformat()
+            await asyncio.sleep(max(0.0, (proxima - datetime.now(timezone.utc)).total_seconds()))
+            self.encolar(nombre, "horario")
+
+    def reporte(self):
+        return {
+            "inicio": self.inicio.isoformat(),
+            "ahora": datetime.now(timezone.utc).isoformat(),
+            "pipeline": self.pipeline,
+            "en_curso": self.en_curso,
+            "cola": sorted(self.pendientes),
+            "enviados": self.enviados,
+            "tareas": self.estado,
+        }
+
+    async def atender_status(self, lector, escritor):
+        """HTTP mínimo: GET /status (o /) devuelve el reporte en JSON; lo demás, 404."""
+        try:
+            peticion = await asyncio.wait_for(lector.readline(), timeout=5)
+            while (await asyncio.wait_for(lector.readline(), timeout=5)) not in (b'\r\n', b'\n', b''):
+                pass
+            partes = peticion.decode('latin-1').split()
+            ruta = partes[1] if len(partes) > 1 else ''
+            if ruta in ('/', '/status'):
+                codigo, cuerpo = "200 OK", json.dumps(self.reporte(), ensure_ascii=False, indent=2).encode('utf-8')
+            else:
+                codigo, cuerpo = "404 Not Found", b'{"error": "no encontrado"}'
+            escritor.write(f"HTTP/1.1 {codigo}\r\nContent-Type: application/json; charset=utf-8\r\n"
+                           f"Content-Length: {len(cuerpo)}\r\nConnection: close\r\n\r\n".encode('latin-1') + cuerpo)
+            await escritor.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            escritor.close()
+
+    async def correr(self, puerto=PUERTO_STATUS, ahora=()):
+        activas = [n for n, t in self.tareas.items() if t.horario]
+        for nombre, tarea in self.tareas.items():
+            if tarea.horario:
+                parsear_cron(tarea.horario)  # un horario mal escrito falla al arrancar, no a medianoche
+            print(f" -> ⏰ {nombre}: {tarea.horario or 'desactivada'}")
+        servidor = None
+        if puerto:
+            servidor = await asyncio.start_server(self.atender_status, HOST_STATUS, puerto)
+            print(f" -> 🩺 Estado en http://{HOST_STATUS}:{puerto}/status")
+        for nombre in ahora:
+            self.encolar(nombre, "arranque")
+        try:
+            await asyncio.gather(self.trabajador(), *(self.bucle(n) for n in activas))
+        finally:
+            if servidor is not None:
+                servidor.close()
+
+
+# --- 4. ENTRADA ---
+def main():
+    parser = argparse.ArgumentParser(description="Planificador en un solo proceso para el actualizador, el ranker y Telegram.")
+    parser.add_argument('--puerto', type=int, default=PUERTO_STATUS, help="Puerto del endpoint /status (0 = sin endpoint).")
+    parser.add_argument('--ahora', nargs='*', default=[], choices=[t.nombre for t in TAREAS],
+                        help="Tareas a ejecutar una vez al arrancar.")
+    parser.add_argument('--pipeline', action='store_true',
+                        help="Encadena las tareas: guía nueva -> ranker -> Telegram (ver VENTANA_TELEGRAM).")
+    args = parser.parse_args()
+
+    # La guía y los feeds recién publicados quedan en memoria para las tareas siguientes
+    almacen_artefactos.ALMACEN = almacen_artefactos.AlmacenMemoria(almacen_artefactos.ALMACEN)
+    demonio = Demonio(cargar_horarios(TAREAS, args.pipeline), args.pipeline)
+    try:
+        asyncio.run(demonio.correr(args.puerto, args.ahora))
+    except KeyboardInterrupt:
+        print("Demonio detenido.")
+
+
+if __name__ == "__main__":
+    main()
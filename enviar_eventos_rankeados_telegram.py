@@ -1,10 +1,13 @@
-import requests
 import os
 import json
 from datetime import datetime, date
 from zoneinfo import ZoneInfo
-import re
 import random 
+import metricas
+import cliente_http
+from almacen_artefactos import obtener_json
+from estado_publicacion import leer_status, consultar_status
+from normalizacion import EMOJIS_PLANTILLA_TELEGRAM, deporte_por_emoji, escapar_markdown, escapar_markdown_completo
 
 # --- CONFIGURACIÓN Y SECRETS ---
 BOT_TOKEN = os.environ.get("TELEGRAM_BOT_TOKEN")
@@ -15,16 +18,11 @@ TELEGRAM_ALERT_CHAT_ID = os.environ.get("TELEGRAM_ALERT_CHAT_ID")
 MEXICO_TZ = ZoneInfo(os.environ.get("TZ", "America/Mexico_City")) 
 
 # --- HEADERS DE SEGURIDAD MEJORADOS ---
-HEADERS_SEGURIDAD = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
+# Se suman a cliente_http.HEADERS_NAVEGADOR: petición tipo fetch() sin caché
+HEADERS_FETCH = {
     'Accept': 'application/json, text/plain, */*',
-    'Accept-Language': 'es-MX,es;q=0.9,en-US;q=0.8,en;q=0.7',
     'Cache-Control': 'no-cache',
     'Pragma': 'no-cache',
-    'Referer': 'https://24hometv.xyz/',
-    'Sec-Ch-Ua': '"Chromium";v="122", "Not(A:Brand";v="24", "Google Chrome";v="122"',
-    'Sec-Ch-Ua-Mobile': '?0',
-    'Sec-Ch-Ua-Platform': '"Windows"',
     'Sec-Fetch-Dest': 'empty',
     'Sec-Fetch-Mode': 'cors',
     'Sec-Fetch-Site': 'same-origin'
@@ -241,17 +239,20 @@ PLANTILLAS_POR_DEPORTE = {
     ]
 }
 
+# Deporte detectado en el título de la liga -> plantillas a usar
+EMOJI_PLANTILLA_DEPORTE = {
+    "futbol": "⚽", "americano": "🏈", "beisbol": "⚾", "basquetbol": "🏀", "golf": "⛳", "hockey": "🏒",
+}
+
 # --- FUNCIONES AUXILIARES ---
 
 def enviar_alerta_telegram(token, mensaje):
     if not token or not TELEGRAM_ALERT_CHAT_ID:
         return False
     url_api = f"https://api.telegram.org/bot{token}/sendMessage"
-    def escape_for_alert(text):
-        return re.sub(r'([_*[\]()~`>#+\-=|{}.!])', r'\\\1', text)
-    payload = {'chat_id': TELEGRAM_ALERT_CHAT_ID, 'text': f"🚨 *ALERTA* 🚨\n\n{escape_for_alert(mensaje)}", 'parse_mode': 'Markdown'}
+    payload = {'chat_id': TELEGRAM_ALERT_CHAT_ID, 'text': f"🚨 *ALERTA* 🚨\n\n{escapar_markdown_completo(mensaje)}", 'parse_mode': 'Markdown'}
     try:
-        requests.post(url_api, json=payload).raise_for_status()
+        cliente_http.post(url_api, json=payload, timeout=10).raise_for_status()
         return True
     except:
         return False
@@ -265,22 +266,25 @@ def es_evento_femenino(evento):
     palabras_clave = ['FEMENIL', 'WNBA', 'NWSL', 'WOMEN', 'FEMENINO', 'LIGA MX FEMENIL', 'QUEENS LEAGUE']
     return any(k in organizador or k in descripcion for k in palabras_clave)
 
-def validar_fecha_actualizacion(url_json):
+def validar_fecha_actualizacion(url_json, status=None):
     import time
     try:
         # Pequeña espera aleatoria para evitar detección
         time.sleep(random.uniform(1, 3)) 
         
-        # Usamos una sesión para mantener cookies si fuera necesario
-        session = requests.Session()
-        respuesta = session.get(url_json, headers=HEADERS_SEGURIDAD, timeout=15)
-        
-        # Si sigue dando 403, intentamos imprimir el motivo en el log
-        if respuesta.status_code == 403:
-             print("Servidor denegó el acceso (403). Posible bloqueo de IP de GitHub o Cloudflare.")
-        
-        respuesta.raise_for_status()
-        datos = respuesta.json()
+        # Copia local del actualizador si es de hoy; si no, el sitio (sesión del host compartida)
+        hoy = datetime.now(MEXICO_TZ).date()
+        vigente = lambda d: datetime.fromisoformat(d.get("fecha_actualizacion", "")).date() == hoy
+        try:
+            # status.json trae la fecha de actualización; sin él se lee el JSON completo
+            datos = consultar_status(url_json, status)
+            if datos is None or "fecha_actualizacion" not in datos:
+                datos, _ = obtener_json(url_json, vigente=vigente, headers=HEADERS_FETCH, timeout=15)
+        except Exception as e:
+            # Si sigue dando 403, intentamos imprimir el motivo en el log
+            if getattr(getattr(e, 'response', None), 'status_code', None) == 403:
+                print("Servidor denegó el acceso (403). Posible bloqueo de IP de GitHub o Cloudflare.")
+            raise
         
         # Tu lógica de fecha...
         fecha_act_str = datos.get("fecha_actualizacion")
@@ -288,7 +292,6 @@ def validar_fecha_actualizacion(url_json):
             raise Exception("No se encontró el campo fecha_actualizacion en el JSON")
             
         fecha_act = datetime.fromisoformat(fecha_act_str).date()
-        hoy = datetime.now(MEXICO_TZ).date()
         
         if fecha_act == hoy:
             print(f"Fecha válida: {fecha_act}")
@@ -299,19 +302,18 @@ def validar_fecha_actualizacion(url_json):
     except Exception as e:
         raise Exception(f"Error validando fecha: {e}")
 
-def obtener_eventos_rankeados(url_ranking):
+def obtener_eventos_rankeados(url_ranking, status=None):
     try:
-        respuesta = requests.get(url_ranking, headers=HEADERS_SEGURIDAD, timeout=10)
-        respuesta.raise_for_status()
-        eventos = respuesta.json().get("eventos_relevantes", [])
+        hoy = datetime.now(MEXICO_TZ).date().isoformat()
+        entrada = consultar_status(url_ranking, status) or {}
+        datos, _ = obtener_json(url_ranking, vigente=lambda d: d.get("fecha_guia") == hoy, status=entrada,
+                                headers=HEADERS_FETCH, timeout=10)
+        eventos = datos.get("eventos_relevantes", [])
         return [e for e in eventos if not es_evento_femenino(e)]
     except Exception as e:
         raise Exception(f"Error obteniendo ranking: {e}")
 
 def formatear_mensaje_telegram(evento):
-    def escape_markdown(text):
-        return re.sub(r'([\[\]()~`>#+\-=|{}.!])', r'\\\1', str(text))
-
     if evento.get('partidos'):
         partido = evento['partidos'][0]
     else:
@@ -330,23 +332,15 @@ def formatear_mensaje_telegram(evento):
         texto_central = nombre_evento_principal
 
     # Extracción de datos
-    competidores = escape_markdown(texto_central)
-    horarios = escape_markdown(partido.get('horarios', 'Sin hora'))
-    canales = escape_markdown(", ".join(partido.get('canales', ['Canal Desconocido'])))
-    organizador = escape_markdown(nombre_evento_principal)
-    detalle_partido = escape_markdown(partido.get('detalle_partido', 'Sede por confirmar'))
+    competidores = escapar_markdown(texto_central)
+    horarios = escapar_markdown(partido.get('horarios', 'Sin hora'))
+    canales = escapar_markdown(", ".join(partido.get('canales', ['Canal Desconocido'])))
+    organizador = escapar_markdown(nombre_evento_principal)
+    detalle_partido = escapar_markdown(partido.get('detalle_partido', 'Sede por confirmar'))
     
     # Detección de deporte (ACTUALIZADO CON GOLF Y HOCKEY)
-    tipo_deporte = "⭐"
-    texto_para_emoji = nombre_evento_principal
-    
-    if re.search(r'(⚽|\u26BD)', texto_para_emoji): tipo_deporte = "⚽"
-    elif re.search(r'(🏈|\U0001F3C8)', texto_para_emoji): tipo_deporte = "🏈"
-    elif re.search(r'(⚾|\u26BE)', texto_para_emoji): tipo_deporte = "⚾"
-    elif re.search(r'(🏀|\U0001F3C0)', texto_para_emoji): tipo_deporte = "🏀"
-    elif re.search(r'(⛳|\u26F3)', texto_para_emoji): tipo_deporte = "⛳"  # GOLF
-    elif re.search(r'(🏒|\U0001F3D2)', texto_para_emoji): tipo_deporte = "🏒"  # HOCKEY
-    elif re.search(r'(🥊|\U0001F94A|🤼)', texto_para_emoji): tipo_deporte = "⭐" # Uso genérico para combate si no hay específico
+    # Combate, tenis, motor y el resto usan las plantillas genéricas
+    tipo_deporte = EMOJI_PLANTILLA_DEPORTE.get(deporte_por_emoji(nombre_evento_principal, EMOJIS_PLANTILLA_TELEGRAM), "⭐")
              
     # Selección de plantilla
     es_weekend = es_fin_de_semana()
@@ -376,43 +370,57 @@ def enviar_mensaje_telegram(token, chat_id, mensaje):
     url = f"https://api.telegram.org/bot{token}/sendMessage"
     payload = {'chat_id': chat_id, 'text': mensaje, 'parse_mode': 'Markdown'}
     try:
-        r = requests.post(url, json=payload, timeout=20)
+        r = cliente_http.post(url, json=payload, timeout=20)
         r.raise_for_status()
         return True
     except Exception as e:
         print(f"Error enviando mensaje: {e}")
         return False
 
+@metricas.instrumentar("enviar_eventos_rankeados_telegram")
 def main():
+    """Devuelve True si se envió al menos un evento."""
     if not (BOT_TOKEN and CHAT_ID and URL_VALIDACION and URL_RANKING and TELEGRAM_ALERT_CHAT_ID):
         print("Faltan secrets.")
-        return
+        metricas.error("configuracion")
+        return False
 
     print("--- INICIANDO ENVÍO ---")
     
     try:
-        if not validar_fecha_actualizacion(URL_VALIDACION): return
+        with metricas.etapa("validacion"):
+            # Un solo status.json por ejecución (si el ranking está en el mismo directorio)
+            status = leer_status(URL_VALIDACION)
+            valida = validar_fecha_actualizacion(URL_VALIDACION, status)
+        if not valida:
+            metricas.contar("guia_desactualizada")
+            return False
     except Exception as e:
-        print(e); enviar_alerta_telegram(BOT_TOKEN, str(e)); return
+        print(e); enviar_alerta_telegram(BOT_TOKEN, str(e)); return False
 
     try:
-        eventos = obtener_eventos_rankeados(URL_RANKING)
+        with metricas.etapa("ranking"):
+            eventos = obtener_eventos_rankeados(URL_RANKING, status)
     except Exception as e:
-        print(e); enviar_alerta_telegram(BOT_TOKEN, str(e)); return
+        print(e); enviar_alerta_telegram(BOT_TOKEN, str(e)); return False
     
-    if not eventos: print("Sin eventos."); return
+    if not eventos: print("Sin eventos."); return False
         
     print(f"Enviando {len(eventos[:5])} eventos...")
     enviados = 0
-    for i, evento in enumerate(eventos[:5]): 
-        msg = formatear_mensaje_telegram(evento)
-        if enviar_mensaje_telegram(BOT_TOKEN, CHAT_ID, msg):
-            enviados += 1
-            print(f"Evento {i+1} enviado.")
-        else:
-            enviar_alerta_telegram(BOT_TOKEN, f"Fallo envío Evento {i+1}")
+    with metricas.etapa("envio"):
+        for i, evento in enumerate(eventos[:5]): 
+            msg = formatear_mensaje_telegram(evento)
+            if enviar_mensaje_telegram(BOT_TOKEN, CHAT_ID, msg):
+                enviados += 1
+                print(f"Evento {i+1} enviado.")
+            else:
+                metricas.error("envio")
+                enviar_alerta_telegram(BOT_TOKEN, f"Fallo envío Evento {i+1}")
+    metricas.contar("mensajes_enviados", enviados)
             
     print(f"Finalizado. Enviados: {enviados}")
+    return enviados > 0
 
 if __name__ == "__main__":
     main()
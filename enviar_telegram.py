@@ -3,6 +3,10 @@ import json
 import os
 from datetime import datetime
 import pytz 
+import metricas
+import cliente_http
+from almacen_artefactos import obtener_json, obtener_texto
+from estado_publicacion import leer_status, consultar_status
 
 # --- CONFIGURACIÓN Y SECRETS ---
 URL_JSON_FUENTE = "https://24hometv.xyz/events.json" 
@@ -11,32 +15,23 @@ BOT_TOKEN = os.environ.get("TELEGRAM_BOT_TOKEN")
 CHAT_ID = os.environ.get("TELEGRAM_CHAT_ID")
 MEXICO_TZ = pytz.timezone("America/Mexico_City") 
 
-# --- HEADERS ANTI-BLOQUEO (CRÍTICO) ---
-# Sin esto, el servidor devuelve error 403
-HEADERS_SEGURIDAD = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-    'Accept': 'text/html,application/xhtml+xml,application/json,xml;q=0.9,*/*;q=0.8',
-    'Accept-Language': 'es-ES,es;q=0.9,en;q=0.8',
-    'Referer': 'https://24hometv.xyz/',
-    'Connection': 'keep-alive'
-}
-
-def obtener_mensaje_web(url):
+def obtener_mensaje_web(url, status=None):
     """
-    Descarga el contenido del archivo de texto plano.
+    Descarga el contenido del archivo de texto plano (`status`: el ya leído con leer_status).
     """
     if not url:
         print("Error: La URL del mensaje TXT no está configurada.")
         return None
         
     try:
-        # AGREGAMOS HEADERS AQUÍ
-        respuesta = requests.get(url, headers=HEADERS_SEGURIDAD, timeout=20)
-        respuesta.raise_for_status()
-        respuesta.encoding = 'utf-8' 
-        return respuesta.text.strip()
+        # Copia local del actualizador o, si no hay, descarga con headers de navegador (sin ellos: 403)
+        with metricas.etapa("descarga_mensaje"):
+            # Con el hash de status.json la copia local vale aunque tenga horas
+            entrada = consultar_status(url, status) or {}
+            texto, _ = obtener_texto(url, status=entrada, timeout=20)
+        return texto.strip()
 
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, ValueError) as e:
         print(f"Error al obtener el mensaje de la web desde {url}: {e}")
         return None
 
@@ -58,9 +53,11 @@ def enviar_mensaje_telegram(token, chat_id, mensaje):
     }
     
     try:
-        # Telegram no necesita los headers de seguridad del servidor web, pero sí un timeout
-        respuesta = requests.post(url_api, json=payload, timeout=20) 
-        respuesta.raise_for_status()
+        # Telegram no necesita los headers de navegador del servidor web, pero sí un timeout
+        with metricas.etapa("envio_telegram"):
+            respuesta = cliente_http.post(url_api, json=payload, timeout=20)
+            respuesta.raise_for_status()
+        metricas.contar("mensajes_enviados")
         print(f"Mensaje enviado a Telegram con éxito.")
         return True
     except requests.exceptions.RequestException as e:
@@ -71,43 +68,49 @@ def enviar_mensaje_telegram(token, chat_id, mensaje):
             pass
         return False
 
+@metricas.instrumentar("enviar_telegram")
 def main():
+    """Devuelve True si el mensaje se envió."""
     print("Iniciando proceso de envío de mensaje a Telegram...")
     
     try:
-        print(f"1. Descargando {URL_JSON_FUENTE} para validar fecha...")
-        # AGREGAMOS HEADERS AQUÍ TAMBIÉN
-        respuesta = requests.get(URL_JSON_FUENTE, headers=HEADERS_SEGURIDAD, params={'v': datetime.now().timestamp()}, timeout=20)
-        respuesta.raise_for_status()
-        datos = respuesta.json()
+        print(f"1. Consultando la fecha de {URL_JSON_FUENTE}...")
+        hoy_mexico_str = datetime.now(MEXICO_TZ).strftime('%Y-%m-%d')
+        with metricas.etapa("validacion"):
+            # status.json basta para la fecha; sin él se lee events.json completo
+            status = leer_status(URL_JSON_FUENTE)
+            datos = consultar_status(URL_JSON_FUENTE, status)
+            if datos is None or "fecha_guia" not in datos:
+                datos, _ = obtener_json(URL_JSON_FUENTE, vigente=lambda d: d.get("fecha_guia") == hoy_mexico_str, timeout=20)
         
         # --- LÓGICA DE VALIDACIÓN DE FECHA ---
         fecha_guia_str = datos.get("fecha_guia")
         if not fecha_guia_str:
             print("ERROR: No se encontró la etiqueta 'fecha_guia' en events.json. Proceso detenido.")
-            return
-
-        hoy_mexico_str = datetime.now(MEXICO_TZ).strftime('%Y-%m-%d')
+            metricas.error("validacion")
+            return False
 
         if fecha_guia_str != hoy_mexico_str:
             print(f"ADVERTENCIA: La fecha de la guía ({fecha_guia_str}) no es la de hoy ({hoy_mexico_str}). No se enviará el mensaje.")
-            return
+            metricas.contar("guia_desactualizada")
+            return False
         
         print(f"Fecha de la guía ({fecha_guia_str}) confirmada. Procediendo a enviar mensaje.")
         # --- FIN DE LA LÓGICA DE VALIDACIÓN ---
 
     except Exception as e:
         print(f"ERROR FATAL al leer o validar el archivo JSON: {e}")
-        return
+        return False
 
     # Si la validación de fecha fue exitosa, continuamos
-    mensaje = obtener_mensaje_web(URL_MENSAJE_TXT)
+    mensaje = obtener_mensaje_web(URL_MENSAJE_TXT, status)
     
     if mensaje:
         print(f"Mensaje obtenido (Longitud: {len(mensaje)}). Enviando a Telegram...")
-        enviar_mensaje_telegram(BOT_TOKEN, CHAT_ID, mensaje)
-    else:
-        print("No se pudo obtener el mensaje para enviar.")
+        return enviar_mensaje_telegram(BOT_TOKEN, CHAT_ID, mensaje)
+    print("No se pudo obtener el mensaje para enviar.")
+    metricas.error("descarga_mensaje")
+    return False
 
 if __name__ == "__main__":
     main()
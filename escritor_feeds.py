@@ -0,0 +1,77 @@
+from collections import namedtuple
+
+from modelo_eventos import entrada_feed
+from salida_json import serializar_json, escribir_json_publicable
+
+# --- 1. CONFIGURACIÓN ---
+# Un feed por archivo. `limite` es un entero o una función de la fecha (p. ej. Web: 3 o 5);
+# `limpiar` es None para publicar los textos tal cual; `diario` marca los feeds que solo se
+# generan cuando el publicado no es de hoy. Un destino nuevo es una fila más en la tabla.
+DestinoFeed = namedtuple("DestinoFeed", ["archivo", "limite", "limpiar", "diario"], defaults=(None, False))
+
+
+def limite_destino(destino, fecha):
+    return destino.limite(fecha) if callable(destino.limite) else destino.limite
+
+
+# --- 2. ENTRADAS ---
+class _Entradas:
+    """
+    Entradas de la selección calculadas a demanda y una sola vez por variante (cruda o
+    limpia): todos los feeds son prefijos de la misma lista, así que Legacy, Fire y Web
+    comparten los mismos fragmentos ya serializados.
+    """
+
+    def __init__(self, seleccion):
+        self.seleccion = seleccion
+        self.dicts = {}
+        self.fragmentos = {}
+
+    def dict(self, posicion, limpiar):
+        clave = (posicion, limpiar)
+        if clave not in self.dicts:
+            evento, partido = self.seleccion[posicion]
+            self.dicts[clave] = entrada_feed(evento, partido, limpiar) if limpiar else entrada_feed(evento, partido)
+        return self.dicts[clave]
+
+    def fragmento(self, posicion, limpiar):
+        clave = (posicion, limpiar)
+        if clave not in self.fragmentos:
+            self.fragmentos[clave] = serializar_json(self.dict(posicion, limpiar))
+        return self.fragmentos[clave]
+
+
+# --- 3. ESCRITURA ---
+def _contenido(entradas, n, limpiar, fecha_actualizacion, fecha_guia, pretty):
+    if pretty:
+        return serializar_json({
+            "fecha_actualizacion": fecha_actualizacion,
+            "fecha_guia": fecha_guia,
+            "eventos_relevantes": [entradas.dict(i, limpiar) for i in range(n)],
+        }, pretty=True)
+    # Minificado: se ensambla con los fragmentos ya serializados (mismo texto que json.dumps del dict)
+    partes = [
+        '{"fecha_actualizacion":', serializar_json(fecha_actualizacion),
+        ',"fecha_guia":', serializar_json(fecha_guia),
+        ',"eventos_relevantes":[',
+        ",".join(entradas.fragmento(i, limpiar) for i in range(n)),
+        ']}',
+    ]
+    return "".join(partes)
+
+
+def escribir_feeds(destinos, seleccion, fecha, fecha_guia, pretty=False):
+    """
+    Escribe cada destino con las primeras `limite` entradas de `seleccion` (lista de
+    (Evento, Partido)). `fecha` es el datetime de la ejecución. Devuelve los archivos escritos
+    (incluidas las copias .gz/.br) para publicarlos.
+    """
+    entradas = _Entradas(seleccion)
+    fecha_actualizacion = fecha.isoformat()
+    archivos = []
+    for destino in destinos:
+        n = min(limite_destino(destino, fecha), len(seleccion))
+        contenido = _contenido(entradas, n, destino.limpiar, fecha_actualizacion, fecha_guia, pretty)
+        archivos += escribir_json_publicable(destino.archivo, contenido)
+        print(f" -> 💾 Generado: {destino.archivo} ({n} eventos)")
+    return archivos
@@ -0,0 +1,101 @@
+import json
+import os
+from datetime import datetime
+from urllib.parse import urljoin, urlsplit
+from zoneinfo import ZoneInfo
+
+import metricas
+import cliente_http
+from almacen_artefactos import EXTENSIONES_OMITIDAS
+from publicador_ftp import hash_archivo, leer_json_remoto, subir_atomico, cerrar_conexion
+from salida_json import serializar_json
+
+# --- 1. CONFIGURACIÓN ---
+# status.json: fecha de la guía, hora de actualización, hash y tamaño de cada archivo publicado.
+# Pesa menos de 1 KB; quien solo necesita saber si algo es de hoy o si cambió lee esto.
+ARCHIVO_STATUS = "status.json"
+ARCHIVO_GUIA = "events.json"
+CAMPOS_FECHA = ("fecha_guia", "fecha_actualizacion")
+MEXICO_TZ = ZoneInfo('America/Mexico_City')  # zoneinfo: los envíos no instalan pytz
+
+
+# --- 2. PUBLICACIÓN (actualizador y ranker) ---
+def describir_archivo(ruta):
+    """Hash, tamaño y, si es un JSON con ellas, fecha de guía y de actualización."""
+    entrada = {"sha256": hash_archivo(ruta), "bytes": os.path.getsize(ruta)}
+    if ruta.endswith('.json'):
+        try:
+            with open(ruta, 'r', encoding='utf-8') as f:
+                datos = json.load(f)
+        except (OSError, ValueError):
+            datos = None
+        if isinstance(datos, dict):
+            entrada.update({c: datos[c] for c in CAMPOS_FECHA if c in datos})
+    return entrada
+
+
+def armar_status(archivos):
+    return {
+        "fecha_guia": archivos.get(ARCHIVO_GUIA, {}).get("fecha_guia"),
+        "fecha_actualizacion": datetime.now(MEXICO_TZ).isoformat(),
+        "archivos": archivos,
+    }
+
+
+def publicar_status(conectar, rutas):
+    """
+    Agrega al status.json del servidor las entradas de `rutas` (sin las variantes .gz/.br),
+    conservando las de los otros publicadores, y lo sube de forma atómica. Se llama después
+    de subir los archivos, para no anunciar nada que aún no esté publicado.
+    Devuelve la ruta local del status escrito, o None si no se pudo publicar.
+    """
+    entradas = {os.path.basename(r): describir_archivo(r) for r in rutas if not r.endswith(EXTENSIONES_OMITIDAS)}
+    try:
+        ftp = conectar()
+        try:
+            previo = leer_json_remoto(ftp, ARCHIVO_STATUS) or {}
+            status = armar_status({**previo.get("archivos", {}), **entradas})
+            contenido = serializar_json(status).encode('utf-8')
+            subir_atomico(ftp, contenido, ARCHIVO_STATUS)
+        finally:
+            cerrar_conexion(ftp)
+    except Exception as e:
+        print(f" -> ⚠️ No se pudo publicar {ARCHIVO_STATUS}: {e}")
+        metricas.error("status")
+        return None
+    with open(ARCHIVO_STATUS, 'wb') as f:
+        f.write(contenido)
+    print(f" -> 📋 {ARCHIVO_STATUS} actualizado ({len(contenido)} bytes, {len(status['archivos'])} archivos).")
+    return ARCHIVO_STATUS
+
+
+# --- 3. CONSULTA (verificaciones de frescura) ---
+def leer_status(url_archivo):
+    """
+    status.json del directorio de `url_archivo`, pedido siempre al servidor (nunca al
+    almacén): es la referencia contra la que se validan las copias locales. Se lee una vez
+    por ejecución y se pasa a consultar_status. Si no se pudo leer, sin entradas.
+    """
+    url_status = urljoin(url_archivo, ARCHIVO_STATUS)
+    try:
+        respuesta = cliente_http.get(url_status, navegador=True, params={'v': datetime.now().timestamp()}, timeout=10)
+        respuesta.raise_for_status()
+        status = respuesta.json()
+        archivos = status.get("archivos", {}) if isinstance(status, dict) else {}
+    except Exception as e:
+        print(f" -> ℹ️ No se pudo leer {ARCHIVO_STATUS} ({e}). Se revisará el archivo completo.")
+        archivos = {}
+    return {"url": url_status, "archivos": archivos if isinstance(archivos, dict) else {}}
+
+
+def consultar_status(url_archivo, status=None):
+    """
+    Entrada de status.json para `url_archivo`: {"sha256", "bytes", "fecha_guia",
+    "fecha_actualizacion"}. None si no hay status o no incluye el archivo; en ese caso el
+    llamador lee el archivo completo como antes. `status` es lo devuelto por leer_status;
+    si falta o es de otro directorio, se pide al servidor.
+    """
+    if status is None or status["url"] != urljoin(url_archivo, ARCHIVO_STATUS):
+        status = leer_status(url_archivo)
+    entrada = status["archivos"].get(os.path.basename(urlsplit(url_archivo).path))
+    return entrada if isinstance(entrada, dict) else None
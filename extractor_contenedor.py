@@ -0,0 +1,158 @@
+import codecs
+from html.parser import HTMLParser
+
+import metricas
+
+# --- 1. CONFIGURACIÓN ---
+TAMANO_FRAGMENTO = 16 * 1024
+# Igual que BeautifulSoup: el texto de estas etiquetas no forma parte de get_text()
+ETIQUETAS_SIN_TEXTO = {"script", "style", "template"}
+# Etiquetas sin cierre (las mismas que el árbol de BeautifulSoup con html.parser)
+ETIQUETAS_VACIAS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "keygen", "link", "menuitem", "meta",
+    "param", "source", "track", "wbr", "basefont", "bgsound", "command", "frame", "image", "isindex",
+    "nextid", "spacer",
+}
+
+
+# --- 2. PARSER INCREMENTAL ---
+class ExtractorContenedor(HTMLParser):
+    """
+    Recolecta solo los nodos de texto del primer <div id=...> y se detiene al cerrarse.
+    Lleva la pila de etiquetas abiertas como el árbol de BeautifulSoup: un cierre cierra
+    también lo abierto después de su etiqueta (<p>a<div>b</p> cierra el div) y un cierre sin
+    apertura se ignora, así el HTML mal anidado termina el contenedor en el mismo punto.
+    """
+
+    def __init__(self, id_contenedor, etiqueta="div"):
+        super().__init__(convert_charrefs=True)
+        self.id_contenedor = id_contenedor
+        self.etiqueta = etiqueta
+        self.dentro = False
+        self.terminado = False
+        self.pila = []
+        self.sin_texto = 0
+        # Como BeautifulSoup: <br> se cierra solo y el siguiente </br> se descarta (sin cortar el texto)
+        self.vacias_cerradas = []
+        self.textos = []
+        self._pendiente = []
+
+    def _volcar(self):
+        # BeautifulSoup une los fragmentos de texto contiguos antes de aplicar strip()
+        if self._pendiente:
+            texto = "".join(self._pendiente).strip()
+            if texto:
+                self.textos.append(texto)
+            self._pendiente = []
+
+    def _abrir(self, tag):
+        self.pila.append(tag)
+        if tag in ETIQUETAS_SIN_TEXTO:
+            self.sin_texto += 1
+
+    def handle_starttag(self, tag, attrs):
+        if self.terminado:
+            return
+        if not self.dentro:
+            if tag == self.etiqueta and dict(attrs).get("id") == self.id_contenedor:
+                self.dentro = True
+                self.pila = [tag]
+            elif tag in ETIQUETAS_VACIAS:
+                self.vacias_cerradas.append(tag)
+            return
+        self._volcar()
+        if tag in ETIQUETAS_VACIAS:
+            self.vacias_cerradas.append(tag)
+        else:
+            self._abrir(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        # <tag/> abre y cierra a la vez (sin tocar los cierres pendientes de <br>)
+        if self.terminado:
+            return
+        if self.dentro:
+            self._volcar()
+        elif tag == self.etiqueta and dict(attrs).get("id") == self.id_contenedor:
+            self.dentro = self.terminado = True   # <div id=... />: contenedor vacío
+
+    def handle_endtag(self, tag):
+        if tag in self.vacias_cerradas:
+            self.vacias_cerradas.remove(tag)
+            return
+        if not self.dentro or self.terminado:
+            return
+        self._volcar()
+        if tag not in self.pila:
+            return
+        while True:
+            cerrada = self.pila.pop()
+            if cerrada in ETIQUETAS_SIN_TEXTO:
+                self.sin_texto -= 1
+            if cerrada == tag:
+                break
+        if not self.pila:
+            self.terminado = True
+
+    def handle_data(self, data):
+        if self.dentro and not self.terminado and not self.sin_texto:
+            self._pendiente.append(data)
+
+    def handle_comment(self, data):
+        if self.dentro and not self.terminado:
+            self._volcar()
+
+    def texto(self):
+        self._volcar()
+        return "\n".join(self.textos)
+
+
+# --- 3. FUNCIONES DE EXTRACCIÓN ---
+def extraer_texto_contenedor(fragmentos, id_contenedor, codificacion="utf-8"):
+    """
+    Alimenta el parser con fragmentos (bytes o str) y devuelve el mismo texto que
+    get_text(separator='\\n', strip=True) sobre el contenedor. Deja de leer en cuanto
+    el contenedor se cierra. Devuelve None si el contenedor no aparece.
+    """
+    extractor = ExtractorContenedor(id_contenedor)
+    decodificador = codecs.getincrementaldecoder(codificacion)(errors="replace")
+    for fragmento in fragmentos:
+        if isinstance(fragmento, bytes):
+            fragmento = decodificador.decode(fragmento)
+        extractor.feed(fragmento)
+        if extractor.terminado:
+            break
+    else:
+        extractor.feed(decodificador.decode(b"", final=True))
+        extractor.close()
+
+    if not extractor.dentro:
+        return None
+    return extractor.texto()
+
+
+def codificacion_respuesta(respuesta):
+    """Toma el charset del Content-Type; sin él se asume UTF-8 (no el ISO-8859-1 de requests)."""
+    tipo = respuesta.headers.get("Content-Type", "")
+    for parte in tipo.split(";"):
+        parte = parte.strip()
+        if parte.lower().startswith("charset="):
+            return parte.split("=", 1)[1].strip("\"' ") or "utf-8"
+    return "utf-8"
+
+
+def _contar_bytes(fragmentos):
+    for fragmento in fragmentos:
+        metricas.contar("bytes_descargados", len(fragmento))
+        yield fragmento
+
+
+def descargar_texto_contenedor(respuesta, id_contenedor):
+    """Lee una respuesta de requests abierta con stream=True y la cierra al terminar."""
+    try:
+        return extraer_texto_contenedor(
+            _contar_bytes(respuesta.iter_content(chunk_size=TAMANO_FRAGMENTO)),
+            id_contenedor,
+            codificacion_respuesta(respuesta),
+        )
+    finally:
+        respuesta.close()
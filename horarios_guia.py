@@ -0,0 +1,86 @@
+import hashlib
+import os
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+# --- 1. CONFIGURACIÓN ---
+# "7:00 pm Este / 6:00 pm Centro / 4:00 pm Pacífico" sigue los husos de EE. UU.
+ZONAS_HORARIAS = {
+    "Este": ZoneInfo("America/New_York"),
+    "Centro": ZoneInfo("America/Chicago"),
+    "Pacífico": ZoneInfo("America/Los_Angeles"),
+}
+# Un horario antes de esta hora se interpreta como la madrugada del día siguiente
+HORA_CORTE_MADRUGADA = 5
+# Duración supuesta de un evento para darlo por terminado (no viene en la guía)
+DURACION_ESTIMADA_EVENTO = int(os.getenv('DURACION_ESTIMADA_EVENTO_MIN', '180')) * 60
+
+REGEX_HORARIO = re.compile(
+    r'(?P<hora>\d{1,2})(?::(?P<minuto>\d{2}))?\s*'
+    r'(?P<ampm>(?i:[ap]\.?\s?m\b\.?))?\s*'
+    r'(?:(?i:hrs?)\.?\s*)?(?:(?i:tiempo|hora)\s+(?i:del)\s+)?'
+    r'(?P<zona>Este|Centro|Pac[ií]fico)\b'
+)
+
+
+# --- 2. PARSEO DE HORARIOS ---
+def normalizar_zona(zona):
+    return "Pacífico" if zona.startswith("Pac") else zona
+
+
+def parsear_horarios(texto_horarios):
+    """Devuelve {"Este": "19:00", "Centro": "18:00", ...} con los horarios reconocidos."""
+    inicio = {}
+    for m in REGEX_HORARIO.finditer(texto_horarios or ""):
+        hora, minuto = int(m.group("hora")), int(m.group("minuto") or 0)
+        ampm = (m.group("ampm") or "").lower().replace(".", "").replace(" ", "")
+        if ampm == "pm" and hora < 12:
+            hora += 12
+        elif ampm == "am" and hora == 12:
+            hora = 0
+        if hora > 23 or minuto > 59:
+            continue
+        inicio.setdefault(normalizar_zona(m.group("zona")), f"{hora:02d}:{minuto:02d}")
+    return inicio
+
+
+def calcular_inicio_utc(fecha_guia, inicio):
+    """Epoch UTC del inicio tomando la primera zona reconocida, o None si no se puede calcular."""
+    if not fecha_guia or not inicio:
+        return None
+    try:
+        dia = datetime.strptime(fecha_guia, "%Y-%m-%d")
+    except ValueError:
+        return None
+    for zona, tz in ZONAS_HORARIAS.items():
+        if zona in inicio:
+            hora, minuto = map(int, inicio[zona].split(":"))
+            local = dia.replace(hour=hora, minute=minuto)
+            if hora < HORA_CORTE_MADRUGADA:
+                local += timedelta(days=1)
+            return int(local.replace(tzinfo=tz).astimezone(timezone.utc).timestamp())
+    return None
+
+
+def partido_terminado(inicio_utc, ahora=None, duracion=DURACION_ESTIMADA_EVENTO):
+    """True si ya pasó la duración estimada desde el inicio. Sin hora conocida nunca se da por terminado."""
+    if inicio_utc is None:
+        return False
+    ahora = time.time() if ahora is None else ahora
+    return inicio_utc + duracion < ahora
+
+
+# --- 3. IDS ---
+def generar_id_partido(organizador, descripcion, horarios, usados):
+    """Id corto y estable: depende solo del texto del partido, no del orden de la guía."""
+    base = "|".join([organizador, descripcion, horarios])
+    id_partido = hashlib.sha1(base.encode("utf-8")).hexdigest()[:8]
+    sufijo = 1
+    candidato = id_partido
+    while candidato in usados:
+        sufijo += 1
+        candidato = f"{id_partido}-{sufijo}"
+    usados.add(candidato)
+    return candidato
@@ -0,0 +1,84 @@
+import re
+import unicodedata
+from collections import defaultdict
+
+# --- 1. CONFIGURACIÓN ---
+# Fracción mínima de tokens compartidos para aceptar una coincidencia aproximada
+UMBRAL_COINCIDENCIA = 0.8
+PALABRAS_VACIAS = {"vs", "va", "v", "de", "del", "la", "el", "los", "las", "y", "en", "a", "al", "at", "the"}
+REGEX_NO_ALFANUMERICO = re.compile(r'[^0-9a-z]+')
+
+
+# --- 2. NORMALIZACIÓN ---
+def normalizar_texto(texto):
+    """Minúsculas, sin acentos, sin emojis ni puntuación: "⚽️ América vs. Chivas" -> "america vs chivas"."""
+    descompuesto = unicodedata.normalize('NFKD', texto or "")
+    sin_marcas = "".join(c for c in descompuesto if not unicodedata.combining(c))
+    return REGEX_NO_ALFANUMERICO.sub(' ', sin_marcas.casefold()).strip()
+
+
+def tokens_texto(texto_normalizado):
+    return {t for t in texto_normalizado.split() if t not in PALABRAS_VACIAS}
+
+
+# --- 3. ÍNDICE ---
+class IndicePartidos:
+    """
+    Índice construido una vez por ejecución: descripción normalizada -> elementos y
+    token -> elementos. Buscar cuesta O(tokens de la línea + candidatos que comparten
+    algún token) en lugar de recorrer toda la guía.
+    """
+
+    def __init__(self):
+        self.valores = []
+        self.claves = []          # clave de deduplicación de cada elemento (p. ej. la descripción)
+        self.tokens = []
+        self.literales = defaultdict(list)
+        self.exactos = defaultdict(list)
+        self.por_token = defaultdict(list)
+
+    def agregar(self, valor, descripcion, extras=(), clave=None):
+        posicion = len(self.valores)
+        normalizada = normalizar_texto(descripcion)
+        tokens = tokens_texto(normalizada)
+        for extra in extras:
+            tokens |= tokens_texto(normalizar_texto(extra))
+        self.valores.append(valor)
+        self.claves.append(descripcion if clave is None else clave)
+        self.tokens.append(tokens)
+        self.literales[descripcion].append(posicion)
+        if normalizada:
+            self.exactos[normalizada].append(posicion)
+        for token in tokens:
+            self.por_token[token].append(posicion)
+
+    def buscar(self, texto, usados=(), umbral=UMBRAL_COINCIDENCIA):
+        """
+        Devuelve el primer elemento (en orden de inserción) cuya descripción es igual a
+        `texto`, tal cual o normalizada; si no hay, el de mayor coincidencia de tokens por encima del umbral.
+        Los elementos cuya clave está en `usados` se saltan. None si nada coincide.
+        """
+        normalizado = normalizar_texto(texto)
+        for exactos in (self.literales.get(texto, ()), self.exactos.get(normalizado, ())):
+            for posicion in exactos:
+                if self.claves[posicion] not in usados:
+                    return self.valores[posicion]
+
+        consulta = tokens_texto(normalizado)
+        if not consulta:
+            return None
+        comunes = defaultdict(int)
+        for token in consulta:
+            for posicion in self.por_token.get(token, ()):
+                comunes[posicion] += 1
+        mejor, mejor_puntaje = None, (0.0, 0.0)
+        for posicion, n in sorted(comunes.items()):
+            if self.claves[posicion] in usados:
+                continue
+            # Coeficiente de solapamiento (uno de los dos textos casi contenido en el otro,
+            # como el criterio de subcadena anterior); desempata Dice y después el orden de la guía
+            propios = len(self.tokens[posicion])
+            puntaje = (n / min(len(consulta), propios), 2 * n / (len(consulta) + propios))
+            if puntaje[0] >= umbral and puntaje > mejor_puntaje:
+                mejor, mejor_puntaje = posicion, puntaje
+        return None if mejor is None else self.valores[mejor]
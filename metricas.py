@@ -0,0 +1,195 @@
+import contextvars
+import functools
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# --- 1. CONFIGURACIÓN ---
+DIRECTORIO_METRICAS = os.getenv('DIRECTORIO_METRICAS', os.path.join(os.getenv('DIRECTORIO_ESTADO', '.estado'), 'metricas'))
+ARCHIVO_HISTORIAL = 'historial.jsonl'
+MAX_HISTORIAL = 200          # ejecuciones por script usadas para p50/p95
+PREFIJO_PROMETHEUS = 'iptv'
+
+
+# --- 2. EJECUCIÓN INSTRUMENTADA ---
+class Ejecucion:
+    """Tiempos por etapa, contadores y errores de una ejecución de un script."""
+
+    def __init__(self, script):
+        self.script = script
+        self.inicio = time.time()
+        self.etapas = {}
+        self.contadores = {}
+        self.errores = {}
+        self.exito = True
+
+    @contextmanager
+    def etapa(self, nombre):
+        inicio = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.error(nombre)
+            raise
+        finally:
+            self.etapas[nombre] = self.etapas.get(nombre, 0.0) + time.perf_counter() - inicio
+
+    def contar(self, nombre, valor=1):
+        self.contadores[nombre] = self.contadores.get(nombre, 0) + valor
+
+    def error(self, nombre):
+        self.errores[nombre] = self.errores.get(nombre, 0) + 1
+        self.exito = False
+
+    def reporte(self):
+        return {
+            "script": self.script,
+            "fecha": datetime.fromtimestamp(self.inicio).isoformat(),
+            "duracion_total": round(time.time() - self.inicio, 4),
+            "exito": self.exito,
+            "etapas": {k: round(v, 4) for k, v in self.etapas.items()},
+            "contadores": self.contadores,
+            "errores": self.errores,
+        }
+
+
+_ejecucion_actual = contextvars.ContextVar('ejecucion_actual', default=None)
+
+
+# --- 3. API PARA LOS SCRIPTS ---
+@contextmanager
+def etapa(nombre):
+    ejecucion = _ejecucion_actual.get()
+    if ejecucion is None:
+        yield
+        return
+    with ejecucion.etapa(nombre):
+        yield
+
+
+def contar(nombre, valor=1):
+    ejecucion = _ejecucion_actual.get()
+    if ejecucion is not None:
+        ejecucion.contar(nombre, valor)
+
+
+def error(nombre):
+    ejecucion = _ejecucion_actual.get()
+    if ejecucion is not None:
+        ejecucion.error(nombre)
+
+
+def instrumentar(script):
+    """Decorador para main(): abre la ejecución y escribe los reportes al terminar, pase lo que pase."""
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            ejecucion = Ejecucion(script)
+            token = _ejecucion_actual.set(ejecucion)
+            try:
+                return funcion(*args, **kwargs)
+            except Exception:
+                ejecucion.error("no_controlado")
+                raise
+            finally:
+                _ejecucion_actual.reset(token)
+                try:
+                    escribir_reportes(ejecucion)
+                except OSError as e:
+                    print(f"ADVERTENCIA: No se pudieron escribir las métricas: {e}")
+        return envoltura
+    return decorador
+
+
+# --- 4. REPORTES ---
+def percentil(valores, p):
+    """Percentil por interpolación lineal entre rangos más cercanos."""
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    posicion = (len(ordenados) - 1) * p
+    inferior = int(posicion)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * (posicion - inferior)
+
+
+def leer_historial(script):
+    ruta = os.path.join(DIRECTORIO_METRICAS, ARCHIVO_HISTORIAL)
+    try:
+        with open(ruta, 'r', encoding='utf-8') as f:
+            registros = [json.loads(l) for l in f if l.strip()]
+    except (OSError, ValueError):
+        return []
+    return [r for r in registros if r.get("script") == script][-MAX_HISTORIAL:]
+
+
+def resumen_etapas(historial):
+    por_etapa = {}
+    for registro in historial:
+        for nombre, segundos in registro.get("etapas", {}).items():
+            por_etapa.setdefault(nombre, []).append(segundos)
+    return {
+        nombre: {"p50": round(percentil(v, 0.5), 4), "p95": round(percentil(v, 0.95), 4), "ejecuciones": len(v)}
+        for nombre, v in por_etapa.items()
+    }
+
+
+def recortar_historial(ruta, maximo=MAX_HISTORIAL * 10):
+    """Evita que el historial crezca sin límite (varios scripts comparten el archivo)."""
+    with open(ruta, 'r', encoding='utf-8') as f:
+        lineas = f.readlines()
+    if len(lineas) > maximo:
+        _escribir_atomico(ruta, "".join(lineas[-maximo // 2:]))
+
+
+def _escribir_atomico(ruta, contenido):
+    with open(f"{ruta}.tmp", 'w', encoding='utf-8') as f:
+        f.write(contenido)
+    os.replace(f"{ruta}.tmp", ruta)
+
+
+def texto_prometheus(reporte, resumen):
+    etiqueta = f'script="{reporte["script"]}"'
+    lineas = [
+        f"# HELP {PREFIJO_PROMETHEUS}_etapa_segundos Duración de cada etapa en la última ejecución.",
+        f"# TYPE {PREFIJO_PROMETHEUS}_etapa_segundos gauge",
+    ]
+    lineas += [f'{PREFIJO_PROMETHEUS}_etapa_segundos{{{etiqueta},etapa="{n}"}} {v}' for n, v in reporte["etapas"].items()]
+    lineas += [
+        f"# HELP {PREFIJO_PROMETHEUS}_etapa_segundos_historico Percentiles por etapa en las últimas {MAX_HISTORIAL} ejecuciones.",
+        f"# TYPE {PREFIJO_PROMETHEUS}_etapa_segundos_historico summary",
+    ]
+    for nombre, r in resumen.items():
+        lineas.append(f'{PREFIJO_PROMETHEUS}_etapa_segundos_historico{{{etiqueta},etapa="{nombre}",quantile="0.5"}} {r["p50"]}')
+        lineas.append(f'{PREFIJO_PROMETHEUS}_etapa_segundos_historico{{{etiqueta},etapa="{nombre}",quantile="0.95"}} {r["p95"]}')
+        lineas.append(f'{PREFIJO_PROMETHEUS}_etapa_segundos_historico_count{{{etiqueta},etapa="{nombre}"}} {r["ejecuciones"]}')
+    lineas += [f"# TYPE {PREFIJO_PROMETHEUS}_contador gauge"]
+    lineas += [f'{PREFIJO_PROMETHEUS}_contador{{{etiqueta},nombre="{n}"}} {v}' for n, v in reporte["contadores"].items()]
+    lineas += [f"# TYPE {PREFIJO_PROMETHEUS}_errores gauge"]
+    lineas += [f'{PREFIJO_PROMETHEUS}_errores{{{etiqueta},etapa="{n}"}} {v}' for n, v in reporte["errores"].items()]
+    lineas += [
+        f"# TYPE {PREFIJO_PROMETHEUS}_ejecucion_exito gauge",
+        f"{PREFIJO_PROMETHEUS}_ejecucion_exito{{{etiqueta}}} {int(reporte['exito'])}",
+        f"# TYPE {PREFIJO_PROMETHEUS}_ejecucion_duracion_segundos gauge",
+        f"{PREFIJO_PROMETHEUS}_ejecucion_duracion_segundos{{{etiqueta}}} {reporte['duracion_total']}",
+    ]
+    return "\n".join(lineas) + "\n"
+
+
+def escribir_reportes(ejecucion):
+    """Agrega la ejecución al historial y escribe <script>.json (reporte) y <script>.prom (textfile)."""
+    os.makedirs(DIRECTORIO_METRICAS, exist_ok=True)
+    reporte = ejecucion.reporte()
+    ruta_historial = os.path.join(DIRECTORIO_METRICAS, ARCHIVO_HISTORIAL)
+    with open(ruta_historial, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(reporte, ensure_ascii=False) + "\n")
+    recortar_historial(ruta_historial)
+
+    resumen = resumen_etapas(leer_historial(ejecucion.script))
+    reporte["percentiles_etapas"] = resumen
+    _escribir_atomico(os.path.join(DIRECTORIO_METRICAS, f"{ejecucion.script}.json"), json.dumps(reporte, indent=4, ensure_ascii=False))
+    _escribir_atomico(os.path.join(DIRECTORIO_METRICAS, f"{ejecucion.script}.prom"), texto_prometheus(reporte, resumen))
+    print(f"Métricas: {reporte['duracion_total']:.2f} s | etapas: "
+          + ", ".join(f"{n} {v:.2f}s" for n, v in reporte["etapas"].items()))
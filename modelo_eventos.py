@@ -0,0 +1,155 @@
+import sys
+from dataclasses import dataclass
+
+# --- 1. MODELO ---
+# Clases inmutables con __slots__: sin __dict__ por instancia y compartibles entre
+# formatos de salida sin copias. Ligas, organizadores y canales se internan porque se
+# repiten en casi todas las líneas de la guía.
+
+
+def _interna(texto):
+    return sys.intern(texto) if texto else texto
+
+
+@dataclass(frozen=True, slots=True)
+class Partido:
+    descripcion: str = ""
+    horarios: str = ""
+    canales: tuple = ()
+    competidores: tuple = ()
+    detalle_partido: str = ""
+    organizador: str = ""
+    id: str = ""
+    inicio: tuple = ()          # (("Este", "19:00"), ("Centro", "18:00"), ...)
+    inicio_utc: int | None = None
+
+    @classmethod
+    def crear(cls, descripcion="", horarios="", canales=(), competidores=(), detalle_partido="",
+              organizador="", id="", inicio=(), inicio_utc=None):
+        return cls(
+            descripcion=descripcion,
+            horarios=horarios,
+            canales=tuple(_interna(c) for c in canales),
+            competidores=tuple(competidores),
+            detalle_partido=detalle_partido,
+            organizador=_interna(organizador),
+            id=id,
+            inicio=tuple(inicio.items()) if isinstance(inicio, dict) else tuple(map(tuple, inicio)),
+            inicio_utc=inicio_utc,
+        )
+
+    @classmethod
+    def desde_dict(cls, datos):
+        return cls.crear(
+            descripcion=datos.get("descripcion", ""),
+            horarios=datos.get("horarios", ""),
+            canales=datos.get("canales", ()),
+            competidores=datos.get("competidores", ()),
+            detalle_partido=datos.get("detalle_partido", ""),
+            organizador=datos.get("organizador", ""),
+            id=datos.get("id", ""),
+            inicio=datos.get("inicio") or (),
+            inicio_utc=datos.get("inicio_utc"),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class Evento:
+    evento_principal: str
+    detalle_evento: str = ""
+    partidos: tuple = ()
+
+    @classmethod
+    def desde_dict(cls, datos):
+        return cls(
+            evento_principal=_interna(datos.get("evento_principal", "Otros")),
+            detalle_evento=datos.get("detalle_evento", ""),
+            partidos=tuple(Partido.desde_dict(p) for p in datos.get("partidos", [])),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class Guia:
+    fecha_actualizacion: str = ""
+    fecha_guia: str = ""
+    titulo_guia: str = ""
+    eventos: tuple = ()
+
+    @classmethod
+    def desde_dict(cls, datos):
+        return cls(
+            fecha_actualizacion=datos.get("fecha_actualizacion", ""),
+            fecha_guia=datos.get("fecha_guia", ""),
+            titulo_guia=datos.get("titulo_guia", ""),
+            eventos=tuple(Evento.desde_dict(e) for e in datos.get("eventos", [])),
+        )
+
+    def partidos(self):
+        """Recorre (evento, partido) en el orden de la guía."""
+        for evento in self.eventos:
+            for partido in evento.partidos:
+                yield evento, partido
+
+    def indice_horario(self):
+        """[[inicio_utc, id], ...] ordenado por hora de inicio."""
+        return sorted([p.inicio_utc, p.id] for _, p in self.partidos() if p.inicio_utc is not None)
+
+
+# --- 2. SERIALIZADORES ---
+def _sin_cambio(texto):
+    return texto
+
+
+def partido_a_dict(partido, limpiar=_sin_cambio):
+    """Mismo orden de claves que el JSON original. `limpiar` se aplica a los textos visibles."""
+    return {
+        "descripcion": limpiar(partido.descripcion),
+        "horarios": limpiar(partido.horarios),
+        "canales": [limpiar(c) for c in partido.canales],
+        "competidores": list(partido.competidores),
+        "detalle_partido": limpiar(partido.detalle_partido),
+        "organizador": limpiar(partido.organizador),
+        "id": partido.id,
+        "inicio": dict(partido.inicio),
+        "inicio_utc": partido.inicio_utc,
+    }
+
+
+def evento_a_dict(evento):
+    return {
+        "evento_principal": evento.evento_principal,
+        "detalle_evento": evento.detalle_evento,
+        "partidos": [partido_a_dict(p) for p in evento.partidos],
+    }
+
+
+def serializar_guia(guia):
+    """Estructura de events.json."""
+    return {
+        "fecha_actualizacion": guia.fecha_actualizacion,
+        "fecha_guia": guia.fecha_guia,
+        "titulo_guia": guia.titulo_guia,
+        "eventos": [evento_a_dict(e) for e in guia.eventos],
+        "indice_horario": guia.indice_horario(),
+    }
+
+
+def entrada_feed(evento, partido, limpiar=_sin_cambio):
+    """Una entrada de los feeds rankeados: el evento con un solo partido."""
+    return {
+        "evento_principal": limpiar(evento.evento_principal),
+        "detalle_evento": limpiar(evento.detalle_evento),
+        "partidos": [partido_a_dict(partido, limpiar)],
+    }
+
+
+def serializar_feed(fecha_actualizacion, fecha_guia, seleccion, limpiar=_sin_cambio):
+    """
+    Estructura de los feeds rankeados (Legacy, Roku, Fire, Web): un partido por entrada.
+    `seleccion` es una lista de (Evento, Partido); Roku pasa su función de limpieza.
+    """
+    return {
+        "fecha_actualizacion": fecha_actualizacion,
+        "fecha_guia": fecha_guia,
+        "eventos_relevantes": [entrada_feed(evento, partido, limpiar) for evento, partido in seleccion],
+    }
@@ -0,0 +1,78 @@
+import re
+from functools import lru_cache
+
+# --- 1. TABLAS ---
+# Rangos que se borran para Roku: emojis y pictogramas, banderas, tags invisibles (banderas
+# compuestas como Inglaterra), selectores de variación y zero-width spaces/joiners.
+RANGOS_EMOJI = [
+    (0x1F000, 0x1FAFF),
+    (0x2600, 0x27BF),
+    (0xE0000, 0xE007F),
+    (0xFE00, 0xFE0F),
+    (0x200B, 0x200D),
+]
+# Una clase de caracteres compilada: en textos que no se repiten es ~2x más rápida que
+# str.translate con una tabla de 135 000 entradas
+REGEX_SIN_EMOJIS = re.compile('[' + ''.join(f'{chr(inicio)}-{chr(fin)}' for inicio, fin in RANGOS_EMOJI) + ']+')
+
+# Emoji del título de la liga -> deporte, en orden de prioridad (un título con ⚾ y 🏀 es del
+# primero que aparezca en la tabla). Cada consumidor conserva su orden de siempre:
+# el del score local...
+EMOJIS_DEPORTE = (
+    ("⚽", "futbol"), ("🏈", "americano"), ("🏀", "basquetbol"), ("⚾", "beisbol"), ("🏒", "hockey"),
+    ("🎾", "tenis"), ("⛳", "golf"), ("🥊", "combate"), ("🤼", "combate"), ("🏎", "motor"),
+)
+# ...y el de las plantillas de Telegram (béisbol antes que básquetbol; el resto, genéricas)
+EMOJIS_PLANTILLA_TELEGRAM = (
+    ("⚽", "futbol"), ("🏈", "americano"), ("⚾", "beisbol"), ("🏀", "basquetbol"), ("⛳", "golf"), ("🏒", "hockey"),
+)
+
+# Escape de Markdown para Telegram: la variante de los mensajes deja * y _ porque los
+# textos de usuario van dentro de plantillas que ya usan negritas; la de alertas escapa todo.
+CARACTERES_MARKDOWN = "[]()~`>#+-=|{}.!"
+TABLA_ESCAPE_MARKDOWN = str.maketrans({c: f"\\{c}" for c in CARACTERES_MARKDOWN})
+TABLA_ESCAPE_MARKDOWN_COMPLETO = str.maketrans({c: f"\\{c}" for c in "_*" + CARACTERES_MARKDOWN})
+
+REGEX_ESPACIOS = re.compile(r'\s+')
+# Emoji en un título de la guía (detección de líneas destacadas del tokenizador)
+REGEX_EMOJI_TITULO = re.compile(r'[\U0001F300-\U0001F5FF\U0001F600-\U0001F64F\U0001F680-\U0001F6FF\u2600-\u26FF\u2700-\u27BF]+', re.UNICODE)
+
+# Ligas, canales y organizadores se repiten en casi todas las entradas
+TAMANO_CACHE = 4096
+
+
+# --- 2. OPERACIONES ---
+@lru_cache(maxsize=TAMANO_CACHE)
+def quitar_emojis(texto):
+    return REGEX_SIN_EMOJIS.sub("", texto) if texto else ""
+
+
+@lru_cache(maxsize=TAMANO_CACHE)
+def limpiar_roku(texto):
+    """Sin emojis ni caracteres invisibles y con los espacios colapsados (Roku no los muestra)."""
+    if not texto:
+        return ""
+    return REGEX_ESPACIOS.sub(' ', REGEX_SIN_EMOJIS.sub('', texto)).strip()
+
+
+def contiene_emoji_titulo(texto):
+    return REGEX_EMOJI_TITULO.search(texto) is not None
+
+
+@lru_cache(maxsize=TAMANO_CACHE)
+def deporte_por_emoji(texto, tabla=EMOJIS_DEPORTE):
+    """Deporte según el primer emoji de `tabla` presente en el texto, o None."""
+    for emoji, deporte in tabla:
+        if emoji in texto:
+            return deporte
+    return None
+
+
+@lru_cache(maxsize=TAMANO_CACHE)
+def escapar_markdown(texto):
+    return str(texto).translate(TABLA_ESCAPE_MARKDOWN)
+
+
+@lru_cache(maxsize=TAMANO_CACHE)
+def escapar_markdown_completo(texto):
+    return str(texto).translate(TABLA_ESCAPE_MARKDOWN_COMPLETO)
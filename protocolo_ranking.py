@@ -0,0 +1,83 @@
+import json
+import re
+from collections import namedtuple
+
+from indice_partidos import IndicePartidos
+
+# --- 1. FORMATO ---
+# Un partido tal como se envía a la IA: id corto, línea del prompt, descripción, firma
+# (hash de la línea, clave de los scores guardados entre ejecuciones) y score local
+Candidato = namedtuple("Candidato", ["id", "linea", "descripcion", "firma", "puntaje_local"])
+
+# Respuesta pedida a la IA: {"ranking": [{"id": "a1b2c3d4", "score": 87}, ...]}
+ESQUEMA_RESPUESTA = {
+    "type": "OBJECT",
+    "properties": {
+        "ranking": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "id": {"type": "STRING"},
+                    "score": {"type": "INTEGER"},
+                },
+                "required": ["id", "score"],
+            },
+        },
+    },
+    "required": ["ranking"],
+}
+
+INSTRUCCIONES_FORMATO = """Responder únicamente con un objeto JSON con esta forma:
+{"ranking": [{"id": "<ID del evento>", "score": <0-100>}, ...]}
+Usar el ID exactamente como aparece en la lista."""
+
+REGEX_BLOQUE_CODIGO = re.compile(r'^```(?:json)?\s*|\s*```$')
+
+
+# --- 2. VALIDACIÓN ---
+def _entradas(texto):
+    """Lista de entradas de la respuesta o None si no es el JSON esperado."""
+    try:
+        datos = json.loads(REGEX_BLOQUE_CODIGO.sub('', texto.strip()))
+    except (ValueError, AttributeError):
+        return None
+    if isinstance(datos, dict):
+        datos = datos.get("ranking")
+    return datos if isinstance(datos, list) else None
+
+
+def parsear_respuesta(texto, candidatos):
+    """
+    Valida la respuesta JSON y la traduce a {firma: score} en el orden recibido.
+    `candidatos` es una lista de Candidato. Los ids se resuelven con un dict;
+    si la IA devuelve la descripción en lugar del id se intenta con el índice normalizado.
+    Entradas repetidas, ids desconocidos y scores no numéricos se descartan; el score se
+    acota a 0-100. Devuelve None si no hay ninguna entrada válida.
+    """
+    entradas = _entradas(texto)
+    if not entradas:
+        return None
+
+    por_id = {c.id: c.firma for c in candidatos}
+    indice = None
+    puntajes = {}
+    for entrada in entradas:
+        if not isinstance(entrada, dict):
+            continue
+        id_partido, score = str(entrada.get("id", "")).strip(), entrada.get("score")
+        if isinstance(score, str) and score.strip().isdigit():
+            score = int(score)
+        if isinstance(score, bool) or not isinstance(score, (int, float)):
+            continue
+        clave = por_id.get(id_partido)
+        if clave is None and id_partido:
+            if indice is None:
+                indice = IndicePartidos()
+                for c in candidatos:
+                    if c.descripcion:
+                        indice.agregar(c.firma, c.descripcion, clave=c.firma)
+            clave = indice.buscar(id_partido, puntajes)
+        if clave is not None and clave not in puntajes:
+            puntajes[clave] = max(0, min(100, int(score)))
+    return puntajes or None
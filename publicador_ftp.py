@@ -0,0 +1,219 @@
+import hashlib
+import io
+import json
+import os
+import random
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from ftplib import error_perm
+
+# --- 1. CONFIGURACIÓN ---
+DIRECTORIO_ESTADO = os.getenv('DIRECTORIO_ESTADO', '.estado')
+SUFIJO_TEMPORAL = '.tmp'
+CONEXIONES_FTP = int(os.getenv('FTP_CONEXIONES', '3'))
+REINTENTOS_POR_ARCHIVO = 3
+ESPERA_BASE_REINTENTO = 2  # segundos; se duplica en cada intento
+
+ResultadoSubida = namedtuple("ResultadoSubida", ["nombre", "bytes", "segundos", "intentos", "error"])
+
+
+# --- 2. HASHES Y MANIFIESTOS ---
+def hash_archivo(ruta):
+    sha = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(65536), b''):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+
+def cargar_manifiesto_local(nombre_manifiesto):
+    try:
+        with open(os.path.join(DIRECTORIO_ESTADO, nombre_manifiesto), 'r', encoding='utf-8') as f:
+            return json.load(f).get('archivos', {})
+    except (OSError, ValueError):
+        return {}
+
+
+def guardar_manifiesto_local(nombre_manifiesto, contenido):
+    os.makedirs(DIRECTORIO_ESTADO, exist_ok=True)
+    ruta = os.path.join(DIRECTORIO_ESTADO, nombre_manifiesto)
+    with open(f"{ruta}{SUFIJO_TEMPORAL}", 'wb') as f:
+        f.write(contenido)
+    os.replace(f"{ruta}{SUFIJO_TEMPORAL}", ruta)
+
+
+def leer_json_remoto(ftp, nombre):
+    """Lee un JSON del servidor por FTP; None si no existe o está dañado."""
+    buffer = io.BytesIO()
+    try:
+        ftp.retrbinary(f'RETR {nombre}', buffer.write)
+        datos = json.loads(buffer.getvalue().decode('utf-8'))
+    except (error_perm, ValueError, UnicodeDecodeError):
+        return None
+    return datos if isinstance(datos, dict) else None
+
+
+def leer_manifiesto_remoto(ftp, nombre_manifiesto):
+    """Devuelve los hashes publicados en el servidor, o None si no se pudo leer el manifiesto."""
+    datos = leer_json_remoto(ftp, nombre_manifiesto)
+    return None if datos is None else datos.get('archivos', {})
+
+
+# --- 3. SUBIDA ATÓMICA ---
+def renombrar_remoto(ftp, origen, destino):
+    try:
+        ftp.rename(origen, destino)
+    except error_perm:
+        # Algunos servidores no sobrescriben con RNTO: se borra el destino y se repite
+        try:
+            ftp.delete(destino)
+        except error_perm:
+            pass
+        ftp.rename(origen, destino)
+
+
+def subir_atomico(ftp, fuente, nombre_remoto):
+    """Sube a un nombre temporal y renombra, para que nunca se sirva un archivo a medias."""
+    temporal = f"{nombre_remoto}{SUFIJO_TEMPORAL}"
+    if isinstance(fuente, bytes):
+        ftp.storbinary(f'STOR {temporal}', io.BytesIO(fuente))
+    else:
+        with open(fuente, 'rb') as f:
+            ftp.storbinary(f'STOR {temporal}', f)
+    renombrar_remoto(ftp, temporal, nombre_remoto)
+
+
+# --- 4. POOL DE CONEXIONES ---
+def cerrar_conexion(ftp):
+    try:
+        ftp.quit()
+    except Exception:
+        ftp.close()
+
+
+def espera_reintento(intento):
+    """Backoff exponencial con jitter para no reintentar todos los hilos a la vez."""
+    return ESPERA_BASE_REINTENTO * (2 ** (intento - 1)) * random.uniform(0.5, 1.5)
+
+
+class PoolFTP:
+    """Una conexión FTP por hilo, creada bajo demanda con la función `conectar` del script."""
+
+    def __init__(self, conectar):
+        self.conectar = conectar
+        self._local = threading.local()
+        self._abiertas = []
+        self._candado = threading.Lock()
+
+    def obtener(self):
+        ftp = getattr(self._local, 'ftp', None)
+        if ftp is None:
+            ftp = self.conectar()
+            self._local.ftp = ftp
+            with self._candado:
+                self._abiertas.append(ftp)
+        return ftp
+
+    def descartar(self):
+        """Cierra la conexión del hilo actual tras un error; el siguiente intento abre otra."""
+        ftp = getattr(self._local, 'ftp', None)
+        if ftp is not None:
+            self._local.ftp = None
+            with self._candado:
+                self._abiertas.remove(ftp)
+            cerrar_conexion(ftp)
+
+    def cerrar(self):
+        with self._candado:
+            abiertas, self._abiertas = self._abiertas, []
+        for ftp in abiertas:
+            cerrar_conexion(ftp)
+
+
+def subir_con_reintentos(pool, fuente, nombre_remoto):
+    """Sube un solo archivo; si falla, reintenta solo ese archivo con una conexión nueva."""
+    tamano = len(fuente) if isinstance(fuente, bytes) else os.path.getsize(fuente)
+    inicio = time.perf_counter()
+    for intento in range(1, REINTENTOS_POR_ARCHIVO + 1):
+        try:
+            subir_atomico(pool.obtener(), fuente, nombre_remoto)
+            return ResultadoSubida(nombre_remoto, tamano, time.perf_counter() - inicio, intento, None)
+        except Exception as e:
+            pool.descartar()
+            if intento == REINTENTOS_POR_ARCHIVO:
+                return ResultadoSubida(nombre_remoto, tamano, time.perf_counter() - inicio, intento, e)
+            espera = espera_reintento(intento)
+            print(f"    -> ⚠️ Error subiendo {nombre_remoto} (intento {intento}/{REINTENTOS_POR_ARCHIVO}): {e}. Reintento en {espera:.1f} s...")
+            time.sleep(espera)
+
+
+def leer_manifiesto_con_reintentos(pool, nombre_manifiesto):
+    for intento in range(1, REINTENTOS_POR_ARCHIVO + 1):
+        try:
+            return leer_manifiesto_remoto(pool.obtener(), nombre_manifiesto)
+        except Exception as e:
+            pool.descartar()
+            if intento == REINTENTOS_POR_ARCHIVO:
+                raise
+            print(f"    -> ⚠️ Error de conexión FTP (intento {intento}/{REINTENTOS_POR_ARCHIVO}): {e}")
+            time.sleep(espera_reintento(intento))
+
+
+# --- 5. PUBLICACIÓN INCREMENTAL EN PARALELO ---
+def publicar_archivos(conectar, archivos, nombre_manifiesto, forzar=False, conexiones=CONEXIONES_FTP):
+    """
+    Sube en paralelo, con hasta `conexiones` conexiones, solo los archivos cuyo hash no
+    coincide con el manifiesto del servidor (o con el local si el remoto no se puede leer)
+    y actualiza ambos manifiestos. `conectar` debe devolver un FTP ya autenticado y en la
+    ruta remota. Lanza RuntimeError si algún archivo falla tras agotar sus reintentos.
+    Devuelve la lista de ResultadoSubida de los archivos subidos.
+    """
+    hashes_actuales = {nombre: hash_archivo(nombre) for nombre in archivos}
+    pool = PoolFTP(conectar)
+    try:
+        publicados = None if forzar else leer_manifiesto_con_reintentos(pool, nombre_manifiesto)
+        manifiesto_remoto_ok = publicados is not None
+        if publicados is None:
+            publicados = {} if forzar else cargar_manifiesto_local(nombre_manifiesto)
+
+        pendientes = [n for n in archivos if publicados.get(n) != hashes_actuales[n]]
+        for nombre in archivos:
+            if nombre not in pendientes:
+                print(f"    -> Sin cambios, se omite: {nombre}")
+
+        resultados = []
+        if pendientes:
+            with ThreadPoolExecutor(max_workers=max(1, min(conexiones, len(pendientes)))) as ejecutor:
+                resultados = list(ejecutor.map(lambda n: subir_con_reintentos(pool, n, n), pendientes))
+
+        subidos = [r for r in resultados if r.error is None]
+        fallidos = [r for r in resultados if r.error is not None]
+        for r in resultados:
+            estado = "OK" if r.error is None else f"❌ FALLÓ ({r.error})"
+            print(f"    -> {estado}: {r.nombre} | {r.bytes / 1024:.1f} KB en {r.segundos:.2f} s | {r.intentos} intento(s)")
+
+        if subidos or not manifiesto_remoto_ok:
+            # Los archivos fallidos conservan el hash anterior para volver a intentarse
+            hashes_subidos = {r.nombre: hashes_actuales[r.nombre] for r in subidos}
+            hashes_subidos.update({n: hashes_actuales[n] for n in archivos if n not in pendientes})
+            manifiesto = {
+                "fecha_actualizacion": datetime.now().isoformat(),
+                "archivos": {**publicados, **hashes_subidos},
+            }
+            contenido = json.dumps(manifiesto, indent=4, ensure_ascii=False).encode('utf-8')
+            guardar_manifiesto_local(nombre_manifiesto, contenido)
+            resultado_manifiesto = subir_con_reintentos(pool, contenido, nombre_manifiesto)
+            if resultado_manifiesto.error is not None:
+                print(f"    -> ⚠️ No se pudo actualizar el manifiesto remoto: {resultado_manifiesto.error}")
+    finally:
+        pool.cerrar()
+
+    total_bytes = sum(r.bytes for r in subidos)
+    print(f" -> Publicación incremental: {len(subidos)} subido(s) ({total_bytes / 1024:.1f} KB), "
+          f"{len(archivos) - len(pendientes)} sin cambios, {len(fallidos)} fallido(s).")
+    if fallidos:
+        raise RuntimeError(f"No se pudieron subir: {', '.join(r.nombre for r in fallidos)}")
+    return subidos
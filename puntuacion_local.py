@@ -0,0 +1,132 @@
+import json
+import os
+
+from indice_partidos import normalizar_texto
+from normalizacion import deporte_por_emoji
+
+# --- 1. TABLA DE PESOS ---
+# Misma rúbrica que el prompt del ranker (nivel + deporte + protagonistas + interés en
+# México, con tope para ligas sudamericanas en fase regular). Las palabras se comparan
+# normalizadas (sin acentos ni emojis, en minúsculas) y como palabras completas.
+# ARCHIVO_PESOS_RANKING puede apuntar a un JSON con las claves que se quieran reemplazar.
+PESOS_RANKING = {
+    "nivel": [
+        # Gana el primer nivel que coincide: las rondas "... de final" van antes que "final"
+        (30, ["cuartos de final", "octavos de final", "dieciseisavos de final"]),
+        (40, ["final", "gran final", "campeonato", "ppv", "pay per view", "titulo mundial", "super bowl", "serie mundial"]),
+        (35, ["semifinal", "semifinales"]),
+        (30, ["playoffs", "playoff", "liguilla", "eliminatoria", "repechaje"]),
+        (25, ["champions", "champions league", "mundial", "copa del mundo", "libertadores", "copa america", "copa oro",
+              "nations league", "eurocopa", "concacaf", "gran premio", "grand slam", "masters 1000"]),
+    ],
+    "nivel_base": 10,
+    "deportes": {
+        "futbol": 25, "americano": 25, "basquetbol": 25, "combate": 25, "motor": 25,
+        "beisbol": 20, "tenis": 15, "golf": 15, "hockey": 5, "otros": 5,
+    },
+    "puntos_ppv": 30,
+    "protagonistas": [
+        (20, ["america", "chivas", "guadalajara", "cruz azul", "pumas", "tigres", "monterrey", "rayados",
+              "real madrid", "barcelona", "lakers", "warriors", "canelo", "seleccion mexicana", "mexico",
+              "cowboys", "chiefs", "dodgers", "yankees", "checo"]),
+        (10, ["toluca", "leon", "pachuca", "santos", "atlas", "manchester city", "manchester united", "liverpool",
+              "arsenal", "chelsea", "bayern", "psg", "juventus", "inter", "milan", "atletico de madrid", "celtics",
+              "heat", "knicks", "bulls", "eagles", "49ers", "steelers", "packers", "patriots", "red sox", "cubs",
+              "messi", "inter miami", "galaxy", "lafc", "verstappen", "hamilton", "alcaraz", "djokovic"]),
+    ],
+    "interes_mexico": [
+        (15, ["liga mx", "seleccion mexicana", "mexico", "canelo", "checo", "tudn", "canal 5", "azteca 7", "afizzionados"]),
+        (8, ["nfl", "nba", "mlb", "champions", "formula 1", "f1", "ufc", "mls", "premier league", "laliga"]),
+    ],
+    "ligas_sudamericanas": ["argentina", "liga profesional", "brasil", "brasileirao", "serie a brasil", "colombia",
+                            "liga betplay", "chile", "peru", "uruguay", "ecuador", "paraguay", "bolivia", "venezuela"],
+    "tope_sudamericana_regular": 20,
+}
+
+# Orden de detección del deporte: primero emojis del título de la liga (normalizacion.EMOJIS_DEPORTE),
+# luego palabras clave
+PALABRAS_DEPORTE = [
+    ("americano", ["nfl", "ncaa football", "futbol americano", "college football", "xfl", "ufl"]),
+    ("basquetbol", ["nba", "wnba", "basquetbol", "basketball", "euroliga", "lnbp", "ncaa basketball"]),
+    ("beisbol", ["mlb", "lmp", "lmb", "beisbol", "baseball", "serie del caribe"]),
+    ("hockey", ["nhl", "hockey"]),
+    ("tenis", ["atp", "wta", "tenis", "tennis", "grand slam", "roland garros", "wimbledon"]),
+    ("golf", ["pga", "lpga", "golf", "liv golf"]),
+    ("combate", ["box", "boxeo", "ufc", "wwe", "aew", "lucha libre", "mma", "pelea", "cmll", "aaa"]),
+    ("motor", ["formula 1", "f1", "nascar", "motogp", "indycar", "gran premio"]),
+    ("futbol", ["liga", "champions", "copa", "premier", "laliga", "serie a", "bundesliga", "ligue 1", "mls",
+                "futbol", "soccer", "concacaf", "libertadores", "sudamericana"]),
+]
+
+
+def _cargar_pesos():
+    ruta = os.getenv('ARCHIVO_PESOS_RANKING')
+    if not ruta:
+        return PESOS_RANKING
+    try:
+        with open(ruta, 'r', encoding='utf-8') as f:
+            return {**PESOS_RANKING, **json.load(f)}
+    except (OSError, ValueError) as e:
+        print(f"ADVERTENCIA: No se pudo leer {ruta} ({e}). Se usan los pesos por defecto.")
+        return PESOS_RANKING
+
+
+PESOS = _cargar_pesos()
+
+
+# --- 2. DETECCIÓN ---
+def _contiene(texto_normalizado, palabras):
+    """Coincidencia por palabra completa sobre texto ya normalizado y rodeado de espacios."""
+    return any(f" {palabra} " in texto_normalizado for palabra in palabras)
+
+
+def _texto(*partes):
+    return f" {normalizar_texto(' '.join(p for p in partes if p))} "
+
+
+def detectar_deporte(evento, partido=None):
+    """Deporte del evento: emoji del título de la liga y, si no hay, palabras clave."""
+    titulo = evento.evento_principal or ""
+    deporte = deporte_por_emoji(titulo)
+    if deporte:
+        return deporte
+    texto = _texto(titulo, evento.detalle_evento, partido.descripcion if partido else "")
+    for deporte, palabras in PALABRAS_DEPORTE:
+        if _contiene(texto, palabras):
+            return deporte
+    return "otros"
+
+
+def es_liga_sudamericana(evento, pesos=None):
+    pesos = pesos or PESOS
+    return _contiene(_texto(evento.evento_principal, evento.detalle_evento), pesos["ligas_sudamericanas"])
+
+
+# --- 3. PUNTUACIÓN ---
+def _primer_peso(texto, niveles, defecto=0):
+    for puntos, palabras in niveles:
+        if _contiene(texto, palabras):
+            return puntos
+    return defecto
+
+
+def puntuar_partido(evento, partido, pesos=None):
+    """Score 0-100 determinista para un partido según la tabla de pesos."""
+    pesos = pesos or PESOS
+    texto = _texto(evento.evento_principal, evento.detalle_evento, partido.descripcion, partido.detalle_partido)
+    texto_canales = _texto(*partido.canales)
+
+    nivel = _primer_peso(texto, pesos["nivel"], pesos["nivel_base"])
+    deporte = detectar_deporte(evento, partido)
+    if _contiene(texto + texto_canales, ["ppv", "pay per view"]):
+        popularidad = pesos["puntos_ppv"]
+    else:
+        popularidad = pesos["deportes"].get(deporte, pesos["deportes"]["otros"])
+    protagonistas = _primer_peso(texto, pesos["protagonistas"])
+    interes = _primer_peso(texto + texto_canales, pesos["interes_mexico"])
+
+    score = min(100, nivel + popularidad + protagonistas + interes)
+    # Ligas sudamericanas solo valen si es final, semifinal o similar (nivel >= 30)
+    if nivel < 30 and es_liga_sudamericana(evento, pesos):
+        score = min(score, pesos["tope_sudamericana_regular"])
+    return score
@@ -1,14 +1,35 @@
-import requests
-import json
+import hashlib
 import os
-import time
 from ftplib import FTP
 from datetime import datetime, timezone, timedelta
 import pytz
-import re
+import time
+import queue
+import threading
+import contextvars
 from google import genai
 from google.genai import types
-import copy
+from modelo_eventos import Guia
+from horarios_guia import partido_terminado
+from cache_fuente import DIRECTORIO_ESTADO, cargar_estado, guardar_estado
+from cache_ranking import clave_ranking, buscar_ranking, guardar_ranking
+from ranking_lotes import (
+    PRESUPUESTO_TOKENS_LOTE, MAX_LOTES, estimar_tokens, dividir_con_tope, puntuar_en_lotes, ganadores_por_lote,
+)
+from ranking_incremental import (
+    FRACCION_MAXIMA_INCREMENTAL, firma_candidato, cargar_puntajes, guardar_puntajes, ordenar_por_puntaje,
+)
+from puntuacion_local import puntuar_partido
+from normalizacion import limpiar_roku
+from reglas_distribucion import aplicar_reglas
+from protocolo_ranking import Candidato, ESQUEMA_RESPUESTA, INSTRUCCIONES_FORMATO, parsear_respuesta
+import argparse
+import metricas
+import cliente_http
+from almacen_artefactos import obtener_json, guardar_artefactos
+from escritor_feeds import DestinoFeed, escribir_feeds
+from publicador_ftp import publicar_archivos
+from estado_publicacion import publicar_status, leer_status, consultar_status
 
 # --- 1. CONFIGURACIÓN ---
 URL_JSON_FUENTE = "https://24hometv.xyz/events.json"
@@ -19,142 +40,94 @@ ARCHIVO_LEGACY = "eventos-relevantes.json"        # Top 5 | Emojis | 1 vez al d
 ARCHIVO_ROKU = "eventos-destacados-roku.json"     # Top 20 | Limpio | Recurrente
 ARCHIVO_FIRE = "eventos-destacados-fire.json"     # Top 20 | Emojis | Recurrente
 ARCHIVO_WEB = "eventos-importantes-web.json"      # Top Dinámico (3 o 5) | Emojis | Recurrente
+MANIFIESTO_FTP = "manifiesto-ranker.json"         # Hashes de lo publicado (solo se sube lo que cambió)
+# Huella de la última selección publicada: los feeds llevan la hora de generación y cambian
+# siempre; la selección no. Con ella main() informa si el ranking cambió de verdad.
+ARCHIVO_ESTADO_SELECCION = os.path.join(DIRECTORIO_ESTADO, 'seleccion.json')
 
 FTP_HOST = os.getenv('FTP_HOST')
 FTP_USUARIO = os.getenv('FTP_USUARIO')
 FTP_CONTRASENA = os.getenv('FTP_CONTRASENA')
+FTP_PUERTO = int(os.getenv('FTP_PUERTO', '21'))
 RUTA_REMOTA_FTP = "/public_html/"
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
 GROQ_API_KEY = os.getenv('GROQ_API_KEY') # NUEVA LLAVE DE RESPALDO
 MEXICO_TZ = pytz.timezone('America/Mexico_City')
 
+# Modelos y versión del prompt: forman parte de la clave del caché de ranking.
+# Subir VERSION_PROMPT cada vez que se edite el texto del prompt.
+MODELO_GEMINI = 'gemini-2.0-flash'
+MODELO_GROQ = 'llama-3.3-70b-versatile'
+VERSION_PROMPT = 4
+# Endpoints configurables (p. ej. servidores falsos locales para pruebas)
+GROQ_URL = os.getenv('GROQ_URL', "https://api.groq.com/openai/v1/chat/completions")
+GEMINI_BASE_URL = os.getenv('GEMINI_BASE_URL')
+# Segundos que se espera a Gemini antes de lanzar Groq en paralelo (0 = respaldo solo tras fallo)
+ESPERA_COBERTURA_IA = float(os.getenv('RANKING_ESPERA_COBERTURA', '12'))
+TOP_RANKING = 40          # eventos que se publican (el prompt pide exactamente 40)
+
 # Configuración de Variedad
 MAX_EVENTOS_POR_LIGA = 2  
-META_CANDIDATOS_IA = 50   
-
-# --- HEADERS DE NAVEGADOR (ANTI-BLOQUEO 403) ---
-HEADERS_SEGURIDAD = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-    'Accept': 'text/html,application/xhtml+xml,application/json,xml;q=0.9,*/*;q=0.8',
-    'Accept-Language': 'es-ES,es;q=0.9,en;q=0.8',
-    'Referer': 'https://24hometv.xyz/',
-    'Connection': 'keep-alive'
-}
+# Preselección local antes de la IA (0 = toda la guía; si no cabe en un prompt va en lotes, ver ranking_lotes)
+META_CANDIDATOS_IA = int(os.getenv('META_CANDIDATOS_IA', '50'))
 
 # --- 2. FUNCIONES AUXILIARES ---
 
-def limpiar_texto_roku(texto):
-    """Elimina emojis, selectores de variación, tags y caracteres especiales para Roku."""
-    if not texto:
-        return ""
-    
-    # Patrón extendido: ahora atrapa también los "Tags" de banderas compuestas (Inglaterra, Escocia, etc.)
-    emoji_pattern = re.compile(
-        r'[\U0001F000-\U0001FAFF]'  # Emojis misceláneos y extendidos
-        r'|[\U00002600-\U000027BF]' # Símbolos y pictogramas
-        r'|[\U0001F300-\U0001F5FF]' # Símbolos varios
-        r'|[\U0001F680-\U0001F6FF]' # Transporte y mapas
-        r'|[\U0001F1E0-\U0001F1FF]' # Banderas Nacionales
-        r'|[\U000E0000-\U000E007F]' # Tags invisibles (El causante de la bandera de Inglaterra)
-        r'|[\u2700-\u27BF]'         # Dingbats
-        r'|[\uFE00-\uFE0F]'         # Selectores de variación
-        r'|[\u200B-\u200D]',        # Zero-width spaces y joiners
-        flags=re.UNICODE
-    )
-    texto_limpio = emoji_pattern.sub('', texto)
-    
-    # Elimina espacios dobles que puedan quedar tras borrar los caracteres
-    return re.sub(r'\s+', ' ', texto_limpio).strip()
+def limite_web(fecha):
+    """Top dinámico de la web: 5 eventos en fin de semana, 3 entre semana."""
+    return 5 if fecha.weekday() >= 5 else 3
+
+# Feeds publicados: todos son prefijos del mismo ranking
+FEEDS_RANKER = [
+    DestinoFeed(ARCHIVO_LEGACY, 5, diario=True),                # Top 5 | Emojis | 1 vez al día
+    DestinoFeed(ARCHIVO_ROKU, 20, limpiar=limpiar_roku),        # Top 20 | Limpio
+    DestinoFeed(ARCHIVO_FIRE, 20),                              # Top 20 | Emojis
+    DestinoFeed(ARCHIVO_WEB, limite_web),                       # Top dinámico (3 o 5) | Emojis
+]
 
-def verificar_necesidad_legacy(hoy_str):
-    """Verifica si el archivo legacy en el servidor ya tiene la fecha de hoy."""
+def verificar_necesidad_legacy(hoy_str, status=None):
+    """Verifica si el archivo legacy en el servidor ya tiene la fecha de hoy (`status`: el de leer_status)."""
     print(f" -> 🔍 Verificando estado de '{ARCHIVO_LEGACY}' en servidor...")
     try:
-        resp = requests.get(URL_JSON_LEGACY_CHECK, headers=HEADERS_SEGURIDAD, params={'v': datetime.now().timestamp()}, timeout=15)
-        if resp.status_code == 200:
-            datos = resp.json()
+        # status.json trae la fecha sin descargar el archivo; sin status, el archivo completo
+        entrada = consultar_status(URL_JSON_LEGACY_CHECK, status)
+        if entrada is not None and "fecha_guia" in entrada:
+            fecha_remota = entrada["fecha_guia"]
+        else:
+            # La copia local (lo último que publicó este ranker) basta si ya es de hoy
+            datos, _ = obtener_json(URL_JSON_LEGACY_CHECK, vigente=lambda d: d.get("fecha_guia") == hoy_str, timeout=15)
             fecha_remota = datos.get("fecha_guia")
-            if fecha_remota == hoy_str:
-                print(f" -> ✅ El archivo Legacy ya está actualizado ({fecha_remota}). NO se generará de nuevo.")
-                return False
-            else:
-                print(f" -> ⚠️ El archivo Legacy es antiguo ({fecha_remota}). Se generará uno nuevo para {hoy_str}.")
-                return True
-        elif resp.status_code == 404:
-            print(" -> ℹ️ El archivo Legacy no existe aún. Se generará.")
-            return True
+        if fecha_remota == hoy_str:
+            print(f" -> ✅ El archivo Legacy ya está actualizado ({fecha_remota}). NO se generará de nuevo.")
+            return False
         else:
-            print(f" -> ⚠️ Advertencia: Respuesta HTTP {resp.status_code}. Se forzará generación.")
+            print(f" -> ⚠️ El archivo Legacy es antiguo ({fecha_remota}). Se generará uno nuevo para {hoy_str}.")
             return True
     except Exception as e:
-        print(f" -> ❌ Error verificando Legacy: {e}. Se generará por seguridad.")
+        estado = getattr(getattr(e, 'response', None), 'status_code', None)
+        if estado == 404:
+            print(" -> ℹ️ El archivo Legacy no existe aún. Se generará.")
+        elif estado:
+            print(f" -> ⚠️ Advertencia: Respuesta HTTP {estado}. Se forzará generación.")
+        else:
+            print(f" -> ❌ Error verificando Legacy: {e}. Se generará por seguridad.")
         return True
 
 
-# --- 3. FUNCIONES DE IA (PRINCIPAL Y RESPALDO) ---
-
-def obtener_ranking_groq(prompt):
-    """Función de Respaldo que consulta a Groq (Llama 3.3) si Gemini falla."""
-    print(" -> 🛟 [PLAN B] Activando IA de respaldo: Groq (Llama 3.3)...")
-    if not GROQ_API_KEY:
-        print(" -> ❌ ERROR: No se encontró GROQ_API_KEY en los Secrets.")
-        return []
-        
-    url = "https://api.groq.com/openai/v1/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {GROQ_API_KEY}",
-        "Content-Type": "application/json"
-    }
-    data = {
-        "model": "llama-3.3-70b-versatile", # <-- MODELO ACTUALIZADO Y VALIDADO
-        "messages": [{"role": "user", "content": prompt}],
-        "temperature": 0.3
-    }
-    
-    try:
-        resp = requests.post(url, headers=headers, json=data, timeout=30)
-        resp.raise_for_status()
-        respuesta_texto = resp.json()['choices'][0]['message']['content']
-        lineas = [linea.strip() for linea in respuesta_texto.strip().split('\n') if linea.strip()]
-        print(f" -> ✅ Groq procesó {len(lineas)} candidatos exitosamente.")
-        return lineas
-    except Exception as e:
-        print(f" -> ❌ Error fatal en Groq: {e}")
-        return []
-
-
-def obtener_ranking_eventos(lista_eventos):
-    print(" -> 🧠 [3/5] Contactando a Gemini 2.0 Flash...")
-    
-    cst_offset = timezone(timedelta(hours=-6))
-    hora_actual = datetime.now(cst_offset).strftime('%A, %d de %B - %I:%M %p (CDMX)')
-    
-    eventos_para_analizar = []
-    for evento in lista_eventos:
-        for partido in evento.get("partidos", []):
-            canales_str = ", ".join(partido.get('canales', []))
-            info = (f"LIGA: {evento.get('evento_principal', '')} | "
-                    f"PARTIDO: {partido.get('descripcion', '')} | "
-                    f"HORA: {partido.get('horarios', '')} | "
-                    f"CANALES: {canales_str}")
-            eventos_para_analizar.append(info.strip())
-    
-    lista_texto = "\n".join(eventos_para_analizar)
-    if not lista_texto: return []
-
-    # <-- AQUÍ SE CORRIGIÓ LA SANGRÍA DEL PROMPT
-    prompt = f"""
-Rol: Eres un curador experto en deportes para TV y plataformas digitales, especializado eventos deportivos en audiencias con orden de prioridad de México, USA, Centro America, España, Canada, con enfoque en contenido premium y de alto interés (clase media, media-alta y alta).
-
-Contexto temporal: {hora_actual}.
+def conectar_ftp():
+    ftp = FTP(timeout=30)
+    ftp.connect(FTP_HOST, FTP_PUERTO)
+    ftp.login(FTP_USUARIO, FTP_CONTRASENA)
+    ftp.set_pasv(True)
+    ftp.cwd(RUTA_REMOTA_FTP)
+    return ftp
 
-OBJETIVO:
-Analizar la siguiente lista de eventos y seleccionar los 40 eventos deportivos más relevantes del día completo, optimizados específicamente para el público de los paises que te indique, ordenados estrictamente por relevancia real, no por horario.
 
-REGLA CRÍTICA:
-La importancia del evento siempre supera la hora. Eventos nocturnos importantes deben incluirse aunque falten horas, asi como los que se transmitiran en canales PPV.
+# --- PROMPTS ---
+# Bloques compartidos por el ranking completo y el incremental (mismo criterio de score).
+ROL_CURADOR = """Rol: Eres un curador experto en deportes para TV y plataformas digitales, especializado eventos deportivos en audiencias con orden de prioridad de México, USA, Centro America, España, Canada, con enfoque en contenido premium y de alto interés (clase media, media-alta y alta)."""
 
-ENFOQUE GEOGRÁFICO OBLIGATORIO (Los paises indicados pero la udioencia principal MÉXICO):
+ENFOQUE_GEOGRAFICO = """ENFOQUE GEOGRÁFICO OBLIGATORIO (Los paises indicados pero la udioencia principal MÉXICO):
 
 Priorizar eventos con alto interés en México.
 Ligas sudamericanas (Argentina, Brasil, etc.) SOLO se incluyen si:
@@ -168,23 +141,15 @@ Selección Mexicana
 MLS (especialmente con mexicanos o equipos populares)
 NBA, NFL, MLB
 Champions League
-Eventos globales (F1, UFC, Boxeo, Tenis)
-
-METODOLOGÍA OBLIGATORIA:
-
-Analizar todos los eventos de la lista.
-Asignar un score de relevancia de 0 a 100 a cada evento.
-Aplicar filtro geográfico (México primero).
-Ordenarlos por score.
-Aplicar filtros de calidad.
-Seleccionar los mejores 40.
+Eventos globales (F1, UFC, Boxeo, Tenis)"""
 
-SISTEMA DE SCORING:
+SISTEMA_SCORING = """SISTEMA DE SCORING:
 
 Nivel del evento (0–40 pts):
 
 Final / Campeonato / PPV: +40
-Playoffs / Eliminación directa: +30
+Semifinal: +35
+Playoffs / Eliminación directa (cuartos, octavos): +30
 Torneo internacional importante: +25
 Temporada regular: +10
 Partido irrelevante: +0
@@ -225,16 +190,9 @@ No incluir partidos sin impacto competitivo.
 No incluir ligas menores sin relevancia en México.
 No incluir exceso de fútbol sudamericano.
 No incluir equipos desconocidos.
-No incluir eventos con bajo interés en México.
-
-CONTROL DE DISTRIBUCIÓN:
+No incluir eventos con bajo interés en México."""
 
-Máximo 12 eventos de fútbol.
-Mínimo 5 deportes diferentes.
-Máximo 3 eventos de ligas sudamericanas (y solo si son relevantes).
-Priorizar variedad con enfoque en gustos del público mexicano poner eventos intercalados no puede haver mas de 5 eventos de un mismo deporte de manera consecutiva.
-
-PRIORIDAD ABSOLUTA:
+PRIORIDAD_ABSOLUTA = """PRIORIDAD ABSOLUTA:
 
 Mundial de Futbol
 Liga MX (equipos grandes)
@@ -244,7 +202,36 @@ NFL (prime time o playoffs)
 Boxeo (especialmente peleadores mexicanos o eventos grandes)
 UFC
 F1
-Champions League (especialmente fases finales)
+Champions League (especialmente fases finales)"""
+
+
+def armar_prompt_completo(candidatos, hora_actual):
+    lista_texto = "\n".join(candidatos)
+    return f"""
+{ROL_CURADOR}
+
+Contexto temporal: {hora_actual}.
+
+OBJETIVO:
+Analizar la siguiente lista de eventos y seleccionar los 40 eventos deportivos más relevantes del día completo, optimizados específicamente para el público de los paises que te indique, ordenados estrictamente por relevancia real, no por horario.
+
+REGLA CRÍTICA:
+La importancia del evento siempre supera la hora. Eventos nocturnos importantes deben incluirse aunque falten horas, asi como los que se transmitiran en canales PPV.
+
+{ENFOQUE_GEOGRAFICO}
+
+METODOLOGÍA OBLIGATORIA:
+
+Analizar todos los eventos de la lista.
+Asignar un score de relevancia de 0 a 100 a cada evento.
+Aplicar filtro geográfico (México primero).
+Ordenarlos por score.
+Aplicar filtros de calidad.
+Seleccionar los mejores 40.
+
+{SISTEMA_SCORING}
+
+{PRIORIDAD_ABSOLUTA}
 
 REGLA DE TIEMPO:
 
@@ -253,13 +240,9 @@ Incluir eventos de todo el día.
 
 FORMATO DE SALIDA:
 
-Exactamente 40 líneas.
-Sin numeración.
+Exactamente 40 eventos, de mayor a menor score.
 Sin explicaciones.
-Formato por línea:
-"Equipo A vs Equipo B"
-o
-"Evento - Protagonista"
+{INSTRUCCIONES_FORMATO}
 
 IMPORTANTE:
 
@@ -274,163 +257,461 @@ LISTA A ANALIZAR:
 {lista_texto}
     """
 
-    if not GEMINI_API_KEY:
-        print(" -> ⚠️ No Gemini API Key. Saltando directo a Plan B...")
-        return obtener_ranking_groq(prompt)
 
+def armar_prompt_incremental(candidatos, hora_actual):
+    """Solo puntúa los partidos nuevos o modificados; el orden final se arma localmente."""
+    lista_texto = "\n".join(candidatos)
+    return f"""
+{ROL_CURADOR}
+
+Contexto temporal: {hora_actual}.
+
+OBJETIVO:
+Asignar un score de relevancia de 0 a 100 a CADA uno de los eventos de la lista. No selecciones ni descartes: estos eventos se integrarán a un ranking ya existente usando el mismo criterio.
+
+{ENFOQUE_GEOGRAFICO}
+
+{SISTEMA_SCORING}
+
+Los eventos que deban excluirse reciben score 0.
+
+{PRIORIDAD_ABSOLUTA}
+
+FORMATO DE SALIDA:
+
+Un elemento por evento, en cualquier orden.
+Sin explicaciones.
+{INSTRUCCIONES_FORMATO}
+
+LISTA A PUNTUAR:
+{lista_texto}
+    """
+
+
+# --- 3. FUNCIONES DE IA (PRINCIPAL Y RESPALDO) ---
+
+def obtener_ranking_groq(prompt):
+    """Función de Respaldo que consulta a Groq (Llama 3.3). Devuelve el texto JSON o "" si falla."""
+    print(" -> 🛟 [PLAN B] Activando IA de respaldo: Groq (Llama 3.3)...")
+    if not GROQ_API_KEY:
+        print(" -> ❌ ERROR: No se encontró GROQ_API_KEY en los Secrets.")
+        return ""
+        
+    url = GROQ_URL
+    headers = {
+        "Authorization": f"Bearer {GROQ_API_KEY}",
+        "Content-Type": "application/json"
+    }
+    data = {
+        "model": MODELO_GROQ, # <-- MODELO ACTUALIZADO Y VALIDADO
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": 0.3,
+        "response_format": {"type": "json_object"}  # modo JSON: la respuesta siempre es un objeto
+    }
+    
     try:
-        client = genai.Client(api_key=GEMINI_API_KEY)
-        response = client.models.generate_content(
-            model='gemini-2.0-flash',
-            contents=prompt,
-            config=types.GenerateContentConfig(temperature=0.3)
-        )
+        with metricas.etapa("llm_groq"):
+            # Misma petición repetida = mismo ranking: se puede reintentar sin riesgo
+            resp = cliente_http.post(url, headers=headers, json=data, timeout=30, idempotente=True)
+            resp.raise_for_status()
+        cuerpo = resp.json()
+        uso = cuerpo.get('usage') or {}
+        metricas.contar("llm_tokens_entrada", uso.get('prompt_tokens', 0))
+        metricas.contar("llm_tokens_salida", uso.get('completion_tokens', 0))
+        respuesta_texto = cuerpo['choices'][0]['message']['content'] or ""
+        print(f" -> ✅ Groq respondió ({len(respuesta_texto)} caracteres).")
+        return respuesta_texto
+    except Exception as e:
+        print(f" -> ❌ Error fatal en Groq: {e}")
+        return ""
+
+
+def linea_partido(evento, partido):
+    canales_str = ", ".join(partido.canales)
+    info = (f"LIGA: {evento.evento_principal} | "
+            f"PARTIDO: {partido.descripcion} | "
+            f"HORA: {partido.horarios} | "
+            f"CANALES: {canales_str}")
+    return info.strip()
+
+
+def id_candidato(evento, partido):
+    """El id que genera el actualizador; guías anteriores sin id usan la firma de la línea."""
+    return partido.id or firma_candidato(linea_partido(evento, partido))[:8]
+
+
+def huella_seleccion(seleccion, fecha_guia):
+    """Hash de la fecha de la guía y los ids seleccionados, en orden."""
+    h = hashlib.sha256(fecha_guia.encode('utf-8'))
+    for evento, partido in seleccion:
+        h.update(b"\n" + id_candidato(evento, partido).encode('utf-8'))
+    return h.hexdigest()
+
+
+def construir_candidatos(lista_eventos):
+    """Un Candidato por partido: id corto, línea con liga, descripción, hora y canales."""
+    candidatos = []
+    for evento in lista_eventos:
+        for partido in evento.partidos:
+            info = linea_partido(evento, partido)
+            id_partido = id_candidato(evento, partido)
+            candidatos.append(Candidato(id_partido, f"ID: {id_partido} | {info}", partido.descripcion,
+                                        firma_candidato(info), puntuar_partido(evento, partido)))
+    return candidatos
+
+
+def preseleccionar(candidatos, limite=META_CANDIDATOS_IA):
+    """Los `limite` mejores según el score local, en el orden de la guía (limite 0 = todos)."""
+    if limite <= 0 or len(candidatos) <= limite:
+        return list(candidatos)
+    mejores = sorted(range(len(candidatos)), key=lambda i: (-candidatos[i].puntaje_local, i))[:limite]
+    return [candidatos[i] for i in sorted(mejores)]
+
+
+def ranking_local(candidatos):
+    """Respaldo sin red: el ranking sale completo del score local."""
+    print(" -> 🧮 Ninguna IA respondió. Se publica el ranking calculado localmente.")
+    metricas.contar("ranking_local_respaldo")
+    return ordenar_por_puntaje(candidatos, {c.firma: c.puntaje_local for c in candidatos})
+
+
+def hora_actual_cdmx():
+    cst_offset = timezone(timedelta(hours=-6))
+    return datetime.now(cst_offset).strftime('%A, %d de %B - %I:%M %p (CDMX)')
+
+
+def obtener_ranking_eventos(lista_eventos, usar_cache=True, fecha_guia=""):
+    """
+    Ranking de la IA para los partidos de la guía: ids de todos los partidos con score > 0,
+    de mayor a menor. main() publica los TOP_RANKING primeros y usa el resto como reservas
+    de las reglas de distribución; los que la IA dejó en 0 no se publican nunca.
+
+    1. Si la lista de candidatos, el prompt y los modelos no cambiaron desde una ejecución
+       reciente se reutiliza el ranking guardado sin llamar a la red.
+    2. Si ya hay scores por partido de esta guía y cambió poco, solo se puntúan los partidos
+       nuevos o modificados y el orden se arma localmente.
+    3. Si no, ranking completo.
+    Los eventos ya terminados se descartan después, en main().
+    """
+    candidatos = construir_candidatos(lista_eventos)
+    if not candidatos: return []
+    version = f"{VERSION_PROMPT}|{MODELO_GEMINI}+{MODELO_GROQ}"
+
+    clave = clave_ranking([c.linea for c in candidatos], VERSION_PROMPT, f"{MODELO_GEMINI}+{MODELO_GROQ}")
+    if usar_cache:
+        entrada = buscar_ranking(clave)
+        if entrada:
+            print(f" -> ♻️ [3/5] Ranking en caché ({entrada['proveedor']}, {len(entrada['ranking'])} candidatos). Sin llamada a la IA.")
+            metricas.contar("cache_ranking_aciertos")
+            return entrada["ranking"]
+        metricas.contar("cache_ranking_fallos")
+
+    # Solo los mejores META_CANDIDATOS_IA según el score local llegan a la IA
+    preseleccionados = preseleccionar(candidatos)
+    preseleccion = {c.firma for c in preseleccionados}
+    if len(preseleccionados) < len(candidatos):
+        print(f" -> 🔎 Preselección local: {len(preseleccionados)} de {len(candidatos)} partidos van a la IA.")
+
+    previos = cargar_puntajes(fecha_guia, version) if usar_cache else {}
+    # Solo se conservan los partidos que siguen en la guía (los modificados tienen firma nueva)
+    puntajes = {c.firma: previos[c.firma] for c in candidatos if c.firma in previos}
+    pendientes = [c for c in candidatos if c.firma not in puntajes]
+
+    if puntajes and len(pendientes) <= len(candidatos) * FRACCION_MAXIMA_INCREMENTAL:
+        proveedor = "incremental"
+        # Los nuevos que no pasan la preselección quedan en 0 sin consultar a la IA
+        puntajes.update({c.firma: 0 for c in pendientes if c.firma not in preseleccion})
+        pendientes = [c for c in pendientes if c.firma in preseleccion]
+        if pendientes:
+            print(f" -> 🧩 Ranking incremental: {len(pendientes)} de {len(candidatos)} partidos nuevos o modificados.")
+            metricas.contar("ranking_incremental_partidos", len(pendientes))
+            nuevos, proveedor = consultar_ia(armar_prompt_incremental([c.linea for c in pendientes], hora_actual_cdmx()),
+                                             lambda texto: parsear_respuesta(texto, pendientes))
+            if not nuevos:
+                return ranking_local(candidatos)
+            # Los que la IA no devolvió quedan en 0 para no volver a enviarlos
+            puntajes.update({c.firma: nuevos.get(c.firma, 0) for c in pendientes})
+        else:
+            print(" -> ♻️ Sin partidos nuevos o modificados: se reordenan los scores anteriores.")
+    else:
+        puntajes, proveedor = ranking_completo(preseleccionados)
+        if not puntajes:
+            return ranking_local(candidatos)
+        for c in candidatos:
+            puntajes.setdefault(c.firma, 0)
+
+    ranking = ordenar_por_puntaje(candidatos, puntajes)
+    try:
+        guardar_puntajes(fecha_guia, version, puntajes)
+        if ranking:
+            guardar_ranking(clave, ranking, proveedor)
+    except OSError as e:
+        print(f" -> ⚠️ No se pudo guardar el caché de ranking: {e}")
+    return ranking
+
+
+def ranking_completo(candidatos):
+    """
+    Un solo prompt si la guía cabe en el presupuesto de un lote; si no, map-reduce:
+    cada lote se puntúa en paralelo y una ronda final ordena a los ganadores de todos.
+    Devuelve ({firma: score}, proveedor); los partidos no seleccionados quedan en 0 para
+    que el próximo ranking incremental no los reenvíe.
+    """
+    hora_actual = hora_actual_cdmx()
+    lineas = [c.linea for c in candidatos]
+    tokens = estimar_tokens("\n".join(lineas))
+    if tokens <= PRESUPUESTO_TOKENS_LOTE:
+        puntajes, proveedor = consultar_ia(armar_prompt_completo(lineas, hora_actual),
+                                           lambda texto: parsear_respuesta(texto, candidatos))
+        if not puntajes:
+            return {}, None
+    else:
+        lotes, descartados = dividir_con_tope(candidatos, lambda c: c.linea, lambda c: c.puntaje_local)
+        print(f" -> 🧮 Guía grande (~{tokens} tokens): {len(lotes)} lotes de hasta {PRESUPUESTO_TOKENS_LOTE} tokens.")
+        if descartados:
+            print(f" -> 🔎 Tope de {MAX_LOTES} lotes: {descartados} partidos con menor score local quedan en 0.")
+        metricas.contar("ranking_lotes", len(lotes))
+
+        def puntuar(lote):
+            resultado, _ = consultar_ia(armar_prompt_incremental([c.linea for c in lote], hora_actual),
+                                        lambda texto: parsear_respuesta(texto, lote))
+            return resultado
+
+        puntajes, fallidos = puntuar_en_lotes(lotes, puntuar)
+        if fallidos:
+            metricas.error("ranking_lote")
+        if not puntajes:
+            return {}, None
+
+        # Ronda final: los ganadores de cada lote compiten entre sí con el prompt completo
+        ganadores = ganadores_por_lote(lotes, puntajes, lambda c: c.firma)
+        final, proveedor = consultar_ia(armar_prompt_completo([c.linea for c in ganadores], hora_actual),
+                                        lambda texto: parsear_respuesta(texto, ganadores))
+        if final:
+            puntajes.update({c.firma: final.get(c.firma, 0) for c in ganadores})
+        else:
+            print(" -> ⚠️ Falló la ronda final; se usan los scores de los lotes.")
+            proveedor = "lotes"
+
+    for c in candidatos:
+        puntajes.setdefault(c.firma, 0)
+    return puntajes, proveedor
+
+
+def obtener_ranking_gemini(prompt):
+    """Consulta principal a Gemini con esquema de respuesta. Devuelve el texto JSON o "" si falla."""
+    print(" -> 🧠 [3/5] Contactando a Gemini 2.0 Flash...")
+    try:
+        opciones = types.HttpOptions(base_url=GEMINI_BASE_URL) if GEMINI_BASE_URL else None
+        client = genai.Client(api_key=GEMINI_API_KEY, http_options=opciones)
+        with metricas.etapa("llm_gemini"):
+            response = client.models.generate_content(
+                model=MODELO_GEMINI,
+                contents=prompt,
+                config=types.GenerateContentConfig(
+                    temperature=0.3,
+                    response_mime_type="application/json",
+                    response_schema=ESQUEMA_RESPUESTA,
+                )
+            )
+        uso = getattr(response, 'usage_metadata', None)
+        if uso:
+            metricas.contar("llm_tokens_entrada", uso.prompt_token_count or 0)
+            metricas.contar("llm_tokens_salida", uso.candidates_token_count or 0)
         
         if response.text:
-            lineas = [linea.strip() for linea in response.text.strip().split('\n') if linea.strip()]
-            print(f" -> ✅ Gemini procesó {len(lineas)} candidatos exitosamente.")
-            return lineas
-        return []
+            print(f" -> ✅ Gemini respondió ({len(response.text)} caracteres).")
+            return response.text
+        return ""
 
     except Exception as e:
+        print(f" -> ⚠️ Error en Gemini ({e}).")
+        return ""
+
+
+def consultar_ia(prompt, validar):
+    """
+    Devuelve (validar(respuesta), modelo que respondió); (None, modelo) si ninguna sirve.
+    `validar` recibe el texto de la respuesta y devuelve None si no es utilizable.
+
+    Petición cubierta: Gemini sale primero; si falla, su respuesta no valida o no responde
+    en ESPERA_COBERTURA_IA segundos, Groq se lanza en paralelo y gana la primera respuesta
+    válida. La otra se abandona (hilo daemon: no retrasa la salida del proceso). Con espera
+    0, Groq solo se consulta después de que Gemini falle, como antes.
+    """
+    if not GEMINI_API_KEY:
+        print(" -> ⚠️ No Gemini API Key. Saltando directo a Plan B...")
+        return validar(obtener_ranking_groq(prompt)), MODELO_GROQ
+
+    if ESPERA_COBERTURA_IA <= 0:
+        resultado = validar(obtener_ranking_gemini(prompt))
+        if resultado:
+            return resultado, MODELO_GEMINI
         # AQUÍ OCURRE LA MAGIA DEL RESPALDO
-        print(f" -> ⚠️ Error en Gemini ({e}). Activando Plan B...")
-        return obtener_ranking_groq(prompt)
+        return validar(obtener_ranking_groq(prompt)), MODELO_GROQ
+
+    resultados = queue.Queue()
+    inicio = time.monotonic()
+
+    def lanzar(modelo, funcion):
+        contexto = contextvars.copy_context()  # las métricas siguen activas en el hilo
+        def tarea():
+            t0 = time.monotonic()
+            try:
+                resultado = validar(contexto.run(funcion, prompt))
+            except Exception as e:
+                print(f" -> ⚠️ Error en {modelo}: {e}")
+                resultado = None
+            resultados.put((modelo, resultado, time.monotonic() - t0))
+        threading.Thread(target=tarea, daemon=True).start()
+
+    lanzar(MODELO_GEMINI, obtener_ranking_gemini)
+    en_curso, respaldo_lanzado = 1, False
+    while en_curso:
+        espera = None if respaldo_lanzado else max(0.0, ESPERA_COBERTURA_IA - (time.monotonic() - inicio))
+        try:
+            modelo, resultado, segundos = resultados.get(timeout=espera)
+        except queue.Empty:
+            print(f" -> ⏳ Gemini sin respuesta tras {ESPERA_COBERTURA_IA:.0f} s. Lanzando Groq en paralelo...")
+            metricas.contar("llm_cobertura_lanzada")
+            lanzar(MODELO_GROQ, obtener_ranking_groq)
+            en_curso, respaldo_lanzado = en_curso + 1, True
+            continue
+
+        en_curso -= 1
+        print(f" -> ⏱️ {modelo}: {segundos:.2f} s ({'válida' if resultado else 'sin respuesta válida'}).")
+        if resultado:
+            print(f" -> 🏆 Respuesta usada: {modelo} ({time.monotonic() - inicio:.2f} s desde el inicio).")
+            metricas.contar(f"llm_ganador_{'gemini' if modelo == MODELO_GEMINI else 'groq'}")
+            return resultado, modelo
+        if not respaldo_lanzado:
+            # AQUÍ OCURRE LA MAGIA DEL RESPALDO
+            lanzar(MODELO_GROQ, obtener_ranking_groq)
+            en_curso, respaldo_lanzado = en_curso + 1, True
+    return None, MODELO_GROQ
 
 # --- 4. FUNCIÓN PRINCIPAL ---
-def main():
+@metricas.instrumentar("ranker_gemini")
+def main(pretty=False, usar_cache=True):
+    """Devuelve True si se publicó una selección distinta de la anterior (feeds nuevos de verdad)."""
     print(f"--- 🚩 [1/5] Iniciando Ranker Multi-Archivo ---")
     
     fecha_actual_dt = datetime.now(MEXICO_TZ)
-    fecha_iso = fecha_actual_dt.isoformat()
     hoy_str = fecha_actual_dt.strftime('%Y-%m-%d')
     
-    dia_semana = fecha_actual_dt.weekday()
-    if dia_semana >= 5:
-        limit_web = 5
+    limit_web = limite_web(fecha_actual_dt)
+    if limit_web == 5:
         print(" -> 📅 Configuración: Fin de Semana (WEB 5 eventos).")
     else:
-        limit_web = 3
         print(" -> 📅 Configuración: Día de Semana (WEB 3 eventos).")
 
     print(f"--- 🚩 [2/5] Descarga de Datos Fuente ---")
-    generar_legacy = verificar_necesidad_legacy(hoy_str)
+    # Un solo status.json por ejecución: sirve para el legacy y para events.json
+    status = leer_status(URL_JSON_FUENTE)
+    generar_legacy = verificar_necesidad_legacy(hoy_str, status)
     
     try:
         print(f" -> 🌐 Descargando {URL_JSON_FUENTE}...")
-        resp = requests.get(URL_JSON_FUENTE, headers=HEADERS_SEGURIDAD, params={'v': datetime.now().timestamp()}, timeout=20)
-        resp.raise_for_status()
-        datos = resp.json()
+        with metricas.etapa("descarga"):
+            # Si status.json ya dice que la guía no es de hoy no hace falta descargarla
+            entrada = consultar_status(URL_JSON_FUENTE, status) or {}
+            if entrada.get("fecha_guia", hoy_str) != hoy_str:
+                print(f" -> ❌ ERROR: Fecha de guía ({entrada['fecha_guia']}) no es hoy. Abortando.")
+                metricas.contar("guia_desactualizada")
+                return False
+            # events.json lo acaba de escribir el actualizador: primero la copia local (mismo hash o de hoy)
+            datos, _ = obtener_json(URL_JSON_FUENTE, vigente=lambda d: d.get("fecha_guia") == hoy_str,
+                                    status=entrada, timeout=20)
+            guia = Guia.desde_dict(datos)
         
-        if datos.get("fecha_guia") != hoy_str:
-            print(f" -> ❌ ERROR: Fecha de guía ({datos.get('fecha_guia')}) no es hoy. Abortando.")
-            return
+        if guia.fecha_guia != hoy_str:
+            print(f" -> ❌ ERROR: Fecha de guía ({guia.fecha_guia}) no es hoy. Abortando.")
+            metricas.contar("guia_desactualizada")
+            return False
         
-        lista_original = datos.get("eventos", [])
+        lista_original = guia.eventos
         if not lista_original: raise ValueError("JSON de eventos está vacío.")
         
     except Exception as e:
         print(f" -> ❌ Error fatal descargando fuente: {e}")
-        return
+        return False
 
     # Ranking IA
-    ranking_ia = obtener_ranking_eventos(lista_original)
+    with metricas.etapa("ranking"):
+        ranking_ia = obtener_ranking_eventos(lista_original, usar_cache, guia.fecha_guia)
     if not ranking_ia:
         print(" -> ❌ Error: Ninguna IA pudo procesar los datos. Cancelando.")
-        return
+        metricas.error("ranking")
+        return False
 
     print(f"--- 🚩 [4/5] Generación de Archivos JSON Locales ---")
     eventos_seleccionados = []
-    eventos_reserva = []
-    conteo_liga = {}
     vistos = set()
     
-    # Mapeo IA -> Objetos JSON
-    for desc_ia in ranking_ia:
-        encontrado = False
-        for evento in lista_original:
-            for partido in evento.get("partidos", []):
-                d_orig = partido.get("descripcion", "")
-                if d_orig and (d_orig in desc_ia or desc_ia in d_orig):
-                    if d_orig not in vistos:
-                        eventos_seleccionados.append((evento, partido, evento.get("evento_principal", "Otros")))
-                        vistos.add(d_orig)
-                        encontrado = True
-                    break
-            if encontrado: break
-
-    # A. EVENTOS-RELEVANTES (Legacy)
-    archivos_a_subir = []
-    if generar_legacy:
-        top_5 = [{"evento_principal": nom, "detalle_evento": ev.get("detalle_evento", ""), "partidos": [pt]} for ev, pt, nom in eventos_seleccionados[:5]]
-        with open(ARCHIVO_LEGACY, 'w', encoding='utf-8') as f:
-            json.dump({"fecha_actualizacion": fecha_iso, "fecha_guia": hoy_str, "eventos_relevantes": top_5}, f, indent=4, ensure_ascii=False)
-        archivos_a_subir.append(ARCHIVO_LEGACY)
-        print(f" -> 💾 Generado: {ARCHIVO_LEGACY}")
-
-    # B. ROKU (Top 20 Limpio)
-    top_20_roku = []
-    limit_roku = min(len(eventos_seleccionados), 20)
-    for ev, pt, nom in eventos_seleccionados[:limit_roku]:
-        pt_clean = copy.deepcopy(pt)
-        pt_clean["detalle_partido"] = limpiar_texto_roku(pt.get("detalle_partido", ""))
-        pt_clean["descripcion"] = limpiar_texto_roku(pt.get("descripcion", ""))
-        pt_clean["horarios"] = limpiar_texto_roku(pt.get("horarios", ""))
-        pt_clean["canales"] = [limpiar_texto_roku(c) for c in pt.get("canales", [])]
-        pt_clean["organizador"] = limpiar_texto_roku(pt.get("organizador", ""))
-        top_20_roku.append({"evento_principal": limpiar_texto_roku(nom), "detalle_evento": limpiar_texto_roku(ev.get("detalle_evento", "")), "partidos": [pt_clean]})
-    
-    with open(ARCHIVO_ROKU, 'w', encoding='utf-8') as f:
-        json.dump({"fecha_actualizacion": fecha_iso, "fecha_guia": hoy_str, "eventos_relevantes": top_20_roku}, f, indent=4, ensure_ascii=False)
-    archivos_a_subir.append(ARCHIVO_ROKU)
-    print(f" -> 💾 Generado: {ARCHIVO_ROKU}")
-
-    # C. FIRE TV (Top 20 Emojis)
-    limit_fire = min(len(eventos_seleccionados), 20)
-    top_20_fire = [{"evento_principal": nom, "detalle_evento": ev.get("detalle_evento", ""), "partidos": [pt]} for ev, pt, nom in eventos_seleccionados[:limit_fire]]
-    with open(ARCHIVO_FIRE, 'w', encoding='utf-8') as f:
-        json.dump({"fecha_actualizacion": fecha_iso, "fecha_guia": hoy_str, "eventos_relevantes": top_20_fire}, f, indent=4, ensure_ascii=False)
-    archivos_a_subir.append(ARCHIVO_FIRE)
-    print(f" -> 💾 Generado: {ARCHIVO_FIRE}")
-
-    # D. WEB (Top Dinámico)
-    limit_real_web = min(len(eventos_seleccionados), limit_web)
-    top_web = [{"evento_principal": nom, "detalle_evento": ev.get("detalle_evento", ""), "partidos": [pt]} for ev, pt, nom in eventos_seleccionados[:limit_real_web]]
-    with open(ARCHIVO_WEB, 'w', encoding='utf-8') as f:
-        json.dump({"fecha_actualizacion": fecha_iso, "fecha_guia": hoy_str, "eventos_relevantes": top_web}, f, indent=4, ensure_ascii=False)
-    archivos_a_subir.append(ARCHIVO_WEB)
-    print(f" -> 💾 Generado: {ARCHIVO_WEB}")
+    # Mapeo IA -> Objetos JSON: el ranking ya viene en ids, basta un dict
+    with metricas.etapa("mapeo"):
+        por_id = {id_candidato(evento, partido): (evento, partido) for evento, partido in guia.partidos()}
+        for id_partido in ranking_ia:
+            encontrado = por_id.get(id_partido)
+            # El mismo partido puede aparecer en dos secciones de la guía
+            if encontrado and encontrado[1].descripcion not in vistos:
+                eventos_seleccionados.append(encontrado)
+                vistos.add(encontrado[1].descripcion)
+    metricas.contar("lineas_ia_sin_mapear", len(ranking_ia) - len(eventos_seleccionados))
+    # Más allá del top quedan los demás partidos con score > 0: las reservas de las reglas.
+    # Los que la IA dejó fuera (score 0) no entran nunca.
+    eventos_seleccionados, eventos_reserva = eventos_seleccionados[:TOP_RANKING], eventos_seleccionados[TOP_RANKING:]
+
+    # Los eventos ya terminados salen del ranking aunque venga del caché
+    ahora = datetime.now(timezone.utc).timestamp()
+    vigentes = [(e, p) for e, p in eventos_seleccionados if not partido_terminado(p.inicio_utc, ahora)]
+    if len(vigentes) < len(eventos_seleccionados):
+        print(f" -> ⏱️ Se descartaron {len(eventos_seleccionados) - len(vigentes)} eventos ya terminados.")
+        metricas.contar("eventos_terminados", len(eventos_seleccionados) - len(vigentes))
+    eventos_seleccionados = vigentes
+    eventos_reserva = [(e, p) for e, p in eventos_reserva if not partido_terminado(p.inicio_utc, ahora)]
+
+    # Reglas de distribución (topes por liga/deporte, variedad, rachas); solo los lugares que
+    # liberan los topes se rellenan con las reservas, y si no alcanzan la lista queda corta
+    with metricas.etapa("reglas"):
+        eventos_seleccionados = aplicar_reglas(eventos_seleccionados, eventos_reserva, TOP_RANKING, MAX_EVENTOS_POR_LIGA)
+    metricas.contar("eventos_seleccionados", len(eventos_seleccionados))
+    huella = huella_seleccion(eventos_seleccionados, hoy_str)
+    cambio = huella != cargar_estado(ARCHIVO_ESTADO_SELECCION).get("huella")
+    if not cambio:
+        print(" -> ℹ️ La selección es la misma que la publicada anteriormente.")
+
+    # Un solo recorrido de la selección para todos los feeds; Legacy solo si el publicado no es de hoy
+    destinos = [d for d in FEEDS_RANKER if generar_legacy or not d.diario]
+    with metricas.etapa("generacion"):
+        archivos_a_subir = escribir_feeds(destinos, eventos_seleccionados, fecha_actual_dt, hoy_str, pretty)
 
     print(f"--- 🚩 [5/5] Subida FTP con Reintentos ---")
     if not all([FTP_HOST, FTP_USUARIO, FTP_CONTRASENA]):
         print(" -> ❌ Error: Faltan credenciales FTP.")
-        return
+        metricas.error("configuracion")
+        return False
 
-    max_reintentos = 3
-
-    for intento in range(1, max_reintentos + 1):
-        try:
-            print(f" -> 🚀 Conectando a FTP (Intento {intento}/{max_reintentos})...")
-            with FTP(FTP_HOST, FTP_USUARIO, FTP_CONTRASENA, timeout=30) as ftp:
-                ftp.set_pasv(True)
-                ftp.cwd(RUTA_REMOTA_FTP)
-                print(f" -> ✅ Conexión establecida. Subiendo {len(archivos_a_subir)} archivos...")
-                
-                for archivo in archivos_a_subir:
-                    with open(archivo, 'rb') as file:
-                        ftp.storbinary(f'STOR {archivo}', file)
-                        print(f"    -> OK: {archivo}")
-                
-                print("--- 🏁 PROCESO FINALIZADO CON ÉXITO ---")
-                break 
-        
-        except Exception as e:
-            print(f" -> ⚠️ Error FTP en intento {intento}: {e}")
-            if intento < max_reintentos:
-                print(" -> ⏳ Reintentando en 5 segundos...")
-                time.sleep(5)
-            else:
-                print(" -> ❌ Se agotaron los reintentos FTP. El proceso falló.")
+    try:
+        # Cada archivo se reintenta por separado; ya no se resube todo al fallar uno
+        print(f" -> 🚀 Publicando {len(archivos_a_subir)} archivos en paralelo...")
+        with metricas.etapa("ftp"):
+            subidos = publicar_archivos(conectar_ftp, archivos_a_subir, MANIFIESTO_FTP)
+            status = publicar_status(conectar_ftp, archivos_a_subir)
+        guardar_artefactos(archivos_a_subir + ([status] if status else []))
+        metricas.contar("archivos_subidos", len(subidos))
+        metricas.contar("bytes_subidos", sum(r.bytes for r in subidos))
+        print("--- 🏁 PROCESO FINALIZADO CON ÉXITO ---")
+    except Exception as e:
+        print(f" -> ❌ Se agotaron los reintentos FTP. El proceso falló: {e}")
+        return False
+    # Solo tras publicar: si la subida falla, la próxima ejecución vuelve a contar como cambio
+    guardar_estado({"huella": huella, "fecha_guia": hoy_str}, ARCHIVO_ESTADO_SELECCION)
+    return cambio
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Rankea los eventos del día y publica los feeds Legacy/Roku/Fire/Web.")
+    parser.add_argument('--pretty', action='store_true', help="Escribe los JSON indentados (depuración) en lugar de minificados.")
+    parser.add_argument('--no-cache', action='store_true', help="Ignora el ranking guardado y consulta siempre a la IA.")
+    args = parser.parse_args()
+    main(pretty=args.pretty, usar_cache=not args.no_cache)
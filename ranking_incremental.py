@@ -0,0 +1,36 @@
+import hashlib
+import os
+
+from cache_fuente import DIRECTORIO_ESTADO, cargar_estado, guardar_estado
+from cache_ranking import normalizar_candidato
+
+# --- 1. CONFIGURACIÓN ---
+ARCHIVO_PUNTAJES = os.path.join(DIRECTORIO_ESTADO, 'puntajes.json')
+# Si cambió más de esta fracción de la guía conviene un ranking completo
+FRACCION_MAXIMA_INCREMENTAL = float(os.getenv('RANKING_FRACCION_INCREMENTAL', '0.5'))
+
+
+# --- 2. CANDIDATOS Y PUNTAJES ---
+def firma_candidato(linea):
+    """Identifica un partido por su línea normalizada: si cambia hora o canales cuenta como nuevo."""
+    return hashlib.sha1(normalizar_candidato(linea).encode('utf-8')).hexdigest()[:12]
+
+
+# --- 3. ESTADO ENTRE EJECUCIONES ---
+def cargar_puntajes(fecha_guia, version, ruta=ARCHIVO_PUNTAJES):
+    """Puntajes de la ejecución anterior si son de la misma guía y el mismo prompt/modelo."""
+    estado = cargar_estado(ruta)
+    if estado.get("fecha_guia") != fecha_guia or estado.get("version") != version:
+        return {}
+    return estado.get("puntajes", {})
+
+
+def guardar_puntajes(fecha_guia, version, puntajes, ruta=ARCHIVO_PUNTAJES):
+    guardar_estado({"fecha_guia": fecha_guia, "version": version, "puntajes": puntajes}, ruta)
+
+
+def ordenar_por_puntaje(candidatos, puntajes, limite=None):
+    """Ids de los `limite` candidatos (None = todos) con mayor score (> 0); empates en orden de guía."""
+    puntuados = [(puntajes.get(c.firma, 0), i, c.id) for i, c in enumerate(candidatos)]
+    puntuados.sort(key=lambda t: (-t[0], t[1]))
+    return [id_partido for score, _, id_partido in puntuados[:limite] if score > 0]
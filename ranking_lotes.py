@@ -0,0 +1,92 @@
+import contextvars
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# --- 1. CONFIGURACIÓN ---
+# Los lotes solo entran en juego cuando lo que va a la IA no cabe en un prompt. Con la
+# preselección por defecto del ranker (META_CANDIDATOS_IA=50, ~1000 tokens) siempre cabe;
+# aplican con META_CANDIDATOS_IA=0 (sin preselección) o con una preselección de ~150 o más.
+CARACTERES_POR_TOKEN = 4  # aproximación habitual para texto mixto español/inglés
+PRESUPUESTO_TOKENS_LOTE = int(os.getenv('RANKING_TOKENS_POR_LOTE', '3000'))
+MAX_PARTIDOS_POR_LOTE = int(os.getenv('RANKING_PARTIDOS_POR_LOTE', '60'))
+# Tope de llamadas: sin preselección una guía de ~2000 partidos serían ~33 lotes
+MAX_LOTES = int(os.getenv('RANKING_MAX_LOTES', '8'))
+LOTES_CONCURRENTES = int(os.getenv('RANKING_LOTES_CONCURRENTES', '4'))
+GANADORES_POR_LOTE = int(os.getenv('RANKING_GANADORES_POR_LOTE', '20'))
+
+
+# --- 2. ESTIMACIÓN Y DIVISIÓN ---
+def estimar_tokens(texto):
+    """Estimación barata (sin tokenizador): ~4 caracteres por token, redondeando hacia arriba."""
+    return math.ceil(len(texto) / CARACTERES_POR_TOKEN)
+
+
+def dividir_en_lotes(elementos, texto_de, presupuesto=PRESUPUESTO_TOKENS_LOTE, maximo=MAX_PARTIDOS_POR_LOTE):
+    """
+    Agrupa `elementos` en orden, sin pasar de `presupuesto` tokens ni de `maximo` elementos
+    por lote. Un elemento que por sí solo supera el presupuesto va en un lote propio.
+    """
+    lotes, actual, tokens = [], [], 0
+    for elemento in elementos:
+        costo = estimar_tokens(texto_de(elemento)) + 1  # +1 por el salto de línea
+        if actual and (tokens + costo > presupuesto or len(actual) >= maximo):
+            lotes.append(actual)
+            actual, tokens = [], 0
+        actual.append(elemento)
+        tokens += costo
+    if actual:
+        lotes.append(actual)
+    return lotes
+
+
+def dividir_con_tope(elementos, texto_de, prioridad, max_lotes=MAX_LOTES, **kwargs):
+    """
+    Como dividir_en_lotes, pero con a lo sumo `max_lotes` lotes: si no alcanzan, entran
+    los elementos de mayor `prioridad(elemento)` (p. ej. el score local), en su orden original.
+    Devuelve (lotes, descartados).
+    """
+    elegidos = list(elementos)
+    lotes = dividir_en_lotes(elegidos, texto_de, **kwargs)
+    while len(lotes) > max(1, max_lotes):
+        # Cuántos caben en los primeros lotes; las líneas de los mejores pueden ser más largas,
+        # así que se repite hasta que entren (cada vuelta quita al menos uno)
+        cupo = min(sum(len(lote) for lote in lotes[:max_lotes]), len(elegidos) - 1)
+        mejores = sorted(range(len(elegidos)), key=lambda i: (-prioridad(elegidos[i]), i))[:cupo]
+        elegidos = [elegidos[i] for i in sorted(mejores)]
+        lotes = dividir_en_lotes(elegidos, texto_de, **kwargs)
+    return lotes, len(elementos) - len(elegidos)
+
+
+# --- 3. MAP / REDUCE ---
+def puntuar_en_lotes(lotes, puntuar, concurrencia=LOTES_CONCURRENTES):
+    """
+    Ejecuta `puntuar(lote) -> {clave: score}` para cada lote en paralelo y une los
+    resultados. Un lote que falla se registra y se omite: no arrastra a los demás.
+    Devuelve (puntajes, lotes_fallidos).
+    """
+    puntajes, fallidos = {}, 0
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrencia, len(lotes)))) as executor:
+        # Cada tarea corre en una copia del contexto para que las métricas sigan activas
+        futuros = {executor.submit(contextvars.copy_context().run, puntuar, lote): n for n, lote in enumerate(lotes, 1)}
+        for futuro in as_completed(futuros):
+            try:
+                resultado = futuro.result()
+            except Exception as e:
+                resultado = None
+                print(f" -> ⚠️ Lote {futuros[futuro]}/{len(lotes)} falló: {e}")
+            if resultado:
+                puntajes.update(resultado)
+            else:
+                fallidos += 1
+    return puntajes, fallidos
+
+
+def ganadores_por_lote(lotes, puntajes, clave_de, por_lote=GANADORES_POR_LOTE):
+    """Los `por_lote` mejores elementos (score > 0) de cada lote, para la ronda final."""
+    ganadores = []
+    for lote in lotes:
+        puntuados = [e for e in lote if puntajes.get(clave_de(e), 0) > 0]
+        puntuados.sort(key=lambda e: -puntajes[clave_de(e)])
+        ganadores.extend(puntuados[:por_lote])
+    return ganadores
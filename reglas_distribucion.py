@@ -0,0 +1,135 @@
+import heapq
+import os
+
+from puntuacion_local import detectar_deporte, es_liga_sudamericana
+
+# --- 1. CONFIGURACIÓN ---
+# Reglas que antes se le pedían a la IA en el prompt; ahora se aplican aquí, siempre igual.
+MAX_FUTBOL = int(os.getenv('RANKING_MAX_FUTBOL', '12'))
+MIN_DEPORTES = int(os.getenv('RANKING_MIN_DEPORTES', '5'))
+MAX_SUDAMERICANAS = int(os.getenv('RANKING_MAX_SUDAMERICANAS', '3'))
+MAX_CONSECUTIVOS = int(os.getenv('RANKING_MAX_CONSECUTIVOS', '5'))
+
+
+# --- 2. REGLAS ---
+class _Seleccion:
+    """Conteos de la selección en curso para validar cada alta en O(1)."""
+
+    def __init__(self, max_por_liga):
+        self.max_por_liga = max_por_liga
+        self.items = []
+        self.por_liga = {}
+        self.por_deporte = {}
+        self.sudamericanas = 0
+
+    def admite(self, item):
+        if self.por_liga.get(item["liga"], 0) >= self.max_por_liga:
+            return False
+        if item["deporte"] == "futbol" and self.por_deporte.get("futbol", 0) >= MAX_FUTBOL:
+            return False
+        if item["sudamericana"] and self.sudamericanas >= MAX_SUDAMERICANAS:
+            return False
+        return True
+
+    def agregar(self, item):
+        self.items.append(item)
+        self._ajustar(item, 1)
+
+    def quitar(self, item):
+        self.items.remove(item)
+        self._ajustar(item, -1)
+
+    def _ajustar(self, item, delta):
+        self.por_liga[item["liga"]] = self.por_liga.get(item["liga"], 0) + delta
+        self.por_deporte[item["deporte"]] = self.por_deporte.get(item["deporte"], 0) + delta
+        if not self.por_deporte[item["deporte"]]:
+            del self.por_deporte[item["deporte"]]
+        self.sudamericanas += delta if item["sudamericana"] else 0
+
+
+def _completar_deportes(seleccion, pool, limite):
+    """
+    Si faltan deportes distintos, mete el mejor partido disponible de cada deporte ausente.
+    Con la lista llena sale el peor partido del deporte más repetido (que tenga más de uno).
+    """
+    elegidos = {id(item) for item in seleccion.items}
+    for item in pool:
+        if len(seleccion.por_deporte) >= MIN_DEPORTES:
+            return
+        if id(item) in elegidos or item["deporte"] in seleccion.por_deporte:
+            continue
+        if len(seleccion.items) >= limite:
+            if not seleccion.items:
+                return
+            mayoritario = max(seleccion.por_deporte, key=seleccion.por_deporte.get)
+            if seleccion.por_deporte[mayoritario] < 2:
+                return
+            peor = max((i for i in seleccion.items if i["deporte"] == mayoritario), key=lambda i: i["posicion"])
+            seleccion.quitar(peor)
+            if not seleccion.admite(item):
+                seleccion.agregar(peor)
+                continue
+        elif not seleccion.admite(item):
+            continue
+        seleccion.agregar(item)
+        elegidos.add(id(item))
+
+
+def _intercalar(items):
+    """
+    Orden final por posición original, pero sin más de MAX_CONSECUTIVOS seguidos del mismo
+    deporte: cuando toca romper la racha se adelanta el mejor de otro deporte (cola de prioridad).
+    """
+    cola = [(item["posicion"], n, item) for n, item in enumerate(items)]
+    heapq.heapify(cola)
+    salida, racha, ultimo = [], 0, None
+    while cola:
+        apartados = []
+        elegido = heapq.heappop(cola)
+        while racha >= MAX_CONSECUTIVOS and elegido[2]["deporte"] == ultimo and cola:
+            apartados.append(elegido)
+            elegido = heapq.heappop(cola)
+        if racha >= MAX_CONSECUTIVOS and elegido[2]["deporte"] == ultimo:
+            apartados.append(elegido)
+            elegido = None
+        for apartado in apartados:
+            heapq.heappush(cola, apartado)
+        if elegido is None:
+            # Solo queda un deporte: no hay con qué intercalar
+            elegido = heapq.heappop(cola)
+        item = elegido[2]
+        racha = racha + 1 if item["deporte"] == ultimo else 1
+        ultimo = item["deporte"]
+        salida.append(item)
+    return salida
+
+
+def aplicar_reglas(ranking, reservas, limite, max_por_liga):
+    """
+    Aplica al ranking de la IA los topes por liga, fútbol y ligas sudamericanas, el mínimo
+    de deportes distintos y el máximo de eventos consecutivos de un deporte. Solo los lugares
+    que liberan los topes se rellenan con `reservas` (en orden de preferencia; deben ser
+    partidos que la IA puntuó): la lista nunca pasa del largo del ranking, y queda corta si
+    no alcanzan. Ambas listas son de (Evento, Partido); devuelve la lista final, de largo
+    <= min(limite, len(ranking)).
+    """
+    limite = min(limite, len(ranking))
+    pool = []
+    for posicion, (evento, partido) in enumerate(list(ranking) + list(reservas)):
+        pool.append({
+            "posicion": posicion,
+            "par": (evento, partido),
+            "liga": evento.evento_principal,
+            "deporte": detectar_deporte(evento, partido),
+            "sudamericana": es_liga_sudamericana(evento),
+        })
+
+    seleccion = _Seleccion(max_por_liga)
+    for item in pool:
+        if len(seleccion.items) >= limite:
+            break
+        if seleccion.admite(item):
+            seleccion.agregar(item)
+
+    _completar_deportes(seleccion, pool, limite)
+    return [item["par"] for item in _intercalar(seleccion.items)]
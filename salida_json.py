@@ -0,0 +1,41 @@
+import gzip
+import json
+
+try:
+    import brotli
+except ImportError:  # Dependencia opcional: sin ella solo se genera la variante .gz
+    brotli = None
+
+# --- 1. CONFIGURACIÓN ---
+NIVEL_GZIP = 9
+CALIDAD_BROTLI = 11
+
+
+# --- 2. SERIALIZACIÓN ---
+def serializar_json(datos, pretty=False):
+    """JSON minificado por defecto; con pretty=True conserva el formato indentado para depurar."""
+    if pretty:
+        return json.dumps(datos, indent=4, ensure_ascii=False)
+    return json.dumps(datos, ensure_ascii=False, separators=(',', ':'))
+
+
+def escribir_json_publicable(nombre_archivo, contenido):
+    """
+    Escribe el JSON y sus copias precomprimidas (.gz y, si hay brotli, .br) para que el
+    servidor web las entregue directamente. Devuelve la lista de archivos escritos.
+    """
+    datos = contenido.encode('utf-8')
+    escritos = [nombre_archivo]
+    with open(nombre_archivo, 'wb') as f:
+        f.write(datos)
+
+    # mtime=0 hace la salida determinista: sin cambios en el JSON, el .gz no cambia de hash
+    with open(f"{nombre_archivo}.gz", 'wb') as f:
+        f.write(gzip.compress(datos, compresslevel=NIVEL_GZIP, mtime=0))
+    escritos.append(f"{nombre_archivo}.gz")
+
+    if brotli is not None:
+        with open(f"{nombre_archivo}.br", 'wb') as f:
+            f.write(brotli.compress(datos, quality=CALIDAD_BROTLI))
+        escritos.append(f"{nombre_archivo}.br")
+    return escritos
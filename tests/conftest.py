@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Los módulos viven en la raíz del repositorio (sin paquete)
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.join(RAIZ, "benchmarks"))
@@ -0,0 +1,55 @@
+import functools
+import hashlib
+import os
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import almacen_artefactos
+import cliente_http
+
+CONTENIDO = b'{"fecha_guia": "2026-10-18"}'
+
+
+class Silencioso(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def publicado(tmp_path):
+    """Sirve tmp_path/servidor por HTTP y deja en el almacén una copia de ayer de guia.json."""
+    servidor_dir, almacen_dir = tmp_path / "servidor", tmp_path / "almacen"
+    servidor_dir.mkdir()
+    almacen_dir.mkdir()
+    (servidor_dir / "guia.json").write_bytes(b'{"fecha_guia": "2026-10-18", "servidor": true}')
+    (almacen_dir / "guia.json").write_bytes(CONTENIDO)
+    ayer = time.time() - 86400
+    os.utime(almacen_dir / "guia.json", (ayer, ayer))
+
+    http = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(Silencioso, directory=str(servidor_dir)))
+    threading.Thread(target=http.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{http.server_port}/guia.json", almacen_artefactos.AlmacenLocal(str(almacen_dir))
+    http.shutdown()
+    cliente_http.cerrar_sesiones()
+
+
+def test_hash_del_status_valida_la_copia_sin_importar_la_edad(publicado, monkeypatch):
+    url, almacen = publicado
+    monkeypatch.setattr(cliente_http, "get", lambda *a, **k: pytest.fail("no debe pedir nada al servidor"))
+    status = {"sha256": hashlib.sha256(CONTENIDO).hexdigest()}
+    assert almacen_artefactos.obtener_bytes(url, almacen=almacen, status=status) == (CONTENIDO, "local")
+
+
+def test_hash_distinto_descarga(publicado):
+    url, almacen = publicado
+    datos, origen = almacen_artefactos.obtener_bytes(url, almacen=almacen, status={"sha256": "0" * 64})
+    assert origen == "http" and b"servidor" in datos
+
+
+def test_sin_status_decide_la_edad(publicado):
+    url, almacen = publicado
+    assert almacen_artefactos.obtener_bytes(url, almacen=almacen)[1] == "http"
+    assert almacen_artefactos.obtener_bytes(url, almacen=almacen, max_edad=2 * 86400)[1] == "local"
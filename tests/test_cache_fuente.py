@@ -0,0 +1,96 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import actualizador_web
+import cliente_http
+from cache_fuente import cabeceras_condicionales, cargar_estado, guardar_estado, hash_texto_guia
+from generador_guia import generar_pagina_html
+
+
+def test_estado_persistido_y_archivo_danado(tmp_path):
+    ruta = str(tmp_path / ".estado" / "fuente.json")
+    assert cargar_estado(ruta) == {}
+    guardar_estado({"etag": '"v1"', "last_modified": "Sun, 18 Oct 2026 10:00:00 GMT"}, ruta)
+    estado = cargar_estado(ruta)
+    assert cabeceras_condicionales(estado) == {"If-None-Match": '"v1"',
+                                              "If-Modified-Since": "Sun, 18 Oct 2026 10:00:00 GMT"}
+    with open(ruta, "w", encoding="utf-8") as f:
+        f.write("{a medias")
+    assert cargar_estado(ruta) == {}
+
+
+def test_hash_ignora_espacios_y_lineas_vacias():
+    assert hash_texto_guia("🏀 NBA\n\n  Lakers vs Celtics  \n") == hash_texto_guia("🏀 NBA\nLakers vs Celtics")
+    assert hash_texto_guia("🏀 NBA") != hash_texto_guia("🏀 WNBA")
+
+
+@pytest.fixture
+def fuente(tmp_path, monkeypatch):
+    """Página de la fuente servida en local con ETag; responde 304 si el validador coincide."""
+    sitio = {"pagina": generar_pagina_html(40).encode("utf-8"), "etag": '"v1"', "peticiones": []}
+
+    class Manejador(BaseHTTPRequestHandler):
+        def do_GET(self):
+            sitio["peticiones"].append(dict(self.headers))
+            if self.headers.get("If-None-Match") == sitio["etag"]:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("ETag", sitio["etag"])
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(sitio["pagina"])))
+            self.end_headers()
+            self.wfile.write(sitio["pagina"])
+
+        def log_message(self, *args):
+            pass
+
+    http = ThreadingHTTPServer(("127.0.0.1", 0), Manejador)
+    threading.Thread(target=http.serve_forever, daemon=True).start()
+
+    # Publicación simulada: se registra cada llamada en lugar de subir por FTP
+    publicaciones = []
+    ruta_estado = str(tmp_path / ".estado" / "fuente.json")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(actualizador_web, "URL_FUENTE", f"http://127.0.0.1:{http.server_port}/")
+    monkeypatch.setattr(actualizador_web, "cargar_estado", lambda: cargar_estado(ruta_estado))
+    monkeypatch.setattr(actualizador_web, "guardar_estado", lambda estado: guardar_estado(estado, ruta_estado))
+    for variable in ("FTP_HOST", "FTP_USUARIO", "FTP_CONTRASENA"):
+        monkeypatch.setattr(actualizador_web, variable, "x")
+    monkeypatch.setattr(actualizador_web, "publicar_archivos",
+                        lambda conectar, archivos, manifiesto, forzar=False: publicaciones.append(forzar) or [])
+    monkeypatch.setattr(actualizador_web, "publicar_status", lambda conectar, archivos: None)
+    monkeypatch.setattr(actualizador_web, "guardar_artefactos", lambda rutas: None)
+    yield sitio, publicaciones, ruta_estado
+    http.shutdown()
+    cliente_http.cerrar_sesiones()
+
+
+def test_304_no_publica(fuente):
+    sitio, publicaciones, ruta_estado = fuente
+    assert actualizador_web.main() is True
+    assert cargar_estado(ruta_estado)["etag"] == '"v1"'
+
+    assert actualizador_web.main() is False
+    assert sitio["peticiones"][-1].get("If-None-Match") == '"v1"'
+    assert publicaciones == [False]
+
+
+def test_mismo_texto_con_otro_etag_solo_refresca_validadores(fuente):
+    sitio, publicaciones, ruta_estado = fuente
+    actualizador_web.main()
+    sitio["etag"] = '"v2"'                       # Wix regenera la página con el mismo contenido
+    assert actualizador_web.main() is False
+    assert publicaciones == [False]
+    assert cargar_estado(ruta_estado)["etag"] == '"v2"'
+
+
+def test_force_ignora_validadores_y_hash(fuente):
+    sitio, publicaciones, _ = fuente
+    actualizador_web.main()
+    assert actualizador_web.main(forzar=True) is True
+    assert "If-None-Match" not in sitio["peticiones"][-1]
+    assert publicaciones == [False, True]
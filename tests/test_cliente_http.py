@@ -0,0 +1,87 @@
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+import requests
+
+import cliente_http
+
+
+def puerto_libre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def servidor():
+    """Servidor local que responde con la lista `respuestas` (estado, headers, cuerpo) en orden."""
+    recibidas = []
+    respuestas = []
+
+    class Manejador(BaseHTTPRequestHandler):
+        def do_POST(self):
+            recibidas.append(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            estado, headers, cuerpo = respuestas.pop(0) if respuestas else (200, {}, b'{"ok": true}')
+            if estado is None:  # corta la conexión sin responder (RemoteDisconnected)
+                self.close_connection = True
+                return
+            self.send_response(estado)
+            for nombre, valor in headers.items():
+                self.send_header(nombre, valor)
+            self.send_header('Content-Length', str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def log_message(self, *args):
+            pass
+
+    http = HTTPServer(("127.0.0.1", 0), Manejador)
+    hilo = threading.Thread(target=http.serve_forever, daemon=True)
+    hilo.start()
+    yield f"http://127.0.0.1:{http.server_port}/enviar", respuestas, recibidas
+    http.shutdown()
+    cliente_http.cerrar_sesiones()
+
+
+@pytest.fixture(autouse=True)
+def sin_esperas(monkeypatch):
+    monkeypatch.setattr(cliente_http.time, "sleep", lambda segundos: None)
+
+
+def test_post_con_conexion_rechazada_se_reintenta():
+    with pytest.raises(requests.exceptions.ConnectionError) as fallo:
+        cliente_http.post(f"http://127.0.0.1:{puerto_libre()}/", reintentos=1)
+    assert cliente_http._no_enviada(fallo.value)
+
+
+def test_post_cortado_por_el_servidor_no_se_reenvia(servidor):
+    url, respuestas, recibidas = servidor
+    respuestas.append((None, {}, b""))
+    with pytest.raises(requests.exceptions.ConnectionError):
+        cliente_http.post(url, data=b"mensaje", reintentos=3)
+    assert recibidas == [b"mensaje"]
+
+
+def test_post_429_solo_se_reintenta_con_retry_after(servidor):
+    url, respuestas, recibidas = servidor
+    cuerpo_telegram = json.dumps({"ok": False, "error_code": 429, "parameters": {"retry_after": 1}}).encode()
+    respuestas.append((429, {}, cuerpo_telegram))
+    assert cliente_http.post(url, data=b"a").status_code == 200
+    assert len(recibidas) == 2
+
+    respuestas.append((429, {}, b'{"ok": false}'))
+    assert cliente_http.post(url, data=b"b").status_code == 429
+    assert len(recibidas) == 3
+
+
+def test_post_con_5xx_no_se_reintenta_pero_get_si(servidor):
+    url, respuestas, recibidas = servidor
+    respuestas.append((503, {}, b""))
+    assert cliente_http.post(url, data=b"a").status_code == 503
+    assert len(recibidas) == 1
+    respuestas.append((503, {}, b""))
+    assert cliente_http.peticion("POST", url, data=b"b", idempotente=True).status_code == 200
+    assert len(recibidas) == 3
@@ -0,0 +1,110 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from demonio import TAREAS, dia_programado, en_ventana, parsear_cron, proxima_ejecucion
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+# 2026-10-18 es domingo
+DOMINGO = utc(2026, 10, 18, 14, 30)
+
+
+def test_campos_con_listas_rangos_y_pasos():
+    (minutos, horas, dias, meses, semana), con_dia, con_semana = parsear_cron("*/15 8-10,20 1 */6 1-5/2")
+    assert minutos == {0, 15, 30, 45}
+    assert horas == {8, 9, 10, 20}
+    assert dias == {1}
+    assert meses == {1, 7}
+    assert semana == {1, 3, 5}
+    assert con_dia and con_semana
+
+
+@pytest.mark.parametrize("expresion", ["", "* * * *", "60 * * * *", "* 24 * * *", "* * 0 * *", "* * * 13 *",
+                                       "* * * * 7", "a * * * *"])
+def test_expresiones_invalidas(expresion):
+    with pytest.raises(ValueError):
+        parsear_cron(expresion)
+
+
+@pytest.mark.parametrize("expresion, esperada", [
+    ("0 8,12,16,20 * * *", utc(2026, 10, 18, 16, 0)),
+    ("17 0,3,10,13,16,20 * * *", utc(2026, 10, 18, 16, 17)),
+    ("0 14 * * 6,0", utc(2026, 10, 24, 14, 0)),          # el domingo a las 14:00 ya pasó
+    ("30 14 * * *", utc(2026, 10, 19, 14, 30)),          # estrictamente posterior a `desde`
+    ("*/15 * * * *", utc(2026, 10, 18, 14, 45)),
+    ("0 0 1 1 *", utc(2027, 1, 1, 0, 0)),
+    ("0 0 29 2 *", utc(2028, 2, 29, 0, 0)),
+    ("0 0 1 * 1", utc(2026, 10, 19, 0, 0)),              # día del mes O día de la semana
+])
+def test_proxima_ejecucion(expresion, esperada):
+    assert proxima_ejecucion(expresion, DOMINGO) == esperada
+
+
+def test_proxima_ejecucion_ignora_segundos():
+    assert proxima_ejecucion("* * * * *", utc(2026, 10, 18, 23, 59, 59)) == utc(2026, 10, 19, 0, 0)
+
+
+def test_expresion_que_nunca_se_cumple():
+    with pytest.raises(ValueError):
+        proxima_ejecucion("0 0 31 2 *", DOMINGO)
+
+
+def test_horarios_por_defecto_validos():
+    for tarea in TAREAS:
+        assert proxima_ejecucion(tarea.horario, DOMINGO) > DOMINGO
+
+
+def test_dia_programado():
+    assert dia_programado("0 14 * * 6,0", DOMINGO)
+    assert not dia_programado("0 14 * * 6,0", utc(2026, 10, 19, 14, 0))
+    assert not dia_programado("", DOMINGO)
+
+
+def test_ventana_en_hora_de_mexico():
+    # 14:30 UTC = 08:30 en Ciudad de México
+    assert en_ventana("08:00-22:00", DOMINGO)
+    assert not en_ventana("09:00-22:00", DOMINGO)
+    assert en_ventana("22:00-09:00", DOMINGO)           # cruza la medianoche
+    assert not en_ventana("22:00-08:00", DOMINGO)
+
+
+@pytest.fixture
+def guarda(monkeypatch):
+    """Fecha publicada simulada (None = falla la consulta) y registro de ejecuciones del actualizador."""
+    import demonio
+    ejecuciones = []
+    publicada = {"fecha": None}
+
+    def consultar_status(url):
+        if publicada["fecha"] is None:
+            raise OSError("sin red")
+        return {"fecha_guia": publicada["fecha"]}
+
+    monkeypatch.setattr(demonio, "consultar_status", consultar_status)
+    monkeypatch.setattr(demonio.actualizador_web, "main", lambda: ejecuciones.append(1) or True)
+    return demonio, publicada, ejecuciones
+
+
+def test_guarda_no_pisa_la_guia_de_hoy(guarda):
+    demonio, publicada, ejecuciones = guarda
+    publicada["fecha"] = datetime.now(demonio.MEXICO_TZ).strftime('%Y-%m-%d')
+    assert demonio.actualizar_guia() is False and ejecuciones == []
+
+
+def test_guarda_actualiza_guia_vieja_o_si_falla_la_consulta(guarda):
+    demonio, publicada, ejecuciones = guarda
+    assert demonio.actualizar_guia() is True          # consulta fallida: por seguridad se actualiza
+    publicada["fecha"] = "2000-01-01"
+    assert demonio.actualizar_guia() is True
+    assert len(ejecuciones) == 2
+
+
+def test_guarda_desactivable(guarda, monkeypatch):
+    demonio, publicada, ejecuciones = guarda
+    publicada["fecha"] = datetime.now(demonio.MEXICO_TZ).strftime('%Y-%m-%d')
+    monkeypatch.setattr(demonio, "PROTEGER_GUIA_DEL_DIA", False)
+    assert demonio.actualizar_guia() is True and ejecuciones == [1]
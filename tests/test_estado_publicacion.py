@@ -0,0 +1,52 @@
+import pytest
+
+import estado_publicacion
+
+
+class RespuestaFalsa:
+    def __init__(self, datos, codigo=200):
+        self.datos, self.status_code = datos, codigo
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise OSError(f"HTTP {self.status_code}")
+
+    def json(self):
+        return self.datos
+
+
+@pytest.fixture
+def peticiones(monkeypatch):
+    """status.json simulado del sitio; registra cada URL pedida."""
+    pedidas = []
+    status = {"archivos": {"events.json": {"sha256": "a", "fecha_guia": "2026-10-18"},
+                           "eventos-relevantes.json": {"sha256": "b", "fecha_guia": "2026-10-17"}}}
+
+    def get(url, **kwargs):
+        pedidas.append(url)
+        return RespuestaFalsa(status)
+
+    monkeypatch.setattr(estado_publicacion.cliente_http, "get", get)
+    return pedidas
+
+
+def test_un_status_sirve_para_todos_los_archivos_del_directorio(peticiones):
+    status = estado_publicacion.leer_status("https://sitio.test/events.json")
+    assert estado_publicacion.consultar_status("https://sitio.test/events.json", status)["sha256"] == "a"
+    assert estado_publicacion.consultar_status("https://sitio.test/eventos-relevantes.json", status)["sha256"] == "b"
+    assert estado_publicacion.consultar_status("https://sitio.test/otro.json", status) is None
+    assert peticiones == ["https://sitio.test/status.json"]
+
+
+def test_otro_directorio_o_sin_status_lo_pide(peticiones):
+    status = estado_publicacion.leer_status("https://sitio.test/events.json")
+    estado_publicacion.consultar_status("https://otro.test/feeds/events.json", status)
+    estado_publicacion.consultar_status("https://sitio.test/events.json")
+    assert peticiones == ["https://sitio.test/status.json", "https://otro.test/feeds/status.json",
+                          "https://sitio.test/status.json"]
+
+
+def test_status_ilegible_no_tiene_entradas(monkeypatch):
+    monkeypatch.setattr(estado_publicacion.cliente_http, "get", lambda url, **k: RespuestaFalsa(None, 403))
+    status = estado_publicacion.leer_status("https://sitio.test/events.json")
+    assert estado_publicacion.consultar_status("https://sitio.test/events.json", status) is None
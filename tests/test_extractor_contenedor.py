@@ -0,0 +1,64 @@
+import pytest
+
+from extractor_contenedor import ExtractorContenedor, extraer_texto_contenedor
+from generador_guia import generar_pagina_html
+
+ID = "comp-khhybsn1"
+
+
+def fragmentos(texto, tamano):
+    return [texto[i:i + tamano] for i in range(0, len(texto), tamano)]
+
+
+def test_extrae_solo_el_contenedor():
+    html = f'<div id="otro">fuera</div><div id="{ID}"><p>uno</p><p><span>dos</span></p></div><p>después</p>'
+    assert extraer_texto_contenedor([html], ID) == "uno\ndos"
+
+
+def test_sin_contenedor_devuelve_none():
+    assert extraer_texto_contenedor(["<div id='x'>a</div>"], ID) is None
+
+
+def test_omite_script_style_y_template_y_decodifica_entidades():
+    html = (f'<div id="{ID}"><script>var a = "<p>no</p>";</script>a &amp; b&nbsp;c'
+            f'<style>p {{}}</style><template><p>no</p></template><!-- x -->d</div>')
+    assert extraer_texto_contenedor([html], ID) == "a & b\xa0c\nd"
+
+
+def test_anidado_incorrecto_cierra_como_beautifulsoup():
+    assert extraer_texto_contenedor([f'<div id="{ID}"><p>a<div>b</p>c</div>d</div>'], ID) == "a\nb\nc"
+    assert extraer_texto_contenedor([f'<div id="{ID}">a</span>b<br>c</br>d</div>'], ID) == "a\nb\ncd"
+
+
+@pytest.mark.parametrize("tamano", [1, 7, 64, 4096])
+def test_fragmentos_de_bytes_partidos_en_cualquier_punto(tamano):
+    html = f'<div id="{ID}"><p>Fútbol ⚽️</p><p>Pacífico &amp; Centro</p></div>'.encode("utf-8")
+    assert extraer_texto_contenedor(fragmentos(html, tamano), ID) == "Fútbol ⚽️\nPacífico & Centro"
+
+
+def test_deja_de_leer_al_cerrar_el_contenedor():
+    leidos = []
+
+    def fuente():
+        for parte in [f'<div id="{ID}">a</div>', "<p>b</p>", "<p>c</p>"]:
+            leidos.append(parte)
+            yield parte
+
+    assert extraer_texto_contenedor(fuente(), ID) == "a"
+    assert len(leidos) == 1
+
+
+def test_pagina_sintetica_igual_a_beautifulsoup():
+    bs4 = pytest.importorskip("bs4")
+    pagina = generar_pagina_html(300)
+    bloque = bs4.BeautifulSoup(pagina, "html.parser").find("div", {"id": ID})
+    esperado = bloque.get_text(separator="\n", strip=True)
+    assert extraer_texto_contenedor(fragmentos(pagina.encode("utf-8"), 1000), ID) == esperado
+
+
+def test_extractor_marca_terminado():
+    extractor = ExtractorContenedor(ID)
+    extractor.feed(f'<div id="{ID}"><div>a</div>')
+    assert not extractor.terminado
+    extractor.feed("</div>")
+    assert extractor.terminado
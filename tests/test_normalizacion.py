@@ -0,0 +1,17 @@
+from normalizacion import EMOJIS_PLANTILLA_TELEGRAM, deporte_por_emoji, limpiar_roku, quitar_emojis
+
+
+def test_limpiar_roku_quita_emojis_invisibles_y_espacios():
+    assert limpiar_roku("⚽️  Liga​MX 🏴\U000E0067\U000E0062\U000E007F  Final ") == "LigaMX Final"
+    assert quitar_emojis("🏀 NBA") == " NBA"
+    assert limpiar_roku("") == quitar_emojis(None) == ""
+
+
+def test_orden_de_prioridad_de_cada_consumidor():
+    # Score local: básquetbol antes que béisbol y tenis antes que golf
+    assert deporte_por_emoji("⚾️🏀 Doble cartelera") == "basquetbol"
+    assert deporte_por_emoji("🎾⛳️ Fin de semana") == "tenis"
+    # Plantillas de Telegram: béisbol antes que básquetbol; tenis y combate no tienen plantilla
+    assert deporte_por_emoji("⚾️🏀 Doble cartelera", EMOJIS_PLANTILLA_TELEGRAM) == "beisbol"
+    assert deporte_por_emoji("🎾⛳️ Fin de semana", EMOJIS_PLANTILLA_TELEGRAM) == "golf"
+    assert deporte_por_emoji("🥊 Box", EMOJIS_PLANTILLA_TELEGRAM) is None
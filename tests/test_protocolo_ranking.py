@@ -0,0 +1,52 @@
+import json
+
+from protocolo_ranking import Candidato, parsear_respuesta
+
+CANDIDATOS = [
+    Candidato("a1b2c3d4", "ID: a1b2c3d4 | ...", "América vs Chivas", "firma-1", 80),
+    Candidato("e5f6a7b8", "ID: e5f6a7b8 | ...", "Lakers vs Celtics", "firma-2", 60),
+    Candidato("c9d0e1f2", "ID: c9d0e1f2 | ...", "Dodgers vs Yankees", "firma-3", 50),
+]
+
+
+def respuesta(*entradas):
+    return json.dumps({"ranking": [{"id": i, "score": s} for i, s in entradas]})
+
+
+def test_traduce_ids_a_firmas_en_orden():
+    texto = respuesta(("e5f6a7b8", 90), ("a1b2c3d4", 70))
+    assert list(parsear_respuesta(texto, CANDIDATOS).items()) == [("firma-2", 90), ("firma-1", 70)]
+
+
+def test_acepta_lista_sin_objeto_y_bloque_de_codigo():
+    texto = '```json\n[{"id": "a1b2c3d4", "score": 55}]\n```'
+    assert parsear_respuesta(texto, CANDIDATOS) == {"firma-1": 55}
+
+
+def test_descarta_repetidos_desconocidos_y_scores_invalidos():
+    texto = json.dumps({"ranking": [
+        {"id": "a1b2c3d4", "score": 40},
+        {"id": "a1b2c3d4", "score": 99},      # repetido: vale el primero
+        {"id": "zzzzzzzz", "score": 50},      # id desconocido
+        {"id": "e5f6a7b8", "score": True},    # booleano
+        {"id": "e5f6a7b8", "score": "alto"},  # texto no numérico
+        "c9d0e1f2",                           # entrada sin forma de objeto
+    ]})
+    assert parsear_respuesta(texto, CANDIDATOS) == {"firma-1": 40}
+
+
+def test_acota_score_y_acepta_numeros_en_texto():
+    texto = respuesta(("a1b2c3d4", 150), ("e5f6a7b8", -5), ("c9d0e1f2", "42"))
+    assert parsear_respuesta(texto, CANDIDATOS) == {"firma-1": 100, "firma-2": 0, "firma-3": 42}
+
+
+def test_descripcion_en_lugar_de_id():
+    texto = respuesta(("Lakers vs. Celtics", 77))
+    assert parsear_respuesta(texto, CANDIDATOS) == {"firma-2": 77}
+
+
+def test_respuesta_invalida_devuelve_none():
+    assert parsear_respuesta("no es json", CANDIDATOS) is None
+    assert parsear_respuesta('{"otra": []}', CANDIDATOS) is None
+    assert parsear_respuesta(respuesta(("zzzzzzzz", 50)), CANDIDATOS) is None
+    assert parsear_respuesta(None, CANDIDATOS) is None
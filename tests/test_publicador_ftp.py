@@ -0,0 +1,228 @@
+import json
+import logging
+import os
+import threading
+from ftplib import FTP, error_perm
+
+import pytest
+
+import publicador_ftp
+from publicador_ftp import publicar_archivos, renombrar_remoto, subir_atomico
+
+
+class ServidorFalso:
+    """Sistema de archivos remoto compartido por todas las conexiones falsas."""
+
+    def __init__(self, sobrescribe_al_renombrar=True):
+        self.archivos = {}
+        self.operaciones = []
+        self.fallos_stor = {}            # nombre remoto -> fallos que quedan
+        self.sobrescribe_al_renombrar = sobrescribe_al_renombrar
+        self.conexiones = 0
+
+    def conectar(self):
+        self.conexiones += 1
+        return ConexionFalsa(self)
+
+
+class ConexionFalsa:
+    def __init__(self, servidor):
+        self.servidor = servidor
+
+    def storbinary(self, comando, archivo):
+        nombre = comando.split(" ", 1)[1]
+        if self.servidor.fallos_stor.get(nombre):
+            self.servidor.fallos_stor[nombre] -= 1
+            raise OSError("conexión reiniciada")
+        self.servidor.archivos[nombre] = archivo.read()
+        self.servidor.operaciones.append(("STOR", nombre))
+
+    def retrbinary(self, comando, callback):
+        nombre = comando.split(" ", 1)[1]
+        if nombre not in self.servidor.archivos:
+            raise error_perm("550 no existe")
+        callback(self.servidor.archivos[nombre])
+
+    def rename(self, origen, destino):
+        if destino in self.servidor.archivos and not self.servidor.sobrescribe_al_renombrar:
+            raise error_perm("553 el destino existe")
+        self.servidor.archivos[destino] = self.servidor.archivos.pop(origen)
+        self.servidor.operaciones.append(("RENAME", origen, destino))
+
+    def delete(self, nombre):
+        del self.servidor.archivos[nombre]
+        self.servidor.operaciones.append(("DELE", nombre))
+
+    def quit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def directorio(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(publicador_ftp, "DIRECTORIO_ESTADO", str(tmp_path / ".estado"))
+    monkeypatch.setattr(publicador_ftp, "ESPERA_BASE_REINTENTO", 0)
+    for nombre, contenido in {"a.json": "{}", "b.html": "<p>b</p>", "c.txt": "c"}.items():
+        (tmp_path / nombre).write_text(contenido, encoding="utf-8")
+    return tmp_path
+
+
+def test_subida_atomica_por_nombre_temporal():
+    servidor = ServidorFalso()
+    subir_atomico(servidor.conectar(), b"datos", "events.json")
+    assert servidor.operaciones == [("STOR", "events.json.tmp"), ("RENAME", "events.json.tmp", "events.json")]
+    assert servidor.archivos == {"events.json": b"datos"}
+
+
+def test_renombrar_sobre_destino_existente():
+    servidor = ServidorFalso(sobrescribe_al_renombrar=False)
+    servidor.archivos = {"x.json": b"viejo", "x.json.tmp": b"nuevo"}
+    renombrar_remoto(servidor.conectar(), "x.json.tmp", "x.json")
+    assert servidor.archivos == {"x.json": b"nuevo"}
+    assert ("DELE", "x.json") in servidor.operaciones
+
+
+def test_primera_publicacion_sube_todo_y_el_manifiesto(directorio):
+    servidor = ServidorFalso()
+    subidos = publicar_archivos(servidor.conectar, ["a.json", "b.html", "c.txt"], "manifiesto.json")
+    assert sorted(r.nombre for r in subidos) == ["a.json", "b.html", "c.txt"]
+    manifiesto = json.loads(servidor.archivos["manifiesto.json"])
+    assert set(manifiesto["archivos"]) == {"a.json", "b.html", "c.txt"}
+    assert (directorio / ".estado" / "manifiesto.json").exists()
+
+
+def test_solo_sube_lo_que_cambio(directorio):
+    servidor = ServidorFalso()
+    archivos = ["a.json", "b.html", "c.txt"]
+    publicar_archivos(servidor.conectar, archivos, "manifiesto.json")
+    assert publicar_archivos(servidor.conectar, archivos, "manifiesto.json") == []
+
+    (directorio / "b.html").write_text("<p>otro</p>", encoding="utf-8")
+    subidos = publicar_archivos(servidor.conectar, archivos, "manifiesto.json")
+    assert [r.nombre for r in subidos] == ["b.html"]
+    assert servidor.archivos["b.html"] == b"<p>otro</p>"
+
+
+def test_forzar_sube_aunque_no_cambie(directorio):
+    servidor = ServidorFalso()
+    publicar_archivos(servidor.conectar, ["a.json"], "manifiesto.json")
+    assert [r.nombre for r in publicar_archivos(servidor.conectar, ["a.json"], "manifiesto.json", forzar=True)] == ["a.json"]
+
+
+def test_reintenta_solo_el_archivo_fallido_con_conexion_nueva(directorio):
+    servidor = ServidorFalso()
+    servidor.fallos_stor = {"b.html.tmp": 1}
+    subidos = {r.nombre: r for r in publicar_archivos(servidor.conectar, ["a.json", "b.html"], "manifiesto.json",
+                                                      conexiones=1)}
+    assert subidos["b.html"].intentos == 2
+    assert subidos["a.json"].intentos == 1
+    assert servidor.conexiones >= 2
+
+
+def test_fallo_definitivo_conserva_hash_anterior(directorio):
+    servidor = ServidorFalso()
+    publicar_archivos(servidor.conectar, ["a.json", "b.html"], "manifiesto.json")
+    anterior = json.loads(servidor.archivos["manifiesto.json"])["archivos"]["b.html"]
+
+    (directorio / "a.json").write_text('{"v": 2}', encoding="utf-8")
+    (directorio / "b.html").write_text("<p>nuevo</p>", encoding="utf-8")
+    servidor.fallos_stor = {"b.html.tmp": publicador_ftp.REINTENTOS_POR_ARCHIVO}
+    with pytest.raises(RuntimeError, match="b.html"):
+        publicar_archivos(servidor.conectar, ["a.json", "b.html"], "manifiesto.json")
+
+    manifiesto = json.loads(servidor.archivos["manifiesto.json"])["archivos"]
+    assert manifiesto["b.html"] == anterior               # se volverá a intentar
+    assert manifiesto["a.json"] == publicador_ftp.hash_archivo("a.json")
+    assert servidor.archivos["b.html"] == b"<p>b</p>"      # el publicado sigue entero
+
+
+# --- SERVIDOR FTP REAL (pyftpdlib) ---
+@pytest.fixture
+def servidor_ftp(tmp_path, directorio):
+    """
+    Servidor pyftpdlib local: ejercita ftplib con respuestas reales. Como muchos hosting,
+    responde 550 a un RNTO sobre un archivo existente; `fallos_stor` hace fallar con 451
+    los primeros STOR de un nombre.
+    """
+    pytest.importorskip("pyftpdlib")
+    from pyftpdlib.authorizers import DummyAuthorizer
+    from pyftpdlib.handlers import FTPHandler
+    from pyftpdlib.servers import ThreadedFTPServer
+
+    logging.getLogger("pyftpdlib").setLevel(logging.WARNING)
+    raiz = tmp_path / "public_html"
+    raiz.mkdir()
+    fallos_stor = {}
+    comandos = []
+
+    class Manejador(FTPHandler):
+        def ftp_STOR(self, file, mode='w'):
+            nombre = os.path.basename(file)
+            comandos.append(("STOR", nombre))
+            if fallos_stor.get(nombre):
+                fallos_stor[nombre] -= 1
+                self.respond("451 Fallo simulado.")
+                return
+            return super().ftp_STOR(file, mode)
+
+        def ftp_RNTO(self, path):
+            comandos.append(("RNTO", os.path.basename(path)))
+            if os.path.exists(path):
+                self.respond("550 El destino ya existe.")
+                return
+            return super().ftp_RNTO(path)
+
+    autorizador = DummyAuthorizer()
+    autorizador.add_user("u", "p", str(raiz), perm="elradfmw")
+    Manejador.authorizer = autorizador
+    servidor = ThreadedFTPServer(("127.0.0.1", 0), Manejador)
+    hilo = threading.Thread(target=servidor.serve_forever, kwargs={"timeout": 0.1}, daemon=True)
+    hilo.start()
+
+    def conectar():
+        ftp = FTP(timeout=10)
+        ftp.connect("127.0.0.1", servidor.address[1])
+        ftp.login("u", "p")
+        return ftp
+
+    yield conectar, raiz, fallos_stor, comandos
+    servidor.close_all()
+    hilo.join(timeout=5)
+
+
+def test_ftp_real_sube_por_temporal_y_renombra_sobre_existente(servidor_ftp):
+    conectar, raiz, _, comandos = servidor_ftp
+    ftp = conectar()
+    subir_atomico(ftp, b"v1", "events.json")
+    subir_atomico(ftp, b"v2", "events.json")       # RNTO responde 550: se borra y se repite
+    ftp.quit()
+    assert (raiz / "events.json").read_bytes() == b"v2"
+    assert not (raiz / "events.json.tmp").exists()
+    assert comandos[:2] == [("STOR", "events.json.tmp"), ("RNTO", "events.json")]
+    assert comandos.count(("RNTO", "events.json")) == 3
+
+
+def test_ftp_real_omite_lo_que_coincide_con_el_manifiesto(servidor_ftp, directorio):
+    conectar, raiz, _, comandos = servidor_ftp
+    archivos = ["a.json", "b.html", "c.txt"]
+    publicar_archivos(conectar, archivos, "manifiesto.json")
+    assert json.loads((raiz / "manifiesto.json").read_text())["archivos"].keys() == set(archivos)
+
+    (directorio / "c.txt").write_text("otro", encoding="utf-8")
+    comandos.clear()
+    assert [r.nombre for r in publicar_archivos(conectar, archivos, "manifiesto.json")] == ["c.txt"]
+    assert [c for c in comandos if c[0] == "STOR"] == [("STOR", "c.txt.tmp"), ("STOR", "manifiesto.json.tmp")]
+    assert (raiz / "c.txt").read_text() == "otro"
+
+
+def test_ftp_real_reintenta_solo_el_archivo_fallido(servidor_ftp):
+    conectar, raiz, fallos_stor, comandos = servidor_ftp
+    fallos_stor["b.html.tmp"] = 1
+    subidos = {r.nombre: r for r in publicar_archivos(conectar, ["a.json", "b.html"], "manifiesto.json")}
+    assert subidos["b.html"].intentos == 2 and subidos["a.json"].intentos == 1
+    assert comandos.count(("STOR", "a.json.tmp")) == 1
+    assert comandos.count(("STOR", "b.html.tmp")) == 2
+    assert (raiz / "b.html").read_text() == "<p>b</p>"
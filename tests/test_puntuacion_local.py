@@ -0,0 +1,58 @@
+from modelo_eventos import Evento, Partido
+from puntuacion_local import PESOS_RANKING, detectar_deporte, es_liga_sudamericana, puntuar_partido
+
+
+def puntuar(liga, descripcion, detalle="", canales=()):
+    return puntuar_partido(Evento(liga, detalle), Partido.crear(descripcion=descripcion, canales=canales))
+
+
+def test_deporte_por_emoji_del_titulo():
+    assert detectar_deporte(Evento("🏀 Partido de exhibición")) == "basquetbol"
+    assert detectar_deporte(Evento("⚽️ NBA")) == "futbol"   # el emoji manda sobre las palabras
+
+
+def test_deporte_por_palabras_clave():
+    assert detectar_deporte(Evento("NFL Sunday Night Football")) == "americano"
+    assert detectar_deporte(Evento("Fórmula 1 Gran Premio de México")) == "motor"
+    assert detectar_deporte(Evento("Torneo"), Partido.crear(descripcion="Pelea estelar UFC")) == "combate"
+    assert detectar_deporte(Evento("Torneo de verano")) == "otros"
+
+
+def test_palabras_completas_sin_acentos():
+    # "interior" no es "inter" ni "america" está en "americano"
+    assert detectar_deporte(Evento("Liga del interior")) == "futbol"
+    assert puntuar("Torneo", "Club Interior vs Norte") == puntuar("Torneo", "Club Este vs Norte")
+    assert puntuar("Torneo", "América vs Chivas") == puntuar("Torneo", "AMERICA VS CHIVAS")
+
+
+def test_score_acotado_y_determinista():
+    alto = puntuar("⚽️ Liga MX Final", "América vs Chivas", "Gran final", ["TUDN", "Canal 5"])
+    assert alto == 100
+    assert puntuar("Torneo", "Equipo A vs Equipo B") == PESOS_RANKING["nivel_base"] + PESOS_RANKING["deportes"]["otros"]
+
+
+def test_ppv_reemplaza_popularidad_del_deporte():
+    sin_ppv = puntuar("🥊 Box", "Pelea estelar")
+    con_ppv = puntuar("🥊 Box", "Pelea estelar", canales=["PPV"])
+    assert con_ppv - sin_ppv >= PESOS_RANKING["puntos_ppv"] - PESOS_RANKING["deportes"]["combate"]
+
+
+def test_sudamericana_regular_con_tope_y_final_sin_tope():
+    assert es_liga_sudamericana(Evento("⚽️ Liga Profesional Argentina"))
+    regular = puntuar("⚽️ Liga Profesional Argentina", "Boca vs River", "Jornada 3")
+    final = puntuar("⚽️ Liga Profesional Argentina", "Boca vs River", "Final")
+    assert regular <= PESOS_RANKING["tope_sudamericana_regular"]
+    assert final > PESOS_RANKING["tope_sudamericana_regular"]
+
+
+def test_final_por_encima_de_semifinal_y_cuartos():
+    # "final" no debe coincidir dentro de "cuartos de final" / "octavos de final"
+    final = puntuar("⚽️ Copa MX", "Pachuca vs Toluca", "Final")
+    semifinal = puntuar("⚽️ Copa MX", "Pachuca vs Toluca", "Semifinal")
+    cuartos = puntuar("⚽️ Copa MX", "Pachuca vs Toluca", "Cuartos de final")
+    octavos = puntuar("⚽️ Copa MX", "Pachuca vs Toluca", "Octavos de final")
+    assert final > semifinal > cuartos == octavos
+
+
+def test_liga_mx_por_encima_de_liga_sin_interes():
+    assert puntuar("⚽️ Liga MX", "América vs Chivas") > puntuar("⚽️ Liga de Noruega", "Molde vs Brann")
@@ -0,0 +1,22 @@
+from ranking_lotes import dividir_en_lotes, dividir_con_tope
+
+
+def test_lotes_respetan_maximo_de_elementos():
+    lotes = dividir_en_lotes(list(range(10)), str, presupuesto=1000, maximo=4)
+    assert [len(lote) for lote in lotes] == [4, 4, 2]
+
+
+def test_tope_de_lotes_conserva_los_de_mayor_prioridad_en_orden():
+    elementos = list(range(100))
+    lotes, descartados = dividir_con_tope(elementos, str, lambda e: e % 7, max_lotes=2,
+                                          presupuesto=1000, maximo=10)
+    elegidos = [e for lote in lotes for e in lote]
+    assert len(lotes) == 2 and descartados == 80
+    assert elegidos == sorted(elegidos)
+    assert min(e % 7 for e in elegidos) >= max(e % 7 for e in elementos if e not in elegidos)
+
+
+def test_sin_exceso_no_descarta():
+    lotes, descartados = dividir_con_tope(list(range(15)), str, lambda e: 0, max_lotes=2,
+                                          presupuesto=1000, maximo=10)
+    assert descartados == 0 and sum(len(lote) for lote in lotes) == 15
@@ -0,0 +1,102 @@
+from collections import Counter
+
+import pytest
+
+import reglas_distribucion
+from modelo_eventos import Evento, Partido
+from puntuacion_local import detectar_deporte, es_liga_sudamericana
+from reglas_distribucion import aplicar_reglas
+
+LIGAS = {
+    "futbol": ["⚽️ Liga MX", "⚽️ Premier League", "⚽️ LaLiga", "⚽️ Serie A", "⚽️ Bundesliga", "⚽️ MLS",
+               "⚽️ Ligue 1", "⚽️ Eredivisie", "⚽️ Liga Portugal"],
+    "sudamericana": ["⚽️ Liga Profesional Argentina", "⚽️ Brasileirao", "⚽️ Liga BetPlay Colombia"],
+    "basquetbol": ["🏀 NBA", "🏀 WNBA"],
+    "americano": ["🏈 NFL", "🏈 NCAA Football"],
+    "beisbol": ["⚾️ MLB"],
+    "hockey": ["🏒 NHL"],
+    "tenis": ["🎾 ATP"],
+}
+
+
+def par(liga, n):
+    return Evento(liga), Partido.crear(descripcion=f"{liga} partido {n}")
+
+
+def lista(*ligas, repeticiones=3):
+    return [par(liga, n) for n in range(repeticiones) for liga in ligas]
+
+
+def deportes(seleccion):
+    return [detectar_deporte(e, p) for e, p in seleccion]
+
+
+def test_respeta_limite_y_tope_por_liga():
+    ranking = lista(*LIGAS["futbol"], *LIGAS["basquetbol"], *LIGAS["americano"], repeticiones=4)
+    seleccion = aplicar_reglas(ranking, [], 20, 2)
+    assert len(seleccion) == 20
+    assert max(Counter(e.evento_principal for e, _ in seleccion).values()) <= 2
+
+
+def test_tope_de_futbol():
+    futbol = [par(liga, n) for liga in LIGAS["futbol"] for n in range(2)]
+    reservas = lista(*LIGAS["basquetbol"], *LIGAS["americano"], *LIGAS["beisbol"], *LIGAS["hockey"])
+    seleccion = aplicar_reglas(futbol, reservas, 20, 2)
+    assert deportes(seleccion).count("futbol") == reglas_distribucion.MAX_FUTBOL
+
+
+def test_tope_de_sudamericanas():
+    ranking = lista(*LIGAS["sudamericana"], repeticiones=2) + lista(*LIGAS["basquetbol"], *LIGAS["americano"])
+    seleccion = aplicar_reglas(ranking, [], 10, 2)
+    assert sum(es_liga_sudamericana(e) for e, _ in seleccion) == reglas_distribucion.MAX_SUDAMERICANAS
+
+
+def test_minimo_de_deportes_con_reservas():
+    ranking = [par(liga, n) for liga in LIGAS["futbol"] for n in range(2)][:10]
+    reservas = lista(*LIGAS["basquetbol"], *LIGAS["americano"], *LIGAS["beisbol"], *LIGAS["hockey"])
+    seleccion = aplicar_reglas(ranking, reservas, 10, 2)
+    assert len(seleccion) == 10
+    assert len(set(deportes(seleccion))) >= reglas_distribucion.MIN_DEPORTES
+
+
+def test_sin_mas_de_n_consecutivos_del_mismo_deporte():
+    ranking = [par(liga, n) for liga in LIGAS["futbol"] for n in range(2)][:12] + lista(*LIGAS["basquetbol"])
+    seleccion = aplicar_reglas(ranking, lista(*LIGAS["beisbol"], *LIGAS["hockey"], *LIGAS["tenis"]), 20, 2)
+    racha, maxima, anterior = 0, 0, None
+    for deporte in deportes(seleccion):
+        racha = racha + 1 if deporte == anterior else 1
+        maxima, anterior = max(maxima, racha), deporte
+    assert maxima <= reglas_distribucion.MAX_CONSECUTIVOS
+
+
+def test_conserva_el_orden_de_la_ia_cuando_no_hay_conflictos():
+    ranking = [par(LIGAS["basquetbol"][0], 0), par(LIGAS["americano"][0], 0), par(LIGAS["beisbol"][0], 0),
+               par(LIGAS["hockey"][0], 0), par(LIGAS["tenis"][0], 0)]
+    assert aplicar_reglas(ranking, [], 5, 2) == ranking
+
+
+def test_un_solo_deporte_no_se_traba(monkeypatch):
+    monkeypatch.setattr(reglas_distribucion, "MAX_FUTBOL", 100)
+    ranking = [par(liga, n) for liga in LIGAS["futbol"] for n in range(2)]
+    seleccion = aplicar_reglas(ranking, [], 10, 2)
+    assert len(seleccion) == 10
+    assert set(deportes(seleccion)) == {"futbol"}
+
+
+@pytest.mark.parametrize("limite", [0, 1, 3])
+def test_limites_pequenos(limite):
+    assert len(aplicar_reglas(lista(*LIGAS["basquetbol"]), [], limite, 2)) == limite
+
+
+def test_reservas_solo_rellenan_lo_que_liberan_los_topes():
+    # 4 de la NBA con tope 2 por liga: se liberan 2 lugares, no los 10 del límite
+    ranking = [par("🏀 NBA", n) for n in range(4)] + [par("🏈 NFL", 0)]
+    reservas = lista(*LIGAS["beisbol"], *LIGAS["hockey"], *LIGAS["tenis"])
+    seleccion = aplicar_reglas(ranking, reservas, 10, 2)
+    assert len(seleccion) == len(ranking)
+    assert sum(e.evento_principal == "🏀 NBA" for e, _ in seleccion) <= 2
+
+
+def test_sin_reservas_la_lista_queda_corta():
+    ranking = [par("🏀 NBA", n) for n in range(6)]
+    assert len(aplicar_reglas(ranking, [], 10, 2)) == 2
@@ -0,0 +1,66 @@
+from generador_guia import generar_guia
+from tokenizador_guia import (
+    tokenizar_guia, asegurar_tokens, FECHA, TITULO, SEPARADOR, PARTIDO, DETALLE, PIE,
+)
+
+GUIA = """
+Eventos Deportivos Sábado 18 de Octubre
+⚽️🏈🏀⚾️🏐🎾🥊🏒⛳️🎳
+⚽️ Liga MX Apertura
+Estadio Azteca, CDMX
+América vs Chivas a las 7:00 pm Este / 6:00 pm Centro / 4:00 pm Pacífico por TUDN y Canal 5
+🏀 NBA
+Lakers vs Celtics a partir de las 6 pm por ESPN
+WWE Wrestling Raw
+Evento BOX Canelo Álvarez
+⚽️🏈🏀⚾️🏐🎾🥊🏒⛳️🎳
+Kaelus Soporte 📞 Atención 24/7
+"""
+
+
+def test_clasifica_cada_tipo_de_linea():
+    tipos = [(l.tipo, l.texto) for l in tokenizar_guia(GUIA)]
+    assert tipos == [
+        (FECHA, "Eventos Deportivos Sábado 18 de Octubre"),
+        (SEPARADOR, "⚽️🏈🏀⚾️🏐🎾🥊🏒⛳️🎳"),
+        (TITULO, "⚽️ Liga MX Apertura"),
+        (DETALLE, "Estadio Azteca, CDMX"),
+        (PARTIDO, "América vs Chivas a las 7:00 pm Este / 6:00 pm Centro / 4:00 pm Pacífico por TUDN y Canal 5"),
+        (TITULO, "🏀 NBA"),
+        (PARTIDO, "Lakers vs Celtics a partir de las 6 pm por ESPN"),
+        (TITULO, "WWE Wrestling Raw"),
+        (TITULO, "Evento BOX Canelo Álvarez"),
+        (SEPARADOR, "⚽️🏈🏀⚾️🏐🎾🥊🏒⛳️🎳"),
+        (PIE, "Kaelus Soporte 📞 Atención 24/7"),
+    ]
+
+
+def test_linea_con_emoji_y_vs_no_es_titulo():
+    linea = tokenizar_guia("⚽️ América vs Chivas por TUDN")[0]
+    assert linea.tipo == DETALLE
+    assert linea.destacada
+
+
+def test_marcas_de_zona_y_destacada():
+    lineas = {l.texto: l for l in tokenizar_guia(GUIA)}
+    assert lineas["América vs Chivas a las 7:00 pm Este / 6:00 pm Centro / 4:00 pm Pacífico por TUDN y Canal 5"].zona
+    assert not lineas["Estadio Azteca, CDMX"].zona
+    assert lineas["WWE Wrestling Raw"].destacada
+    assert not lineas["Estadio Azteca, CDMX"].destacada
+
+
+def test_ignora_lineas_vacias_y_espacios():
+    assert [l.texto for l in tokenizar_guia("\n   \n  🏀 NBA  \n\n")] == ["🏀 NBA"]
+
+
+def test_asegurar_tokens_acepta_texto_o_lista():
+    tokens = tokenizar_guia(GUIA)
+    assert asegurar_tokens(GUIA) == tokens
+    assert asegurar_tokens(tokens) is tokens
+
+
+def test_guia_sintetica_completa():
+    lineas = tokenizar_guia(generar_guia(500))
+    assert lineas[0].tipo == FECHA
+    assert lineas[-1].tipo == PIE
+    assert {l.tipo for l in lineas} == {FECHA, SEPARADOR, TITULO, PARTIDO, DETALLE, PIE}
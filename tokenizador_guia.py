@@ -0,0 +1,63 @@
+from collections import namedtuple
+
+from normalizacion import contiene_emoji_titulo
+
+# --- 1. CONSTANTES DE CLASIFICACIÓN ---
+PREFIJO_FECHA = "Eventos Deportivos"
+SEPARADOR_EMOJIS = "⚽️🏈🏀⚾️🏐🎾🥊🏒⛳️🎳"
+TEXTO_PIE = "Kaelus Soporte"
+TEXTOS_TITULO = ("WWE Wrestling", "Evento BOX")
+PALABRAS_ZONA = ("Este", "Centro", "Pacífico")
+PALABRAS_PARTIDO = PALABRAS_ZONA + ("partir de las",)
+PALABRAS_NO_TITULO = ("vs", "va", " a las ", " pm ", " am ", "p.m.")
+
+# Tipos de línea
+FECHA = "fecha"
+TITULO = "titulo"
+SEPARADOR = "separador"
+PARTIDO = "partido"
+DETALLE = "detalle"
+PIE = "pie"
+
+# tipo: clasificación principal (la que usa el JSON).
+# destacada: "WWE Wrestling", "Evento BOX" o cualquier emoji (la que usan HTML y WhatsApp).
+# zona: contiene Este/Centro/Pacífico.
+# separador: contiene la línea de emojis separadora.
+LineaGuia = namedtuple("LineaGuia", ["tipo", "texto", "destacada", "zona", "separador"])
+
+
+# --- 2. TOKENIZADOR ---
+def tokenizar_guia(texto_crudo):
+    """Recorre el texto extraído una sola vez y devuelve la lista de líneas clasificadas."""
+    lineas = []
+    for linea in texto_crudo.strip().split('\n'):
+        linea = linea.strip()
+        if not linea: continue
+
+        tiene_emoji = contiene_emoji_titulo(linea)
+        destacada = tiene_emoji or any(t in linea for t in TEXTOS_TITULO)
+        zona = any(p in linea for p in PALABRAS_ZONA)
+        separador = SEPARADOR_EMOJIS in linea
+
+        if PREFIJO_FECHA in linea:
+            tipo = FECHA
+        elif TEXTO_PIE in linea:
+            tipo = PIE
+        elif separador:
+            tipo = SEPARADOR
+        elif any(t in linea for t in TEXTOS_TITULO) or (tiene_emoji and not any(p in linea.lower() for p in PALABRAS_NO_TITULO)):
+            tipo = TITULO
+        elif any(p in linea for p in PALABRAS_PARTIDO):
+            tipo = PARTIDO
+        else:
+            tipo = DETALLE
+
+        lineas.append(LineaGuia(tipo, linea, destacada, zona, separador))
+    return lineas
+
+
+def asegurar_tokens(guia):
+    """Permite que los renderizadores reciban tanto el texto crudo como la lista ya tokenizada."""
+    if isinstance(guia, str):
+        return tokenizar_guia(guia)
+    return guia